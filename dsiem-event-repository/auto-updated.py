@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 from __future__ import print_function
-import os, re, sys, json, base64, io, requests, argparse, traceback, subprocess
+import os, re, sys, json, base64, io, requests, argparse, traceback, subprocess, threading, hashlib, posixpath
 from requests.auth import HTTPBasicAuth
 from collections import OrderedDict
 import smtplib
@@ -8,6 +8,10 @@ from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from datetime import datetime, timedelta
 
+# Client OpenSearch bersama (keep-alive pool, retry 429/503, timing per endpoint)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lib"))
+import opensearch_client
+
 # =========================================================
 # CONFIG & ENV VARS
 # =========================================================
@@ -25,6 +29,12 @@ EMAIL_RECIPIENTS = os.getenv("EMAIL_RECIPIENTS")
 LOGSTASH_JSON_DICT_DIR = os.getenv("LOGSTASH_JSON_DICT_DIR")
 VECTOR_CONFIG_BASE_DIR = os.getenv("VECTOR_CONFIG_BASE_DIR")
 NFS_BASE_DIR = os.getenv("NFS_BASE_DIR")
+
+# Repo snapshot: 1 recursive tree call per run, blob content cached on disk by SHA
+GH_SNAPSHOT = (os.getenv("GH_SNAPSHOT") or "1").lower() not in ("0", "false", "no")
+# default outside the working tree: ${XDG_CACHE_HOME:-~/.cache}/dsiem-event-repository/gh_blobs
+GH_BLOB_CACHE_DIR = os.getenv("GH_BLOB_CACHE_DIR") or os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "dsiem-event-repository", "gh_blobs")
 # =========================================================
 
 # =========================================================
@@ -78,10 +88,11 @@ def alarm_id(plugin_id, sid): return int(plugin_id) * 10000 + int(sid)
 def run_cmd(cmd_list, dry=False):
     info("Executing command: {}".format(" ".join(cmd_list)))
     try:
-        p = subprocess.Popen(cmd_list, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        out, err = p.communicate()
-        if p.returncode != 0:
-            warn("Command failed (rc={}):\n{}".format(p.returncode, err.decode('utf-8', 'replace')))
+        # child output goes through print, so a parallel job keeps it in its own log buffer
+        p = subprocess.Popen(cmd_list, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        out = p.communicate()[0].decode('utf-8', 'replace').rstrip()
+        if p.returncode != 0: warn("Command failed (rc={}):\n{}".format(p.returncode, out))
+        elif out: info("Command output:\n{}".format(out))
         return p.returncode
     except OSError as e: err("Failed to run command: {}".format(e)); return 1
 
@@ -317,27 +328,176 @@ def directive_append(existing_json, template_map, template_id, plugin_id, header
 # GITHUB FUNCTIONS
 # =========================================================
 def gh_headers(token): return {"Accept":"application/vnd.github+json", "Authorization":"Bearer {}".format(token), "X-GitHub-Api-Version": DEFAULT_GH_API_VERSION}
-def gh_get(repo, branch, token, path, debug=False):
+def gh_get(repo, branch, token, path, debug=False, session=None):
     url = "https://api.github.com/repos/{}/contents/{}".format(repo, path.replace("\\", "/").lstrip('/'))
-    try: r = requests.get(url, headers=gh_headers(token), params={"ref": branch}, timeout=60)
+    try: r = (session or requests).get(url, headers=gh_headers(token), params={"ref": branch}, timeout=60)
     except requests.exceptions.RequestException as e: die("GitHub GET Error: {}".format(e)); return None, None
     if debug: info("GET {} -> {}".format(url, r.status_code))
     if r.status_code == 404: return None, None
     if r.status_code >= 300: die("GitHub GET Error {} {}: {}".format(r.status_code, path, r.text[:200])); return None, None
     try: return r.json(), r.headers.get("x-github-request-id")
     except ValueError: return None, None
-def gh_put(repo, branch, token, path, bytes_content, message, sha=None, debug=False, dry=False):
+GH_CONFLICT = object() # gh_put(conflict=...) marker for a stale sha
+def gh_put(repo, branch, token, path, bytes_content, message, sha=None, debug=False, dry=False, session=None, lock=None, conflict=None):
+    """conflict: returned instead of die() when the sha is stale (file changed after it was read)."""
     url = "https://api.github.com/repos/{}/contents/{}".format(repo, path.replace("\\", "/").lstrip('/'))
     payload = {"message": message, "content": base64.b64encode(bytes_content).decode("ascii"), "branch": branch}
     if sha: payload["sha"] = sha
     if dry: info("[DRY-RUN] PUT {} ({} bytes), sha={}".format(path, len(bytes_content), sha)); return {"sha": "dry_run_sha"}
-    try: r = requests.put(url, headers=gh_headers(token), data=json.dumps(payload), timeout=60)
+    if lock is not None:
+        # commits to one branch are serialized, parallel PUTs fail with 409
+        with lock: return gh_put(repo, branch, token, path, bytes_content, message, sha, debug, dry, session, conflict=conflict)
+    try: r = (session or requests).put(url, headers=gh_headers(token), data=json.dumps(payload), timeout=60)
     except requests.exceptions.RequestException as e: die("GitHub PUT Error: {}".format(e)); return {}
     if debug: info("PUT {} -> {}".format(url, r.status_code))
+    if conflict is not None and (r.status_code == 409 or (r.status_code == 422 and "sha" in r.text)): return conflict
     if r.status_code >= 300: die("GitHub PUT Error {} {}:\n{}".format(r.status_code, path, r.text[:400])); return {}
     try: return r.json()
     except ValueError: return {}
-    
+
+def git_blob_sha(data):
+    # same hash git uses for blob objects, lets cached files be verified offline
+    return hashlib.sha1(("blob %d\0" % len(data)).encode("ascii") + data).hexdigest()
+
+def gh_norm(path): return posixpath.normpath(path.replace("\\", "/")).lstrip('/')
+
+class RepoSnapshot(object):
+    """
+    Recursive git tree of one branch, fetched once and shared by all jobs in
+    the process. get/exists answer from the tree; blob content is only
+    downloaded for SHAs missing from the cache (memory + cache_dir).
+    If the tree is unavailable (disabled, error, truncated) every call falls
+    back to the Contents API (gh_get) like before.
+    """
+    def __init__(self, repo, branch, token, session=None, cache_dir=None, debug=False, dry=False, lock=None):
+        self.repo, self.branch, self.token = repo, branch, token
+        self.session = session or requests.Session()
+        self.cache_dir, self.debug, self.dry, self.lock = cache_dir, debug, dry, lock
+        self.files = None # path -> blob sha
+        self._blobs = {}
+        self._mutex = threading.RLock()
+        self.stats = {"tree": 0, "blob_get": 0, "blob_disk": 0, "blob_mem": 0, "contents_get": 0}
+
+    def load(self):
+        url = "https://api.github.com/repos/{}/git/trees/{}".format(self.repo, self.branch)
+        try: r = self.session.get(url, headers=gh_headers(self.token), params={"recursive": "1"}, timeout=60)
+        except requests.exceptions.RequestException as e: warn("Repo snapshot unavailable ({}), using Contents API.".format(e)); return self
+        self._count("tree")
+        if self.debug: info("GET {} -> {}".format(url, r.status_code))
+        try: data = r.json() if r.status_code == 200 else {}
+        except ValueError: data = {}
+        if not data.get("tree") or data.get("truncated"):
+            warn("Repo snapshot unavailable (HTTP {}{}), using Contents API.".format(r.status_code, ", truncated" if data.get("truncated") else ""))
+            return self
+        self.files = dict((gh_norm(e["path"]), e["sha"]) for e in data["tree"] if e.get("type") == "blob")
+        info("Repo snapshot {}@{}: {} files (tree {}).".format(self.repo, self.branch, len(self.files), str(data.get("sha"))[:12]))
+        return self
+
+    def sha(self, path):
+        with self._mutex: return self.files.get(gh_norm(path))
+
+    def exists(self, path):
+        if self.files is None: return self.get(path)[0] is not None
+        return self.sha(path) is not None
+
+    def get(self, path):
+        """Same return shape as gh_get: ({"sha", "content" (base64)}, None), (None, None) if missing."""
+        if self.files is None:
+            self._count("contents_get")
+            return gh_get(self.repo, self.branch, self.token, path, debug=self.debug, session=self.session)
+        sha = self.sha(path)
+        if sha is None: return None, None
+        return {"sha": sha, "path": gh_norm(path), "content": base64.b64encode(self.blob(sha)).decode("ascii")}, None
+
+    def blob(self, sha):
+        with self._mutex:
+            data = self._blobs.get(sha)
+            if data is not None: self.stats["blob_mem"] += 1; return data
+        data = self._read_cache(sha)
+        if data is not None: self._count("blob_disk")
+        else:
+            url = "https://api.github.com/repos/{}/git/blobs/{}".format(self.repo, sha)
+            try: r = self.session.get(url, headers=gh_headers(self.token), timeout=60)
+            except requests.exceptions.RequestException as e: die("GitHub GET Error: {}".format(e))
+            self._count("blob_get")
+            if self.debug: info("GET {} -> {}".format(url, r.status_code))
+            if r.status_code >= 300: die("GitHub GET Error {} blob {}: {}".format(r.status_code, sha, r.text[:200]))
+            try: data = base64.b64decode(r.json().get("content", ""))
+            except (TypeError, ValueError, base64.binascii.Error) as e: die("Invalid blob {}: {}".format(sha, e))
+            self._write_cache(sha, data)
+        with self._mutex: self._blobs[sha] = data
+        return data
+
+    def put(self, path, bytes_content, message, sha=None, conflict=None):
+        res = gh_put(self.repo, self.branch, self.token, path, bytes_content, message, sha=sha,
+                     debug=self.debug, dry=self.dry, session=self.session, lock=self.lock, conflict=conflict)
+        if res is conflict: return res
+        new_sha = ((res or {}).get("content") or {}).get("sha")
+        if self.files is not None and new_sha:
+            # keep the snapshot current for later jobs in this run
+            with self._mutex: self.files[gh_norm(path)] = new_sha; self._blobs[new_sha] = bytes_content
+            self._write_cache(new_sha, bytes_content)
+        return res
+
+    def update(self, path, build, message):
+        """
+        Read-modify-write of one file. build(content) gets the current bytes
+        (None if missing) and returns the new bytes, or None to leave the file
+        alone. If the file changed on GitHub since it was read (stale sha) it
+        is re-read and build runs again on the new content; a second conflict
+        fails the job. Returns the PUT result, None if nothing was written.
+        """
+        obj, _ = self.get(path)
+        for attempt in (1, 2):
+            try: current = base64.b64decode(obj.get("content", "")) if obj else None
+            except (TypeError, ValueError, base64.binascii.Error) as e: die("Invalid content {}: {}".format(path, e)); return None
+            data = build(current)
+            if data is None: return None
+            sha = obj.get("sha") if obj else None
+            res = self.put(path, data, message, sha=sha, conflict=GH_CONFLICT if attempt == 1 else None)
+            if res is not GH_CONFLICT: return res
+            warn("GitHub PUT {}: changed since it was read (sha {}), re-reading and merging again.".format(path, sha))
+            obj = self.refresh(path)
+        return None
+
+    def refresh(self, path):
+        """Re-read one file through the Contents API and update the snapshot."""
+        self._count("contents_get")
+        obj, _ = gh_get(self.repo, self.branch, self.token, path, debug=self.debug, session=self.session)
+        if obj and obj.get("sha") and not obj.get("content"):
+            # Contents API leaves content empty for files over 1 MB
+            obj["content"] = base64.b64encode(self.blob(obj["sha"])).decode("ascii")
+        if self.files is not None:
+            with self._mutex:
+                if obj and obj.get("sha"): self.files[gh_norm(path)] = obj["sha"]
+                else: self.files.pop(gh_norm(path), None)
+        return obj
+
+    def _count(self, key):
+        with self._mutex: self.stats[key] += 1
+
+    def summary(self):
+        with self._mutex: st = dict(self.stats)
+        return "GitHub reads (run total): tree={}, blob downloads={}, blob cache hits={} (disk {}), contents API={}".format(
+            st["tree"], st["blob_get"], st["blob_mem"] + st["blob_disk"], st["blob_disk"], st["contents_get"])
+
+    def _read_cache(self, sha):
+        if not self.cache_dir: return None
+        try:
+            with io.open(os.path.join(self.cache_dir, sha), "rb") as f: data = f.read()
+        except IOError: return None
+        return data if git_blob_sha(data) == sha else None
+
+    def _write_cache(self, sha, data):
+        if not self.cache_dir: return
+        path = os.path.join(self.cache_dir, sha)
+        tmp = "{}.{}.tmp".format(path, threading.current_thread().ident)
+        try:
+            if not os.path.isdir(self.cache_dir): os.makedirs(self.cache_dir)
+            with io.open(tmp, "wb") as f: f.write(data)
+            os.rename(tmp, path)
+        except (IOError, OSError) as e: warn("Blob cache write failed {}: {}".format(path, e))
+
 def gh_paths(log_type, module_name, submodule_name, filter_key, backend_pod="dsiem-backend-0"):
     parts = [p for p in [slug(log_type), slug(module_name), slug(submodule_name), slug(filter_key)] if p]
     unique_parts = list(OrderedDict.fromkeys(parts)); full_slug = u"-".join(unique_parts)
@@ -366,7 +526,7 @@ def load_cred(path, user):
     except IOError as e: die("[CRED] Cannot read credentials file {}: {}".format(path, e))
     die("[CRED] User '{}' not found in {}".format(user, path))
 
-def fetch_titles(es_cfg, q_cfg, debug=False):
+def fetch_titles(es_cfg, q_cfg, debug=False, cred=None):
     # [PATCHED] Prioritize Environment Variable (ES_HOST) over JSON config
     # and perform aggressive sanitization to remove quotes/backslashes.
     env_host = os.getenv("ES_HOST")
@@ -394,8 +554,8 @@ def fetch_titles(es_cfg, q_cfg, debug=False):
     verify = es_cfg.get("verify_tls", False)
     timeout = es_cfg.get("timeout", 3000)
     
-    u,p = load_cred(ES_PASSWD_FILE, ES_USER_LOOKUP)
-    auth = HTTPBasicAuth(u,p)
+    u,p = cred or load_cred(ES_PASSWD_FILE, ES_USER_LOOKUP)
+    client = opensearch_client.get_client(host, auth=HTTPBasicAuth(u,p), verify=verify, timeout=timeout)
     index, field, size = q_cfg.get("index"), q_cfg.get("field"), int(q_cfg.get("size", 2000))
     if not index or not field: die("Query missing index or field.")
     agg_field = field if field.endswith(".keyword") else field + ".keyword"
@@ -412,8 +572,7 @@ def fetch_titles(es_cfg, q_cfg, debug=False):
         try: mf.append({"range": {time_cfg["field"]: {"gte": time_cfg["gte"], "lte": time_cfg["lte"]}}})
         except KeyError: pass
     if mf: body["query"]={"bool":{"filter": mf}}
-    url = "{}/{}/_search".format(host.rstrip("/"), index)
-    try: r = requests.post(url, auth=auth, headers={"Content-Type":"application/json"}, data=json.dumps(body), timeout=timeout, verify=verify)
+    try: r = client.request("POST", "{}/_search".format(index), data=json.dumps(body))
     except requests.exceptions.RequestException as e: die("OpenSearch error: {}".format(e)); return [], "", 0
     if r.status_code != 200: die("OpenSearch failed ({})".format(r.status_code)); return [], "", 0
     try: data = r.json()
@@ -425,7 +584,7 @@ def fetch_titles(es_cfg, q_cfg, debug=False):
 # =========================================================
 # DISTRIBUTE LOCAL FUNCTIONS
 # =========================================================
-def distribute_logstash_local(merged_rows, paths, cfg, plugin_id, template_map, template_id, args):
+def distribute_logstash_local(merged_rows, paths, cfg, plugin_id, template_map, template_id, ctx):
     section("Distribute Local Files (Logstash)")
     made_local_changes = False
     
@@ -450,7 +609,7 @@ def distribute_logstash_local(merged_rows, paths, cfg, plugin_id, template_map,
 
     if new_data_obj != existing_data_obj:
         info("JSON content differs, writing to {}".format(logstash_dest_path))
-        if not args.dry_run:
+        if not ctx.dry_run:
             if not os.path.isdir(logstash_json_dir):
                 try: os.makedirs(logstash_json_dir)
                 except OSError: return False
@@ -468,9 +627,10 @@ def distribute_logstash_local(merged_rows, paths, cfg, plugin_id, template_map,
     pod_name = "dsiem-frontend-0";
     remote_directive_filename = os.path.basename(paths["directive"])
     remote_path_in_pod = "/dsiem/configs/{}".format(remote_directive_filename)
-    local_temp_path = "./{}.temp".format(remote_directive_filename)
+    # per job: other coordinator workers may be handling the same directive file
+    local_temp_path = "./{}.{}.{}.temp".format(remote_directive_filename, os.getpid(), threading.current_thread().ident)
 
-    rc = run_cmd(["kubectl", "cp", "{}:{}".format(pod_name, remote_path_in_pod), local_temp_path], dry=args.dry_run)
+    rc = run_cmd(["kubectl", "cp", "{}:{}".format(pod_name, remote_path_in_pod), local_temp_path], dry=ctx.dry_run)
     existing_dir = OrderedDict([("directives", [])])
     if rc == 0 and os.path.exists(local_temp_path):
         try:
@@ -487,7 +647,7 @@ def distribute_logstash_local(merged_rows, paths, cfg, plugin_id, template_map,
     if appended:
         info("Found {} missing/new directives. Distributing back to pod...".format(add_count))
         temp_write_ok = False
-        if not args.dry_run:
+        if not ctx.dry_run:
             try:
                 with io.open(local_temp_path, "w", encoding="utf-8") as f:
                     json_str_directive = json.dumps(updated_dir_json, indent=2, ensure_ascii=False)
@@ -499,18 +659,18 @@ def distribute_logstash_local(merged_rows, paths, cfg, plugin_id, template_map,
         else: info("[DRY-RUN] Temp directive write skipped."); temp_write_ok = True
 
         if temp_write_ok:
-            if run_cmd(["kubectl", "cp", local_temp_path, "{}:{}".format(pod_name, remote_path_in_pod)], dry=args.dry_run) == 0:
+            if run_cmd(["kubectl", "cp", local_temp_path, "{}:{}".format(pod_name, remote_path_in_pod)], dry=ctx.dry_run) == 0:
                  made_local_changes = True; info("Directive distribution complete.")
             else: err("Failed copy directive to pod.")
     else: info("No new directives to add.")
 
-    if os.path.exists(local_temp_path) and not args.dry_run:
+    if os.path.exists(local_temp_path) and not ctx.dry_run:
         try: os.remove(local_temp_path)
         except OSError: pass
 
     return made_local_changes
 
-def distribute_vector_local(merged_rows, paths, cfg, args):
+def distribute_vector_local(merged_rows, paths, cfg, ctx):
     section("Distribute Local Files (Vector)")
     made_local_changes = False
 
@@ -552,7 +712,7 @@ def distribute_vector_local(merged_rows, paths, cfg, args):
 
     if new_tsv_content_str != existing_tsv_content_str:
         info("TSV content differs, writing to {}".format(nfs_dest_path))
-        if not args.dry_run:
+        if not ctx.dry_run:
             try:
                 with io.open(nfs_dest_path, "w", encoding="utf-8") as f: f.write(new_tsv_content_str)
                 made_local_changes = True; info("Vector TSV dictionary updated.")
@@ -566,12 +726,61 @@ def distribute_vector_local(merged_rows, paths, cfg, args):
 # =========================================================
 # MAIN FUNCTION
 # =========================================================
-def main():
-    args = parse_args()
+class JobContext(object):
+    """
+    State shared across jobs in one process (master_coordinator in-process
+    mode): GitHub HTTP session, parsed templates/configs and credentials.
+    Also carries the CLI flags (dry_run, debug) in place of argparse args.
+    Safe to share between coordinator worker threads: GitHub writes hold
+    gh_write, local/pod distribution (read-modify-write of the pod directive
+    file) holds local_write.
+    """
+    def __init__(self, dry_run=False, debug=False):
+        self.dry_run, self.debug = dry_run, debug
+        self.gh = requests.Session()
+        self.gh_write = threading.RLock()
+        self.local_write = threading.RLock()
+        self._cache = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+
+    def cached(self, key, loader):
+        # one lock per key: a slow loader (tree fetch) only blocks jobs waiting
+        # for that same key. A loader that raises/dies is not cached, the next job retries it.
+        with self._lock:
+            if key in self._cache: return self._cache[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                if key in self._cache: return self._cache[key]
+            value = loader()
+            with self._lock: self._cache[key] = value
+            return value
+
+    def snapshot(self, repo, branch):
+        """RepoSnapshot per repo@branch, the tree is fetched once per run."""
+        def load():
+            snap = RepoSnapshot(repo, branch, GITHUB_TOKEN, self.gh, GH_BLOB_CACHE_DIR, self.debug, self.dry_run, self.gh_write)
+            return snap.load() if GH_SNAPSHOT else snap
+        return self.cached(("snapshot", repo, branch), load)
+
+def run_job(cfg_path, ctx):
+    """
+    Run one updater job. Keeps the exit-code contract of the script:
+    0 = done, 5 = done + restart needed, anything else = failure.
+    """
+    try: return _run_job(cfg_path, ctx)
+    except SystemExit as e: return e.code if isinstance(e.code, int) else 1
+    except Exception as e:
+        err("Unexpected error: {}".format(e))
+        traceback.print_exc()
+        return 99
+
+def _run_job(cfg_path, ctx):
     section("Load config")
-    try: cfg = read_json(CFG_PATH)
-    except (FileNotFoundError, IOError): die("Config file '{}' not found.".format(CFG_PATH)); return 1
-    except (JSONDecodeError, ValueError): die("Config file '{}' is not valid JSON.".format(CFG_PATH)); return 1
+    try: cfg = read_json(cfg_path)
+    except (FileNotFoundError, IOError): die("Config file '{}' not found.".format(cfg_path)); return 1
+    except (JSONDecodeError, ValueError): die("Config file '{}' is not valid JSON.".format(cfg_path)); return 1
 
     # --- [PATCH] Standardize Customer Config Loading (Anchor to Root) ---
     script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -579,7 +788,7 @@ def main():
 
     info("Loading customer config from ROOT: {}".format(customer_path))
     try: 
-        customer_cfg = read_json(customer_path)
+        customer_cfg = ctx.cached(("customer", customer_path), lambda: read_json(customer_path))
         cfg.update(customer_cfg) 
     except FileNotFoundError: 
         warn("Customer config '{}' not found in root. Using default/placeholder.".format(customer_path))
@@ -599,7 +808,7 @@ def main():
 
     required_keys = ["es", "query", "layout", "file70", "directive", "github"]
     if not all(k in cfg for k in required_keys):
-        die("Config '{}' missing required keys.".format(CFG_PATH)); return 1
+        die("Config '{}' missing required keys.".format(cfg_path)); return 1
 
     es_cfg, q_cfg, layout, file70, dircfg, gh_cfg = cfg["es"], cfg["query"], cfg["layout"], cfg["file70"], cfg["directive"], cfg["github"]
 
@@ -624,14 +833,15 @@ def main():
     if not gh_repo: die("GitHub repo not defined."); return 1
 
     info("Using GITHUB_REPO: {}".format(gh_repo))
-    info("CFG: {}, Repo: {}@{}, Slug: {}".format(CFG_PATH, gh_repo, gh_branch, siem_plugin_type))
+    info("CFG: {}, Repo: {}@{}, Slug: {}".format(cfg_path, gh_repo, gh_branch, siem_plugin_type))
+    snap = ctx.snapshot(gh_repo, gh_branch)
 
     needs_distribution = layout.get("needs_distribution", False)
     is_active_for_email = False
     active_plugins_file = './active_plugins.json'
     if os.path.exists(active_plugins_file):
         try:
-            with io.open(active_plugins_file, 'r', encoding='utf-8') as f: active_list = json.load(f)
+            active_list = ctx.cached(("active_plugins", active_plugins_file), lambda: read_json(active_plugins_file))
             if isinstance(active_list, list) and siem_plugin_type in active_list: is_active_for_email = True
         except (IOError, JSONDecodeError, ValueError): pass
 
@@ -641,73 +851,75 @@ def main():
     info("Plugin Status: {}".format(plugin_status))
 
     section("Check Plugin ID Registry")
-    reg_obj, _ = gh_get(gh_repo, gh_branch, GITHUB_TOKEN, registry_path, debug=args.debug)
-    registry, found_in_reg = {}, False; reg_sha = None
-    if reg_obj:
-        reg_sha = reg_obj.get("sha")
-        try: registry = json.loads(base64.b64decode(reg_obj.get("content","")).decode("utf-8"))
-        except (TypeError, ValueError, base64.binascii.Error): pass
-    if not isinstance(registry.get("used"), list): registry["used"] = []
-    for item in registry.get("used", []):
-        if item.get("siem_plugin_type") == siem_plugin_type:
-            if int(item.get("plugin_id",0)) == plugin_id: found_in_reg = True; info("Plugin ID {} OK.".format(plugin_id)); break
-            else: die("Conflict! Slug uses ID {}, registry has {}.".format(plugin_id, item.get("plugin_id")))
-    if not found_in_reg and not args.dry_run:
+    # read-modify-write of the registry, keep parallel jobs from overwriting each other
+    def build_registry(content):
+        registry = {}
+        if content is not None:
+            try: registry = json.loads(content.decode("utf-8"))
+            except (TypeError, ValueError): pass
+        if not isinstance(registry.get("used"), list): registry["used"] = []
+        for item in registry.get("used", []):
+            if item.get("siem_plugin_type") == siem_plugin_type:
+                if int(item.get("plugin_id",0)) == plugin_id: info("Plugin ID {} OK.".format(plugin_id)); return None
+                else: die("Conflict! Slug uses ID {}, registry has {}.".format(plugin_id, item.get("plugin_id")))
+        if ctx.dry_run: return None
         section("Auto-registering Plugin ID")
         registry["used"].append({"plugin_id": plugin_id, "siem_plugin_type": siem_plugin_type, "by": layout.get("device", "unknown")})
         registry["used"] = sorted(registry["used"], key=lambda x: int(x.get("plugin_id", 0)))
-        gh_put(gh_repo, gh_branch, GITHUB_TOKEN, registry_path, json.dumps(registry, indent=2, ensure_ascii=False).encode("utf-8"),
-               "[auto][{}] Register plugin_id {} for {}".format(customer_name, plugin_id, siem_plugin_type), sha=reg_sha, debug=args.debug, dry=args.dry_run)
-        info("Plugin Registry push: OK")
+        return json.dumps(registry, indent=2, ensure_ascii=False).encode("utf-8")
+    with ctx.gh_write:
+        if snap.update(registry_path, build_registry,
+                       "[auto][{}] Register plugin_id {} for {}".format(customer_name, plugin_id, siem_plugin_type)) is not None:
+            info("Plugin Registry push: OK")
 
     section("OpenSearch aggregation")
-    titles, _, _ = fetch_titles(es_cfg, q_cfg, debug=args.debug)
+    cred = ctx.cached(("cred", ES_PASSWD_FILE, ES_USER_LOOKUP), lambda: load_cred(ES_PASSWD_FILE, ES_USER_LOOKUP))
+    titles, _, _ = fetch_titles(es_cfg, q_cfg, debug=ctx.debug, cred=cred)
 
     section("Fetch & Merge TSV from GitHub")
-    tsv_obj, _ = gh_get(gh_repo, gh_branch, GITHUB_TOKEN, paths["tsv"], debug=args.debug)
-    existing_rows, tsv_sha = [], None
-    if tsv_obj:
-        tsv_sha = tsv_obj.get("sha")
-        try: content = base64.b64decode(tsv_obj.get("content", "")).decode("utf-8")
-        except (TypeError, base64.binascii.Error): content = ""
-        existing_rows, _ = tsv_parse(content)
-        info("TSV exists (sha={}), rows={}".format(tsv_sha, len(existing_rows)))
-    else: info("TSV not found (new file).")
-    merged_rows, added_rows, _ = tsv_merge(existing_rows, titles)
-    info("Total rows: {}, New events: {}".format(len(merged_rows), len(added_rows)))
-
-    # Push TSV if changed
-    if added_rows or not tsv_obj:
-        tsv_content_bytes = tsv_render(merged_rows, siem_plugin_type, plugin_id, category, kingdom).encode('utf-8')
-        # --- [PATCH] Update Commit Message ---
-        gh_put(gh_repo, gh_branch, GITHUB_TOKEN, paths["tsv"], tsv_content_bytes,
-               "[auto][{}] Update TSV for {}".format(customer_name, siem_plugin_type), sha=tsv_sha, debug=args.debug, dry=args.dry_run)
+    merged = {}
+    def build_tsv(content):
+        existing_rows = []
+        if content is not None:
+            try: existing_rows, _ = tsv_parse(content.decode("utf-8"))
+            except UnicodeDecodeError: pass
+            info("TSV exists, rows={}".format(len(existing_rows)))
+        else: info("TSV not found (new file).")
+        merged_rows, added_rows, _ = tsv_merge(existing_rows, titles)
+        info("Total rows: {}, New events: {}".format(len(merged_rows), len(added_rows)))
+        merged.update(rows=merged_rows, added=added_rows)
+        # Push TSV if changed
+        if not (added_rows or content is None): return None
+        return tsv_render(merged_rows, siem_plugin_type, plugin_id, category, kingdom).encode('utf-8')
+    # --- [PATCH] Update Commit Message ---
+    if snap.update(paths["tsv"], build_tsv, "[auto][{}] Update TSV for {}".format(customer_name, siem_plugin_type)) is not None:
         info("TSV push: OK")
+    merged_rows, added_rows = merged["rows"], merged["added"]
 
     if added_rows and is_active_for_email:
         send_notification_email(customer_name, dircfg.get("HEADER", paths["full_slug"]), added_rows)
     elif added_rows: info("Plugin is Passive or Update Only. Skipping email.")
 
     section("Sync GitHub JSON Dictionary")
-    json_obj, _ = gh_get(gh_repo, gh_branch, GITHUB_TOKEN, paths["json_dict"], debug=args.debug)
     new_json_content_str = write_json_dictionary(merged_rows);
     try: new_data_obj = json.loads(new_json_content_str)
     except (ValueError, JSONDecodeError): die("Failed generate valid new JSON dict."); return 1
-    existing_data_obj = {}
-    if json_obj and json_obj.get("content"):
-        try: existing_data_obj = json.loads(base64.b64decode(json_obj.get("content", "")).decode("utf-8"))
-        except (JSONDecodeError, TypeError, ValueError, base64.binascii.Error): pass
-    if new_data_obj != existing_data_obj:
+    def build_json_dict(content):
+        existing_data_obj = {}
+        if content:
+            try: existing_data_obj = json.loads(content.decode("utf-8"))
+            except (JSONDecodeError, TypeError, ValueError): pass
+        if new_data_obj == existing_data_obj: return None
         info("JSON dict differs. Pushing sync...")
-        # --- [PATCH] Update Commit Message ---
-        gh_put(gh_repo, gh_branch, GITHUB_TOKEN, paths["json_dict"], new_json_content_str.encode('utf-8'),
-               "[auto][{}] Sync JSON dict for {}".format(customer_name, siem_plugin_type), sha=json_obj.get("sha") if json_obj else None, debug=args.debug, dry=args.dry_run)
+        return new_json_content_str.encode('utf-8')
+    # --- [PATCH] Update Commit Message ---
+    if snap.update(paths["json_dict"], build_json_dict,
+                   "[auto][{}] Sync JSON dict for {}".format(customer_name, siem_plugin_type)) is not None:
         info("JSON Dict push: OK")
     else: info("JSON Dict already synced.")
 
     section("Update 70.conf (if missing)")
-    conf70_obj, _ = gh_get(gh_repo, gh_branch, GITHUB_TOKEN, paths["conf70"], debug=args.debug)
-    if not conf70_obj:
+    if not snap.exists(paths["conf70"]):
         info("70.conf missing. Generating and pushing...")
         if not LOGSTASH_JSON_DICT_DIR: die("LOGSTASH_JSON_DICT_DIR env var not set."); return 1
         json_path_on_server = os.path.join(LOGSTASH_JSON_DICT_DIR, "{}_plugin-sids.json".format(siem_plugin_type))
@@ -717,32 +929,33 @@ def main():
         if not device_name: die("Layout device missing."); return 1
         conf70_text = generate_conf70_from_template(template70_path, plugin_id, device_name, siem_plugin_type, field_no_keyword, category, json_path_on_server)
         # --- [PATCH] Update Commit Message ---
-        gh_put(gh_repo, gh_branch, GITHUB_TOKEN, paths["conf70"], conf70_text.encode('utf-8'),
-               "[auto][{}] Create 70.conf for {}".format(customer_name, siem_plugin_type), sha=None, debug=args.debug, dry=args.dry_run)
-        info("70.conf push: CREATED")
+        # created by another writer in the meantime: keep theirs
+        if snap.update(paths["conf70"], lambda content: conf70_text.encode('utf-8') if content is None else None,
+                       "[auto][{}] Create 70.conf for {}".format(customer_name, siem_plugin_type)) is not None:
+            info("70.conf push: CREATED")
+        else: info("70.conf already exists.")
     else: info("70.conf already exists.")
 
     section("Sync GitHub Directives")
-    template_map = load_directive_templates("./directive_rules.json")
-    dir_obj, _ = gh_get(gh_repo, gh_branch, GITHUB_TOKEN, paths["directive"], debug=args.debug)
-    existing_dir, dir_sha = (OrderedDict([("directives", [])]), None)
-    if dir_obj:
-        dir_sha = dir_obj.get("sha")
-        try: existing_dir = json.loads(base64.b64decode(dir_obj.get("content","")).decode("utf-8"), object_pairs_hook=OrderedDict)
-        except (JSONDecodeError, ValueError, TypeError, base64.binascii.Error): pass
-    if not isinstance(existing_dir.get("directives"), list): existing_dir["directives"] = []
-
+    template_map = ctx.cached(("directive_templates", "./directive_rules.json"),
+                              lambda: load_directive_templates("./directive_rules.json"))
     directive_header = dircfg.get("HEADER")
     if not directive_header: directive_header = siem_plugin_type
 
-    updated_dir_json, appended, add_count, _ = directive_append(existing_dir, template_map, template_id, plugin_id, directive_header, category, kingdom, disabled, merged_rows)
-    if appended:
+    def build_directive(content):
+        existing_dir = OrderedDict([("directives", [])])
+        if content is not None:
+            try: existing_dir = json.loads(content.decode("utf-8"), object_pairs_hook=OrderedDict)
+            except (JSONDecodeError, ValueError, TypeError): pass
+        if not isinstance(existing_dir.get("directives"), list): existing_dir["directives"] = []
+        updated_dir_json, appended, add_count, _ = directive_append(existing_dir, template_map, template_id, plugin_id, directive_header, category, kingdom, disabled, merged_rows)
+        if not appended: return None
         info("Directives differ ({} new). Pushing sync...".format(add_count))
-        directive_bytes = json.dumps(updated_dir_json, indent=2, ensure_ascii=False).encode('utf-8')
-        # --- [PATCH] Update Commit Message ---
-        gh_put(gh_repo, gh_branch, GITHUB_TOKEN, paths["directive"], directive_bytes,
-               "[auto][{}] Sync directives for {}".format(customer_name, siem_plugin_type), sha=dir_sha, debug=args.debug, dry=args.dry_run)
-        info("Directives push: OK")
+        return json.dumps(updated_dir_json, indent=2, ensure_ascii=False).encode('utf-8')
+    # --- [PATCH] Update Commit Message ---
+    appended = snap.update(paths["directive"], build_directive,
+                           "[auto][{}] Sync directives for {}".format(customer_name, siem_plugin_type)) is not None
+    if appended: info("Directives push: OK")
     else: info("Directives already synced.")
 
     made_local_changes = False 
@@ -750,18 +963,21 @@ def main():
 
     if needs_distribution and (added_rows or appended):
         info("Distribution enabled (Target: {}) and changes detected...".format(distribution_target))
-        if distribution_target == "Logstash":
-            made_local_changes = distribute_logstash_local(merged_rows, paths, cfg, plugin_id, template_map, template_id, args)
-        elif distribution_target == "Vector":
-            made_local_changes = distribute_vector_local(merged_rows, paths, cfg, args)
-        else:
-            warn("Target '{}' unknown. Skipping local distribution.".format(distribution_target))
+        # serialized: jobs can share the frontend pod directive file and local dictionaries
+        with ctx.local_write:
+            if distribution_target == "Logstash":
+                made_local_changes = distribute_logstash_local(merged_rows, paths, cfg, plugin_id, template_map, template_id, ctx)
+            elif distribution_target == "Vector":
+                made_local_changes = distribute_vector_local(merged_rows, paths, cfg, ctx)
+            else:
+                warn("Target '{}' unknown. Skipping local distribution.".format(distribution_target))
     elif needs_distribution:
         info("Distribution enabled, but no new events. Skipping local.")
     else: 
         info("Plugin is 'Update Only'. Skipping local.")
 
     section("Summary")
+    info(snap.summary())
     info("DONE.")
 
     if needs_distribution and made_local_changes:
@@ -771,6 +987,10 @@ def main():
         info("No restart needed.")
         return 0
 
+def main():
+    args = parse_args()
+    return run_job(CFG_PATH, JobContext(dry_run=args.dry_run, debug=args.debug))
+
 if __name__ == "__main__":
     exit_code = 99
     try: exit_code = main()
@@ -26,6 +26,10 @@ except Exception:
     io = None
 from requests.auth import HTTPBasicAuth
 
+# Client OpenSearch bersama (keep-alive pool, retry 429/503, timing per endpoint)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "lib"))
+import opensearch_client
+
 # ====== CONFIG ENV ======
 ES_HOST = os.getenv("ES_HOST")
 VERIFY_TLS = os.getenv("VERIFY_TLS", "false").lower() == "true"
@@ -607,10 +611,10 @@ def build_query(field_name, size, filters, time_range=None):
     if mf: q["query"]={"bool":{"filter":mf}}
     return q
 
-def do_request(url, field_name, size, filters, auth, time_range=None):
+def do_request(search_path, field_name, size, filters, auth, time_range=None):
     body=build_query(field_name, size, filters, time_range=time_range)
-    return requests.post(url, auth=auth, headers={"Content-Type":"application/json"},
-                         data=json.dumps(body), timeout=TIMEOUT, verify=VERIFY_TLS)
+    client=opensearch_client.get_client(ES_HOST, auth=auth, verify=VERIFY_TLS, timeout=TIMEOUT)
+    return client.request("POST", search_path, data=json.dumps(body))
 
 def explain_http_error(resp):
     try: err=resp.json()
@@ -1477,7 +1481,7 @@ def process_preset(preset_name, preset_config, auth):
     print("\n=== PENGATURAN RENTANG WAKTU ===")
     print("[INFO] Skrip diatur untuk menarik 'Full Time'.")
 
-    url = "{}/{}/_search".format(ES_HOST.rstrip("/"), index_pattern)
+    search_path = "{}/_search".format(index_pattern)
 
     data = {} 
     try:
@@ -1487,7 +1491,7 @@ def process_preset(preset_name, preset_config, auth):
         query_success = False
 
         try:
-            r = do_request(url, field_name, size, filters, auth, time_range=time_range_config)
+            r = do_request(search_path, field_name, size, filters, auth, time_range=time_range_config)
             if r.status_code < 300:
                 data_check = r.json()
                 if data_check.get("aggregations",{}).get("event_names",{}).get("buckets",[]):
@@ -1508,7 +1512,7 @@ def process_preset(preset_name, preset_config, auth):
                 print("[WARN] Query awal gagal/kosong. Mencoba fallback dengan .keyword...")
                 print("[QUERY] Menjalankan agregasi terms untuk field: '{}'".format(alt_field))
                 try:
-                    r2 = do_request(url, alt_field, size, alt_filters, auth, time_range=time_range_config)
+                    r2 = do_request(search_path, alt_field, size, alt_filters, auth, time_range=time_range_config)
                     if r2.status_code < 300:
                         data_check = r2.json()
                         if data_check.get("aggregations",{}).get("event_names",{}).get("buckets",[]):
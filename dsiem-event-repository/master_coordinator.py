@@ -6,6 +6,9 @@ import json
 import subprocess
 import sys
 import io # Pastikan io diimport
+import threading
+import time
+import traceback
 from datetime import datetime
 
 # --- Penyesuaian Kompatibilitas Py2/Py3 ---
@@ -21,6 +24,14 @@ except NameError:                         # Jika gagal (berarti Py2)
 
 JOBS_FILE = 'master_jobs.json'
 UPDATER_SCRIPT = 'auto-updated.py'
+# "inprocess": job dijalankan sebagai fungsi (run_job) di proses ini, session HTTP,
+# template & config dipakai ulang antar job. "subprocess": mode lama, 1 proses per job.
+COORDINATOR_MODE = os.getenv("COORDINATOR_MODE", "inprocess").strip().lower()
+# Jumlah job yang jalan bersamaan (sebagian besar waktu job = menunggu GitHub/OpenSearch).
+# 1 (default) = serial seperti dulu, output langsung tampil tanpa buffer. >1 hanya
+# berlaku di mode in-process (lock tulis GitHub/distribusi lokal ada di JobContext);
+# mode subprocess selalu 1 worker.
+COORDINATOR_WORKERS = max(1, int(os.getenv("COORDINATOR_WORKERS") or 1))
 
 # --- [DIPERBAIKI] Konfigurasi Restart (membaca semua var) ---
 LOGSTASH_HOME     = os.getenv("LOGSTASH_HOME")
@@ -80,6 +91,142 @@ def restart_vector_stack():
     safe_run_cmd(["kubectl", "delete", "pod", BACKEND_POD, FRONTEND_POD])
 # --- AKHIR FUNGSI HELPER RESTART ---
 
+# --- Eksekusi Job (in-process / subprocess) ---
+def load_updater(path):
+    """Import auto-updated.py sebagai modul (nama file mengandung '-')."""
+    try:
+        import importlib.util
+        spec = importlib.util.spec_from_file_location("auto_updated", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    except ImportError: # Py2: tidak ada importlib.util
+        import imp
+        module = imp.load_source("auto_updated", path)
+    if not hasattr(module, "run_job") or not hasattr(module, "JobContext"):
+        raise ImportError("'{}' tidak punya run_job/JobContext".format(path))
+    return module
+
+def run_job_inprocess(updater, ctx, config_path):
+    """Return code sama dengan exit code worker: 0 sukses, 5 butuh restart, lainnya gagal."""
+    rc = updater.run_job(config_path, ctx)
+    sys.stdout.flush()
+    return rc if isinstance(rc, int) else 1
+
+def run_job_subprocess(config_path):
+    command = [sys.executable, UPDATER_SCRIPT]
+    env = dict(os.environ, SYNC_CFG=config_path)
+    # Jalankan worker dan tunggu selesai (mode subprocess selalu serial)
+    process = subprocess.Popen(command, env=env)
+    process.wait() # Tunggu worker selesai
+    return process.returncode
+
+def run_job_entry(i, total, config_path, updater, ctx):
+    """
+    Satu entri master_jobs.json: cek config, baca target distribusi, jalankan worker.
+    Return (returncode, job_target). returncode None = dilewati/error (sudah di-log).
+    """
+    log("\n--- Menjalankan Pekerjaan {}/{} (Config: {}) ---".format(i, total, config_path))
+
+    if not os.path.exists(config_path):
+        log("[WARN] File konfigurasi '{}' tidak ditemukan. Dilewati.".format(config_path))
+        return None, None
+
+    # --- [DIPERBAIKI] Baca config SEBELUM menjalankan worker ---
+    job_target = "None"
+    try:
+        with io.open(config_path, 'r', encoding='utf-8') as f_cfg:
+            job_cfg = json.load(f_cfg)
+            # Ambil target, default ke 'Logstash' jika tidak ada (untuk kompatibilitas lama)
+            job_target = job_cfg.get("layout", {}).get("distribution_target", "Logstash") 
+    except Exception as e:
+        log("[WARN] Gagal membaca config '{}': {}. Mengasumsikan target 'Logstash'.".format(config_path, e))
+        job_target = "Logstash" # Default jika file config rusak
+    # --- AKHIR PERBAIKAN ---
+
+    try:
+        if updater is not None:
+            return run_job_inprocess(updater, ctx, config_path), job_target
+        return run_job_subprocess(config_path), job_target
+    except Exception as e:
+        log("[FATAL] Error saat menjalankan job untuk '{}': {}".format(config_path, e))
+        traceback.print_exc() # Cetak traceback
+        return None, job_target
+# --- AKHIR EKSEKUSI JOB ---
+
+# --- Worker Pool + Output Berurutan ---
+_JOB_LOCAL = threading.local()
+
+class JobOutput(object):
+    """
+    Pengganti sys.stdout/sys.stderr selama pool jalan: tulisan dari thread job
+    masuk ke buffer job tersebut, thread lain (main) langsung ke stream asli.
+    """
+    def __init__(self, real):
+        self.real = real
+
+    def write(self, text):
+        buf = getattr(_JOB_LOCAL, "buf", None)
+        if buf is None: self.real.write(text)
+        else: buf.append(text)
+
+    def flush(self):
+        if getattr(_JOB_LOCAL, "buf", None) is None: self.real.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.real, name)
+
+def run_pool(jobs, workers, updater, ctx):
+    """
+    Jalankan jobs di `workers` thread. Yield (i, config_path, returncode,
+    job_target, output, detik) berurutan sesuai master_jobs.json; job
+    berikutnya tetap jalan selama job sebelumnya belum selesai dicetak.
+    """
+    total = len(jobs)
+    workers = max(1, min(int(workers), total or 1))
+    buffered = workers > 1
+    results = [None] * total
+    done = [threading.Event() for _ in jobs]
+    state = {"next": 0}
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            with lock:
+                i = state["next"]; state["next"] += 1
+            if i >= total: return
+            _JOB_LOCAL.buf = [] if buffered else None
+            t0 = time.time()
+            rc, target = None, None
+            try:
+                rc, target = run_job_entry(i + 1, total, jobs[i], updater, ctx)
+            except Exception as e: # jaga-jaga, run_job_entry sudah menangkap error job
+                log("[FATAL] Error tak terduga pada pekerjaan '{}': {}".format(jobs[i], e))
+            finally:
+                output = "".join(_JOB_LOCAL.buf or [])
+                _JOB_LOCAL.buf = None
+                results[i] = (rc, target, output, time.time() - t0)
+                done[i].set()
+
+    real_out, real_err = sys.stdout, sys.stderr
+    if buffered:
+        sys.stdout, sys.stderr = JobOutput(real_out), JobOutput(real_err)
+    try:
+        threads = []
+        for n in range(workers):
+            t = threading.Thread(target=worker, name="job-worker-%d" % n)
+            t.daemon = True
+            t.start(); threads.append(t)
+        for i in range(total):
+            while not done[i].is_set(): done[i].wait(1.0)
+            rc, target, output, sec = results[i]
+            if output:
+                sys.stdout.write(output)
+                sys.stdout.flush()
+            yield i + 1, jobs[i], rc, target, output, sec
+    finally:
+        sys.stdout, sys.stderr = real_out, real_err
+# --- AKHIR WORKER POOL ---
+
 def main():
     """Fungsi utama untuk menjalankan semua pekerjaan auto-update."""
     log("=== Memulai Master Koordinator Auto-Update ===")
@@ -104,64 +251,66 @@ def main():
 
     log("Ditemukan {} pekerjaan untuk dieksekusi.".format(len(jobs)))
 
+    updater, ctx = None, None
+    if COORDINATOR_MODE != "subprocess":
+        try:
+            updater = load_updater(UPDATER_SCRIPT)
+            ctx = updater.JobContext()  # satu context untuk semua job di run ini
+            log("Mode eksekusi: in-process (run_job).")
+        except Exception as e:
+            log("[WARN] Gagal memuat '{}' sebagai modul: {}. Fallback ke subprocess.".format(UPDATER_SCRIPT, e))
+            updater = None
+    if updater is None:
+        log("Mode eksekusi: subprocess (1 proses per job).")
+
     success_count = 0
     fail_count = 0
     # --- [DIPERBAIKI] Menggunakan set untuk melacak target restart ---
     restart_targets = set() 
     # --- AKHIR PERBAIKAN ---
 
-    for i, config_path in enumerate(jobs, 1):
-        log("\n--- Menjalankan Pekerjaan {}/{} (Config: {}) ---".format(i, len(jobs), config_path))
+    workers = min(COORDINATOR_WORKERS, len(jobs)) or 1
+    if updater is None and workers > 1:
+        # antar proses tidak ada lock bersama (registry GitHub, file directive di pod)
+        log("[WARN] COORDINATOR_WORKERS={} diabaikan di mode subprocess, job dijalankan serial.".format(COORDINATOR_WORKERS))
+        workers = 1
+    log("Worker paralel: {} (COORDINATOR_WORKERS={}).".format(workers, COORDINATOR_WORKERS))
+    t_start = time.time()
+    job_sec_total = 0.0
+    slowest = (-1.0, "")
 
-        if not os.path.exists(config_path):
-            log("[WARN] File konfigurasi '{}' tidak ditemukan. Dilewati.".format(config_path))
+    for i, config_path, returncode, job_target, _, sec in run_pool(jobs, workers, updater, ctx):
+        job_sec_total += sec
+        slowest = max(slowest, (sec, config_path))
+        if returncode is None: # dilewati / error fatal, sudah di-log oleh job
             fail_count += 1
             continue
 
-        # --- [DIPERBAIKI] Baca config SEBELUM menjalankan worker ---
-        job_target = "None"
-        try:
-            with io.open(config_path, 'r', encoding='utf-8') as f_cfg:
-                job_cfg = json.load(f_cfg)
-                # Ambil target, default ke 'Logstash' jika tidak ada (untuk kompatibilitas lama)
-                job_target = job_cfg.get("layout", {}).get("distribution_target", "Logstash") 
-        except Exception as e:
-            log("[WARN] Gagal membaca config '{}': {}. Mengasumsikan target 'Logstash'.".format(config_path, e))
-            job_target = "Logstash" # Default jika file config rusak
-        # --- AKHIR PERBAIKAN ---
-
-        try:
-            command = [sys.executable, UPDATER_SCRIPT]
-            # Jalankan worker dan tunggu selesai
-            process = subprocess.Popen(command, env=dict(os.environ, SYNC_CFG=config_path))
-            process.wait() # Tunggu worker selesai
-
-            # Cek return code dari worker
-            if process.returncode == 0:
-                log("--- Pekerjaan '{}' sukses (tanpa perlu restart). ---\n".format(config_path))
-                success_count += 1
-            elif process.returncode == 5: # Sinyal restart diterima
-                log("--- Pekerjaan '{}' sukses (membutuhkan restart stack). ---\n".format(config_path))
-                success_count += 1
-                # --- [DIPERBAIKI] Catat target yg perlu di-restart ---
-                if job_target in ["Logstash", "Vector"]:
-                    log("[INFO] Menandai '{}' untuk di-restart.".format(job_target))
-                    restart_targets.add(job_target)
-                else:
-                    log("[WARN] Menerima sinyal restart, tapi target '{}' tidak dikenali.".format(job_target))
-                # --- AKHIR PERBAIKAN ---
+        # Cek return code dari worker
+        if returncode == 0:
+            log("--- Pekerjaan '{}' sukses (tanpa perlu restart, {:.1f}s). ---\n".format(config_path, sec))
+            success_count += 1
+        elif returncode == 5: # Sinyal restart diterima
+            log("--- Pekerjaan '{}' sukses (membutuhkan restart stack, {:.1f}s). ---\n".format(config_path, sec))
+            success_count += 1
+            # --- [DIPERBAIKI] Catat target yg perlu di-restart ---
+            if job_target in ["Logstash", "Vector"]:
+                log("[INFO] Menandai '{}' untuk di-restart.".format(job_target))
+                restart_targets.add(job_target)
             else:
-                log("[ERROR] Pekerjaan '{}' gagal (return code {}). ---\n".format(config_path, process.returncode))
-                fail_count += 1
-
-        except Exception as e:
-            log("[FATAL] Error saat menjalankan subprocess untuk '{}': {}".format(config_path, e))
-            import traceback # Import traceback untuk detail error
-            traceback.print_exc() # Cetak traceback
+                log("[WARN] Menerima sinyal restart, tapi target '{}' tidak dikenali.".format(job_target))
+            # --- AKHIR PERBAIKAN ---
+        else:
+            log("[ERROR] Pekerjaan '{}' gagal (return code {}). ---\n".format(config_path, returncode))
             fail_count += 1
 
+    wall_sec = time.time() - t_start
     log("=== Master Koordinator Selesai ===")
     log("Ringkasan: {} sukses, {} gagal.".format(success_count, fail_count))
+    log("Waktu: wall {:.1f}s vs total waktu job {:.1f}s ({} worker, speedup {:.1f}x).".format(
+        wall_sec, job_sec_total, workers, job_sec_total / wall_sec if wall_sec > 0 else 1.0))
+    if slowest[1]:
+        log("Job terlama: '{}' ({:.1f}s).".format(slowest[1], slowest[0]))
 
     # --- [DIPERBAIKI] Jalankan restart berdasarkan target ---
     if restart_targets:
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import os, sys, threading, time, unittest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import master_coordinator as mc
+
+class RunPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.real_entry = mc.run_job_entry
+        self.running = self.peak = 0
+        self.lock = threading.Lock()
+
+    def tearDown(self):
+        mc.run_job_entry = self.real_entry
+
+    def fake_entry(self, i, total, config_path, updater, ctx):
+        with self.lock:
+            self.running += 1; self.peak = max(self.peak, self.running)
+        try:
+            print("start %s" % config_path)
+            time.sleep(float(config_path.split(":")[1]))   # job awal paling lambat
+            print("end %s" % config_path)
+            return (5 if config_path.startswith("r") else 0), "Logstash"
+        finally:
+            with self.lock: self.running -= 1
+
+    def run_pool(self, jobs, workers):
+        mc.run_job_entry = self.fake_entry
+        return list(mc.run_pool(jobs, workers, None, None))
+
+    def test_results_in_job_order(self):
+        jobs = ["a:0.3", "r:0.1", "c:0.0", "d:0.2"]
+        results = self.run_pool(jobs, 3)
+        self.assertEqual([(i, path, rc) for i, path, rc, _, _, _ in results],
+                         [(1, "a:0.3", 0), (2, "r:0.1", 5), (3, "c:0.0", 0), (4, "d:0.2", 0)])
+        self.assertGreater(self.peak, 1)
+
+    def test_output_not_interleaved(self):
+        results = self.run_pool(["a:0.2", "b:0.0", "c:0.1"], 3)
+        for _, path, _, _, output, _ in results:
+            self.assertEqual(output, "start %s\nend %s\n" % (path, path))
+
+    def test_single_worker_is_serial(self):
+        results = self.run_pool(["a:0.05", "b:0.0"], 1)
+        self.assertEqual(self.peak, 1)
+        self.assertEqual([r[4] for r in results], ["", ""])   # tanpa buffer, langsung ke stdout
+
+    def test_child_process_output_in_job_buffer(self):
+        au = mc.load_updater(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "auto-updated.py"))
+        def entry(i, total, config_path, updater, ctx):
+            return au.run_cmd([sys.executable, "-c", "print('child %s')" % config_path]), "Logstash"
+        mc.run_job_entry = entry
+        results = list(mc.run_pool(["a", "b"], 2, None, None))
+        for _, path, rc, _, output, _ in results:
+            self.assertEqual(rc, 0)
+            self.assertIn("child %s" % path, output)
+
+class JobContextCachedTest(unittest.TestCase):
+    def setUp(self):
+        self.ctx = mc.load_updater(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "auto-updated.py")).JobContext()
+
+    def test_loaded_once_and_other_keys_not_blocked(self):
+        calls, release = [], threading.Event()
+        def slow():
+            calls.append(1); release.wait(5); return "tree"
+        threads = [threading.Thread(target=self.ctx.cached, args=("snapshot", slow)) for _ in range(3)]
+        for t in threads: t.start()
+        self.assertEqual(self.ctx.cached("cred", lambda: "secret"), "secret")   # tidak menunggu "snapshot"
+        release.set()
+        for t in threads: t.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(self.ctx.cached("snapshot", slow), "tree")
+
+    def test_failed_loader_not_cached(self):
+        def boom(): raise ValueError("down")
+        self.assertRaises(ValueError, self.ctx.cached, "k", boom)
+        self.assertEqual(self.ctx.cached("k", lambda: 1), 1)
+
+if __name__ == "__main__":
+    unittest.main()
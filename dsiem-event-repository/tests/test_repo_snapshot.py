@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+import base64, io, json, os, shutil, sys, tempfile, unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def load_updater():
+    path = os.path.join(HERE, "..", "auto-updated.py")
+    try:
+        import importlib.util
+        spec = importlib.util.spec_from_file_location("auto_updated", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    except ImportError: # Py2
+        import imp
+        module = imp.load_source("auto_updated", path)
+    return module
+
+au = load_updater()
+
+class _Resp(object):
+    def __init__(self, status_code, body):
+        self.status_code, self.body, self.text = status_code, body, json.dumps(body)
+        self.headers = {}
+
+    def json(self):
+        return self.body
+
+class _Session(object):
+    def __init__(self, blobs):
+        self.blobs, self.urls = blobs, []
+
+    def get(self, url, **kwargs):
+        self.urls.append(url)
+        sha = url.rsplit("/", 1)[-1]
+        if sha not in self.blobs: return _Resp(404, {"message": "Not Found"})
+        return _Resp(200, {"content": base64.b64encode(self.blobs[sha]).decode("ascii"), "encoding": "base64"})
+
+class GitBlobShaTest(unittest.TestCase):
+    def test_matches_git_hash_object(self):
+        self.assertEqual(au.git_blob_sha(b""), "e69de29bb2d1d6434b8b29ae775ad8c2e48c5391")
+        self.assertEqual(au.git_blob_sha(b"hello\n"), "ce013625030ba8dba906f756967f9e9ca394464a")
+
+class BlobCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.data = b'{"directives": []}\n'
+        self.sha = au.git_blob_sha(self.data)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def snapshot(self, session):
+        return au.RepoSnapshot("org/repo", "main", "token", session=session, cache_dir=self.dir)
+
+    def write_cache(self, data):
+        with io.open(os.path.join(self.dir, self.sha), "wb") as f: f.write(data)
+
+    def test_disk_hit_skips_download(self):
+        self.write_cache(self.data)
+        session = _Session({})
+        snap = self.snapshot(session)
+        self.assertEqual(snap.blob(self.sha), self.data)
+        self.assertEqual(session.urls, [])
+        self.assertEqual(snap.stats["blob_disk"], 1)
+
+    def test_corrupt_cache_is_downloaded_again(self):
+        self.write_cache(b"truncated")
+        session = _Session({self.sha: self.data})
+        snap = self.snapshot(session)
+        self.assertEqual(snap.blob(self.sha), self.data)
+        self.assertEqual(snap.stats["blob_get"], 1)
+        with io.open(os.path.join(self.dir, self.sha), "rb") as f:
+            self.assertEqual(f.read(), self.data)   # cache diperbaiki
+
+    def test_memory_hit(self):
+        session = _Session({self.sha: self.data})
+        snap = self.snapshot(session)
+        snap.blob(self.sha); snap.blob(self.sha)
+        self.assertEqual((snap.stats["blob_get"], snap.stats["blob_mem"]), (1, 1))
+
+    def test_get_answers_from_tree(self):
+        snap = self.snapshot(_Session({self.sha: self.data}))
+        snap.files = {"a/b.json": self.sha}
+        doc, _ = snap.get("/a/b.json")
+        self.assertEqual(base64.b64decode(doc["content"]), self.data)
+        self.assertEqual(snap.get("a/missing.json"), (None, None))
+        self.assertFalse(snap.exists("a/missing.json"))
+
+class _PutSession(object):
+    """PUT answers with the given statuses; the Contents API returns `current`."""
+    def __init__(self, current, *statuses):
+        self.current, self.statuses, self.puts = current, list(statuses), []
+
+    def put(self, url, **kwargs):
+        payload = json.loads(kwargs["data"])
+        self.puts.append((payload.get("sha"), base64.b64decode(payload["content"])))
+        code = self.statuses.pop(0)
+        return _Resp(code, {"content": {"sha": "new"}} if code < 300 else {"message": "Invalid request. \"sha\" wasn't supplied."})
+
+    def get(self, url, **kwargs):
+        if self.current is None: return _Resp(404, {"message": "Not Found"})
+        return _Resp(200, {"sha": "current", "content": base64.b64encode(self.current).decode("ascii")})
+
+def _registry(*ids):
+    return json.dumps({"used": [{"plugin_id": i} for i in ids]}).encode("utf-8")
+
+def _add_id(new_id):
+    def build(content):
+        registry = json.loads(content.decode("utf-8"))
+        registry["used"].append({"plugin_id": new_id})
+        return json.dumps(registry).encode("utf-8")
+    return build
+
+class UpdateConflictTest(unittest.TestCase):
+    def snapshot(self, session, files):
+        snap = au.RepoSnapshot("org/repo", "main", "token", session=session)
+        snap.files = dict((path, au.git_blob_sha(data)) for path, data in files.items())
+        snap._blobs = dict((au.git_blob_sha(data), data) for data in files.values())
+        return snap
+
+    def test_stale_sha_rebuilds_from_current_content(self):
+        old = _registry(1)
+        session = _PutSession(_registry(1, 2), 409, 201)
+        snap = self.snapshot(session, {"plugin_id.json": old})
+        res = snap.update("plugin_id.json", _add_id(3), "msg")
+        self.assertEqual(res["content"]["sha"], "new")
+        self.assertEqual([sha for sha, _ in session.puts], [au.git_blob_sha(old), "current"])
+        # entri 2 dari penulis lain tetap ada
+        self.assertEqual(json.loads(session.puts[1][1].decode("utf-8")), json.loads(_registry(1, 2, 3).decode("utf-8")))
+        self.assertEqual(snap.sha("plugin_id.json"), "new")
+
+    def test_create_keeps_file_created_meanwhile(self):
+        session = _PutSession(b"theirs", 422)
+        snap = self.snapshot(session, {})
+        res = snap.update("a/70.conf", lambda content: b"ours" if content is None else None, "msg")
+        self.assertIsNone(res)
+        self.assertEqual(session.puts, [(None, b"ours")])
+        self.assertEqual(snap.sha("a/70.conf"), "current")
+
+    def test_second_conflict_dies(self):
+        session = _PutSession(_registry(1, 2), 409, 409)
+        snap = self.snapshot(session, {"plugin_id.json": _registry(1)})
+        self.assertRaises(SystemExit, snap.update, "plugin_id.json", _add_id(3), "msg")
+        self.assertEqual(len(session.puts), 2)
+
+    def test_other_errors_die_without_retry(self):
+        session = _PutSession(None, 500)
+        snap = self.snapshot(session, {"plugin_id.json": _registry(1)})
+        self.assertRaises(SystemExit, snap.update, "plugin_id.json", _add_id(3), "msg")
+        self.assertEqual(len(session.puts), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+
+"""
+opensearch_client.py  (Python 2.7 / 3 + requests)
+
+Client HTTP OpenSearch bersama untuk:
+- opensearch-reindex/reindex.py, opensearch-reindex/remap.py
+- dsiem-event-repository/auto-updated.py (fetch_titles)
+- dsiem-event-repository/build/batch.py (do_request)
+
+Fitur:
+- requests.Session per host (keep-alive + connection pool), tidak ada
+  handshake TCP/TLS baru di setiap request.
+- Retry dengan exponential backoff (menghormati Retry-After): 429/503
+  untuk semua method (request ditolak, belum dieksekusi), 502/504 dan error
+  koneksi hanya untuk method idempoten (GET/HEAD/DELETE). POST _reindex,
+  _bulk dst. bisa saja sudah jalan di belakang gateway, tidak diulang.
+- (Opsional) gzip body request + minta response gzip.
+- Akuntansi latensi per endpoint. Set env OS_HTTP_TIMINGS=1 untuk
+  mencetak ringkasan saat proses selesai, atau OS_HTTP_TIMINGS=<file.json>
+  untuk sekaligus menyimpannya ke file.
+
+Pemakaian dari script (folder lib/ ada di root repo):
+  sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lib"))
+  import opensearch_client
+  client = opensearch_client.get_client(host, auth=(user, pwd), verify=False, timeout=180)
+  r = client.request("GET", "_cat/indices", params={"format": "json"})
+"""
+
+import atexit, gzip, io, json, os, threading, time
+import requests
+from requests.adapters import HTTPAdapter
+
+# Matikan warning TLS (cluster internal umumnya self-signed, VERIFY_TLS=False)
+try:
+    from requests.packages.urllib3.exceptions import InsecureRequestWarning
+    requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
+except Exception:
+    pass
+
+RETRY_STATUS = (429, 503)               # ditolak cluster: aman diulang untuk semua method
+RETRY_STATUS_IDEMPOTENT = (502, 504)    # gateway: request mungkin sudah dieksekusi
+# PUT tidak termasuk: PUT <index> yang diulang gagal resource_already_exists
+IDEMPOTENT_METHODS = ("GET", "HEAD", "DELETE")
+
+def should_retry(method, status_code):
+    """Status ini boleh di-retry untuk method ini? (status_code None = error koneksi)."""
+    if status_code is None or status_code in RETRY_STATUS_IDEMPOTENT:
+        return method in IDEMPOTENT_METHODS
+    return status_code in RETRY_STATUS
+TIMINGS_ENV = "OS_HTTP_TIMINGS"
+
+def _endpoint_key(method, path):
+    # "idx-2025.01.01/_count" -> "GET /*/_count" supaya statistik per endpoint, bukan per index.
+    # Sub-API setelah segmen "_" (mis. _cat/indices, _ingest/pipeline) tetap ditulis.
+    segs = [s for s in path.split("?", 1)[0].strip("/").split("/") if s]
+    out = []
+    for i, s in enumerate(segs):
+        keep = s.startswith("_") or (i > 0 and segs[i - 1].startswith("_") and s.isalpha() and s.islower())
+        out.append(s if keep else "*")
+    return "%s /%s" % (method, "/".join(out))
+
+def _gzip_bytes(data):
+    if not isinstance(data, bytes):
+        data = data.encode("utf-8")
+    buf = io.BytesIO()
+    with gzip.GzipFile(fileobj=buf, mode="wb") as f:
+        f.write(data)
+    return buf.getvalue()
+
+class OpenSearchClient(object):
+    def __init__(self, host, auth=None, verify=False, timeout=180, retries=3, backoff=1.0,
+                 gzip_requests=False, pool_size=10, name=None):
+        self.host = host.rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.gzip_requests = gzip_requests
+        self.name = name or self.host
+        self.session = requests.Session()
+        self.session.auth = auth
+        self.session.verify = verify
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._lock = threading.Lock()
+        self.stats = {}   # endpoint -> {"calls", "total_sec", "max_sec", "retries", "errors"}
+
+    def url(self, path):
+        if not path.startswith("/"): path = "/" + path
+        return self.host + path
+
+    def request(self, method, path, **kwargs):
+        method = method.upper()
+        headers = dict(kwargs.pop("headers", None) or {})
+        headers.setdefault("Content-Type", "application/json")
+        kwargs.setdefault("timeout", self.timeout)
+        if self.gzip_requests:
+            headers.setdefault("Accept-Encoding", "gzip")
+            if kwargs.get("data") is not None and len(kwargs["data"]) > 1024:
+                kwargs["data"] = _gzip_bytes(kwargs["data"])
+                headers["Content-Encoding"] = "gzip"
+
+        key = _endpoint_key(method, path)
+        attempt = 0
+        t0 = time.time()
+        while True:
+            try:
+                r = self.session.request(method=method, url=self.url(path), headers=headers, **kwargs)
+            except requests.exceptions.ConnectionError:
+                if attempt >= self.retries or not should_retry(method, None):
+                    self._record(key, time.time() - t0, attempt, error=True)
+                    raise
+                delay = self.backoff * (2 ** attempt)
+            else:
+                if attempt >= self.retries or not should_retry(method, r.status_code):
+                    self._record(key, time.time() - t0, attempt, error=r.status_code >= 500)
+                    return r
+                delay = self.backoff * (2 ** attempt)
+                try: delay = max(delay, float(r.headers.get("Retry-After") or 0))
+                except ValueError: pass
+            attempt += 1
+            time.sleep(min(delay, 30))
+
+    def _record(self, key, sec, retries, error=False):
+        with self._lock:
+            st = self.stats.setdefault(key, {"calls": 0, "total_sec": 0.0, "max_sec": 0.0, "retries": 0, "errors": 0})
+            st["calls"] += 1
+            st["total_sec"] += sec
+            st["max_sec"] = max(st["max_sec"], sec)
+            st["retries"] += retries
+            st["errors"] += 1 if error else 0
+
+    def timing_report(self):
+        with self._lock:
+            rows = sorted(self.stats.items(), key=lambda kv: -kv[1]["total_sec"])
+            rows = [(k, dict(v)) for k, v in rows]
+        lines = ["=== Timing HTTP (%s) ===" % self.name,
+                 "  %-45s %7s %10s %9s %9s %7s %6s" % ("endpoint", "calls", "total", "avg", "max", "retry", "error")]
+        total_calls = total_sec = 0
+        for key, st in rows:
+            total_calls += st["calls"]; total_sec += st["total_sec"]
+            lines.append("  %-45s %7d %9.2fs %7.0fms %7.0fms %7d %6d" % (
+                key, st["calls"], st["total_sec"], 1000.0 * st["total_sec"] / st["calls"],
+                1000.0 * st["max_sec"], st["retries"], st["errors"]))
+        lines.append("  %-45s %7d %9.2fs" % ("TOTAL", total_calls, total_sec))
+        return "\n".join(lines)
+
+    def dump_timings(self, path=None):
+        print(self.timing_report())
+        if path:
+            try:
+                with open(path, "w") as f:
+                    json.dump({"client": self.name, "endpoints": self.stats}, f, indent=2, sort_keys=True)
+            except IOError as e:
+                print("  ! Gagal tulis timing %s: %s" % (path, e))
+
+_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
+
+def _auth_key(auth):
+    if auth is None or isinstance(auth, tuple): return auth
+    if hasattr(auth, "username"): return (auth.username, auth.password)
+    return id(auth)
+
+def get_client(host, auth=None, verify=False, timeout=180, **kwargs):
+    """
+    Client bersama per (host, auth, verify, timeout, opsi lain) untuk satu
+    proses, supaya koneksi keep-alive dipakai ulang lintas fungsi/job.
+    Pemanggil dengan timeout/retry berbeda dapat client sendiri.
+    """
+    key = (host.rstrip("/"), _auth_key(auth), verify, timeout, tuple(sorted(kwargs.items())))
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            client = OpenSearchClient(host, auth=auth, verify=verify, timeout=timeout, **kwargs)
+            _CLIENTS[key] = client
+            if os.environ.get(TIMINGS_ENV):
+                atexit.register(_dump_at_exit, client)
+        return client
+
+def _dump_at_exit(client):
+    target = os.environ.get(TIMINGS_ENV, "")
+    path = None
+    if target not in ("", "1", "true", "yes"):
+        root, ext = os.path.splitext(target)
+        # satu file per client kalau ada lebih dari satu host
+        path = target if len(_CLIENTS) == 1 else "%s.%d%s" % (root, list(_CLIENTS.values()).index(client), ext)
+    client.dump_timings(path)
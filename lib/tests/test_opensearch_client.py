@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+import os, sys, unittest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import requests
+import opensearch_client as oc
+
+class EndpointKeyTest(unittest.TestCase):
+    def test_index_names_collapsed(self):
+        self.assertEqual(oc._endpoint_key("GET", "idx-2025.01.01/_count"), "GET /*/_count")
+        self.assertEqual(oc._endpoint_key("POST", "/a,b/_search?size=0"), "POST /*/_search")
+
+    def test_sub_api_kept(self):
+        self.assertEqual(oc._endpoint_key("GET", "_cat/indices/logs-*"), "GET /_cat/indices/*")
+        self.assertEqual(oc._endpoint_key("PUT", "_ingest/pipeline/my-pipe"), "PUT /_ingest/pipeline/*")
+        self.assertEqual(oc._endpoint_key("GET", "_tasks/node:123"), "GET /_tasks/*")
+
+class ShouldRetryTest(unittest.TestCase):
+    def test_rejected_any_method(self):
+        for method in ("GET", "POST", "PUT", "DELETE"):
+            self.assertTrue(oc.should_retry(method, 429))
+            self.assertTrue(oc.should_retry(method, 503))
+
+    def test_gateway_only_idempotent(self):
+        self.assertTrue(oc.should_retry("GET", 502))
+        self.assertTrue(oc.should_retry("DELETE", 504))
+        self.assertFalse(oc.should_retry("POST", 502))
+        self.assertFalse(oc.should_retry("PUT", 504))
+
+    def test_connection_error(self):
+        self.assertTrue(oc.should_retry("HEAD", None))
+        self.assertFalse(oc.should_retry("POST", None))
+
+    def test_other_status(self):
+        self.assertFalse(oc.should_retry("GET", 500))
+        self.assertFalse(oc.should_retry("GET", 404))
+
+class GetClientTest(unittest.TestCase):
+    def test_timeout_in_cache_key(self):
+        a = oc.get_client("http://cache-key.test:9200", auth=("u", "p"), timeout=30)
+        self.assertIs(oc.get_client("http://cache-key.test:9200/", auth=("u", "p"), timeout=30), a)
+        b = oc.get_client("http://cache-key.test:9200", auth=("u", "p"), timeout=600)
+        self.assertIsNot(a, b)
+        self.assertEqual((a.timeout, b.timeout), (30, 600))
+
+class _Resp(object):
+    def __init__(self, status_code):
+        self.status_code, self.headers = status_code, {}
+
+class _Session(object):
+    def __init__(self, *results):
+        self.results, self.calls = list(results), 0
+
+    def request(self, **kwargs):
+        self.calls += 1
+        res = self.results.pop(0)
+        if isinstance(res, Exception): raise res
+        return _Resp(res)
+
+class RequestRetryTest(unittest.TestCase):
+    def client(self, *results):
+        c = oc.OpenSearchClient("http://localhost:9200", retries=2, backoff=0)
+        c.session = _Session(*results)
+        return c
+
+    def test_retries_then_succeeds(self):
+        c = self.client(429, 503, 200)
+        self.assertEqual(c.request("POST", "idx/_doc").status_code, 200)
+        self.assertEqual(c.session.calls, 3)
+        self.assertEqual(c.stats["POST /*/_doc"]["retries"], 2)
+
+    def test_gives_up_after_retries(self):
+        c = self.client(503, 503, 503, 200)
+        self.assertEqual(c.request("GET", "_cluster/health").status_code, 503)
+        self.assertEqual(c.session.calls, 3)
+
+    def test_post_gateway_not_replayed(self):
+        c = self.client(502, 200)
+        self.assertEqual(c.request("POST", "_reindex").status_code, 502)
+        self.assertEqual(c.session.calls, 1)
+
+    def test_connection_error_only_idempotent(self):
+        c = self.client(requests.exceptions.ConnectionError(), 200)
+        self.assertEqual(c.request("GET", "idx/_count").status_code, 200)
+        c = self.client(requests.exceptions.ConnectionError(), 200)
+        self.assertRaises(requests.exceptions.ConnectionError, c.request, "POST", "_bulk")
+
+if __name__ == "__main__":
+    unittest.main()
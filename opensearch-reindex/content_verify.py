@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+
+"""
+content_verify.py  (Python 2.7 / 3, dipakai reindex.py dan remap.py)
+
+Verifikasi isi index hasil reindex, bukan hanya jumlah doc:
+- Source dibaca dengan PIT + search_after (urut _shard_doc: tiebreaker
+  bawaan PIT, tanpa fielddata _id), dipecah ke beberapa slice yang jalan
+  paralel di thread terpisah.
+- Tiap halaman source dicocokkan ke dest dengan _mget (by _id), lalu hash
+  SHA-1 dari _source (JSON urut key, tanpa field yang memang diubah
+  cleaning) dibandingkan per dokumen.
+- Hasil: jumlah doc dicek, _id yang hilang di dest, _id yang isinya beda,
+  dan selisih count (doc ekstra di dest, hanya mode penuh).
+- Mode sample (sample_pct): hanya ~pct% doc source yang dicek (random_score
+  + min_score), untuk index ratusan juta doc.
+
+Semua fungsi menerima `req`, yaitu helper HTTP milik script pemanggil
+(signature: req(method, path, **kwargs) -> requests.Response).
+"""
+
+import hashlib, json, threading, time
+
+def doc_hash(source):
+    raw = json.dumps(source, sort_keys=True, separators=(",", ":"))
+    if not isinstance(raw, bytes): raw = raw.encode("utf-8")
+    return hashlib.sha1(raw).hexdigest()
+
+def open_pit(req, index, keep_alive):
+    r = req("POST", "%s/_search/point_in_time" % index, params={"keep_alive": keep_alive})
+    if r.status_code != 200:
+        raise RuntimeError("Gagal buka PIT '%s': %s %s" % (index, r.status_code, r.text))
+    return r.json()["pit_id"]
+
+def close_pit(req, pit_id):
+    try:
+        req("DELETE", "_search/point_in_time", data=json.dumps({"pit_id": [pit_id]}))
+    except Exception as e:
+        print("  ! Gagal tutup PIT: %s" % e)
+
+def _count(req, index):
+    r = req("GET", "%s/_count" % index)
+    if r.status_code != 200:
+        raise RuntimeError("Gagal count '%s': %s %s" % (index, r.status_code, r.text))
+    return r.json().get("count", 0)
+
+def _mget_hashes(req, index, ids, excludes):
+    params = {"_source_excludes": ",".join(excludes)} if excludes else {}
+    r = req("POST", "%s/_mget" % index, data=json.dumps({"ids": ids}), params=params)
+    if r.status_code != 200:
+        raise RuntimeError("Gagal _mget '%s': %s %s" % (index, r.status_code, r.text))
+    return dict((d["_id"], doc_hash(d.get("_source") or {}))
+                for d in r.json().get("docs", []) if d.get("found"))
+
+class _Result(object):
+    def __init__(self, max_ids):
+        self.lock = threading.Lock()
+        self.max_ids = max_ids
+        self.checked = 0
+        self.missing, self.mismatch = [], []
+        self.n_missing = self.n_mismatch = 0
+        self.errors = []
+
+    def add(self, checked, missing, mismatch):
+        with self.lock:
+            self.checked += checked
+            self.n_missing += len(missing); self.n_mismatch += len(mismatch)
+            self.missing.extend(missing[:max(0, self.max_ids - len(self.missing))])
+            self.mismatch.extend(mismatch[:max(0, self.max_ids - len(self.mismatch))])
+
+def _run_slice(req, result, src, dst, pit_id, slice_id, slices, page_size, excludes, query, keep_alive):
+    search_after = None
+    while True:
+        body = {"size": page_size, "pit": {"id": pit_id, "keep_alive": keep_alive},
+                "sort": [{"_shard_doc": "asc"}], "query": query, "track_total_hits": False}
+        if slices > 1: body["slice"] = {"id": slice_id, "max": slices}
+        if excludes: body["_source"] = {"excludes": list(excludes)}
+        if search_after is not None: body["search_after"] = search_after
+        r = req("POST", "_search", data=json.dumps(body))
+        if r.status_code != 200:
+            raise RuntimeError("Gagal baca slice %d '%s': %s %s" % (slice_id, src, r.status_code, r.text))
+        hits = r.json().get("hits", {}).get("hits", [])
+        if not hits: return
+        src_hashes = dict((h["_id"], doc_hash(h.get("_source") or {})) for h in hits)
+        dst_hashes = _mget_hashes(req, dst, list(src_hashes), excludes)
+        missing = sorted(i for i in src_hashes if i not in dst_hashes)
+        mismatch = sorted(i for i, hv in src_hashes.items() if i in dst_hashes and dst_hashes[i] != hv)
+        result.add(len(hits), missing, mismatch)
+        search_after = hits[-1]["sort"]
+
+def verify_content(req, src, dst, slices=4, page_size=1000, excludes=(), sample_pct=None,
+                   keep_alive="5m", max_ids=1000, label=None, print_every_sec=30, thread_init=None):
+    """
+    Bandingkan isi src vs dst per dokumen. excludes: field (path bertitik)
+    yang tidak ikut di-hash, mis. field IP yang dibersihkan saat reindex.
+    thread_init: dipanggil di awal tiap thread slice (mis. pasang label log
+    thread pemanggil).
+    Return dict ringkasan (lihat format_report).
+    """
+    label = label or dst
+    t0 = time.time()
+    query = {"match_all": {}}
+    if sample_pct:
+        query = {"function_score": {"query": query, "boost_mode": "replace",
+                                    "random_score": {"seed": int(t0), "field": "_seq_no"},
+                                    "min_score": 1.0 - float(sample_pct) / 100.0}}
+    result = _Result(max_ids)
+    pit_id = open_pit(req, src, keep_alive)
+    try:
+        threads = []
+        for i in range(max(1, int(slices))):
+            def work(i=i):
+                try:
+                    if thread_init: thread_init()
+                    _run_slice(req, result, src, dst, pit_id, i, max(1, int(slices)), page_size,
+                               excludes, query, keep_alive)
+                except Exception as e:
+                    with result.lock: result.errors.append(str(e))
+            t = threading.Thread(target=work, name="verify-%s-%d" % (label, i))
+            t.daemon = True
+            t.start(); threads.append(t)
+        last_print = time.time()
+        while any(t.is_alive() for t in threads):
+            for t in threads: t.join(1.0)
+            if time.time() - last_print >= print_every_sec:
+                last_print = time.time()
+                print("  [verify %s] %d doc dicek (%.0f doc/s), hilang=%d beda=%d" % (
+                    label, result.checked, result.checked / max(0.001, time.time() - t0),
+                    result.n_missing, result.n_mismatch))
+    finally:
+        close_pit(req, pit_id)
+
+    out = {"src": src, "dst": dst, "mode": ("sample %.2f%%" % sample_pct) if sample_pct else "full",
+           "checked": result.checked, "missing": result.n_missing, "mismatch": result.n_mismatch,
+           "missing_ids": result.missing, "mismatch_ids": result.mismatch, "errors": result.errors,
+           "extra": None, "sec": round(time.time() - t0, 1)}
+    if not sample_pct and not result.errors:
+        # doc di dest yang tidak ada di source: tersisa dari selisih count
+        out["extra"] = max(0, _count(req, dst) - (result.checked - result.n_missing))
+    out["ok"] = not (out["missing"] or out["mismatch"] or out["extra"] or out["errors"])
+    return out
+
+def format_report(res, show_ids=10):
+    lines = ["Verifikasi isi (%s): %d doc dicek dalam %.1fs, hilang=%d beda=%d ekstra=%s -> %s" % (
+        res["mode"], res["checked"], res["sec"], res["missing"], res["mismatch"],
+        "-" if res["extra"] is None else res["extra"], "OK" if res["ok"] else "GAGAL")]
+    if res["missing_ids"]: lines.append("    hilang: %s" % ", ".join(res["missing_ids"][:show_ids]))
+    if res["mismatch_ids"]: lines.append("    beda  : %s" % ", ".join(res["mismatch_ids"][:show_ids]))
+    for e in res["errors"][:3]: lines.append("    error : %s" % e)
+    return "\n".join(lines)
+
+def write_report(path, res):
+    if not path: return
+    try:
+        with open(path, "a") as f:
+            f.write(json.dumps(dict(res, ts=time.strftime("%Y-%m-%d %H:%M:%S"))) + "\n")
+    except IOError as e:
+        print("  ! Gagal tulis laporan verifikasi %s: %s" % (path, e))
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+
+"""
+mergequeue.py  (Python 2.7 / 3, dipakai reindex.py dan remap.py)
+
+Antrean forcemerge di luar jalur kritis reindex:
+- Setiap job jalan sebagai task di cluster (_forcemerge?wait_for_completion=false)
+  dan dipantau lewat _tasks, jadi tidak kena timeout client.
+- Node-aware: lokasi shard tiap index dibaca dari _cat/shards, maksimal
+  per_node forcemerge bersamaan per data node. Job yang node-nya penuh
+  dilewati dulu, job lain yang muat tetap jalan (tidak head-of-line).
+- tick() dipanggil dari loop polling pemanggil (non-blocking), wait_all()
+  untuk pemakaian serial.
+
+Cluster lama yang belum mendukung wait_for_completion pada _forcemerge:
+request sinkron dijalankan di thread terpisah (timeout sync_timeout_sec).
+"""
+
+import threading, time
+
+class MergeJob(object):
+    def __init__(self, index, ctx=None):
+        self.index, self.ctx = index, ctx
+        self.nodes = None
+        self.task = self.thread = None
+        self.started = self.finished = None
+        self.error = None
+
+    @property
+    def sec(self):
+        return (self.finished or time.time()) - (self.started or time.time())
+
+class ForcemergeQueue(object):
+    def __init__(self, req, max_segments=1, per_node=1, sync_timeout_sec=6 * 3600):
+        self.req = req
+        self.max_segments = max_segments
+        self.per_node = max(1, int(per_node))
+        self.sync_timeout_sec = sync_timeout_sec
+        self.waiting, self.running = [], []
+
+    def submit(self, index, ctx=None):
+        job = MergeJob(index, ctx)
+        self.waiting.append(job)
+        return job
+
+    def busy(self):
+        return bool(self.waiting or self.running)
+
+    def shard_nodes(self, index):
+        r = self.req("GET", "_cat/shards/%s" % index, params={"format": "json", "h": "node"})
+        if r.status_code != 200:
+            raise RuntimeError("Gagal _cat/shards '%s': %s %s" % (index, r.status_code, r.text))
+        return sorted(set(row.get("node") for row in r.json() if row.get("node")))
+
+    def _load(self):
+        load = {}
+        for job in self.running:
+            for n in job.nodes: load[n] = load.get(n, 0) + 1
+        return load
+
+    def _start(self, job):
+        job.started = time.time()
+        params = {"max_num_segments": str(int(self.max_segments)), "wait_for_completion": "false"}
+        r = self.req("POST", "%s/_forcemerge" % job.index, params=params)
+        if r.status_code == 200 and r.json().get("task"):
+            job.task = r.json()["task"]
+        elif r.status_code == 200:
+            job.finished = time.time()   # server mengabaikan param dan sudah selesai sinkron
+        elif r.status_code == 400 and "wait_for_completion" in r.text:
+            job.thread = threading.Thread(target=self._run_sync, args=(job,), name="forcemerge-%s" % job.index)
+            job.thread.daemon = True
+            job.thread.start()
+        else:
+            raise RuntimeError("Gagal forcemerge '%s': %s %s" % (job.index, r.status_code, r.text))
+        print("  [forcemerge] mulai %s (node: %s)%s" % (
+            job.index, ", ".join(job.nodes) or "-", (" task %s" % job.task) if job.task else ""))
+
+    def _run_sync(self, job):
+        try:
+            r = self.req("POST", "%s/_forcemerge" % job.index, timeout=self.sync_timeout_sec,
+                         params={"max_num_segments": str(int(self.max_segments))})
+            if r.status_code != 200:
+                job.error = "%s %s" % (r.status_code, r.text)
+        except Exception as e:
+            job.error = str(e)
+        job.finished = time.time()
+
+    def _poll(self, job):
+        if job.finished: return True
+        if job.thread is not None: return not job.thread.is_alive()
+        r = self.req("GET", "_tasks/%s" % job.task)
+        if r.status_code == 404:
+            job.finished = time.time()   # record task sudah hilang: anggap selesai
+            return True
+        if r.status_code != 200:
+            return False
+        data = r.json()
+        if not data.get("completed"): return False
+        job.finished = time.time()
+        if data.get("error"):
+            job.error = (data["error"] or {}).get("reason") or str(data["error"])
+        return True
+
+    def tick(self):
+        """Mulai job yang muat di kapasitas node, poll yang jalan. Return job yang selesai."""
+        finished = []
+        for job in list(self.waiting):
+            try:
+                if job.nodes is None: job.nodes = self.shard_nodes(job.index)
+                load = self._load()
+                if any(load.get(n, 0) >= self.per_node for n in job.nodes): continue
+                self.waiting.remove(job)
+                self._start(job)
+                self.running.append(job)
+            except Exception as e:
+                if job in self.waiting: self.waiting.remove(job)
+                job.error = str(e); job.finished = time.time()
+                finished.append(job)
+        for job in list(self.running):
+            try:
+                if not self._poll(job): continue
+            except Exception as e:
+                print("  ! Poll forcemerge %s: %s" % (job.index, e)); continue
+            self.running.remove(job)
+            finished.append(job)
+        for job in finished:
+            if job.error: print("  ! [forcemerge] %s gagal: %s" % (job.index, job.error))
+            else: print("  [forcemerge] %s selesai (%.1fs)" % (job.index, job.sec))
+        return finished
+
+    def wait_all(self, poll_sec=2):
+        finished = []
+        while self.busy():
+            finished += self.tick()
+            if self.busy(): time.sleep(poll_sec)
+        return finished
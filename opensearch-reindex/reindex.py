@@ -10,17 +10,62 @@ Fitur:
 - Sumber diambil dari:
   1) GLOB/PREFIX filter (contoh: "checkpoint-smartdefense-aggregated-*")
   2) atau rentang tanggal di suffix (YYYY.MM.DD) dengan prefix tetap.
+- Discovery via _cat/indices/<pattern> (hanya kolom index/docs/size/pri),
+  batch diurutkan terbesar dulu (LPT) + rencana total docs/size/shard.
+  Jalankan dengan --plan untuk melihat rencana saja.
 - Untuk setiap source, dest otomatis: <source> + "-reindex"
+- (Opsional) FIXUP_MODE: index yang mapping-nya sudah kompatibel cukup dibersihkan
+  in-place via _update_by_query (hanya doc kotor, dicek lewat _simulate cleaning);
+  planner cetak jalur per index
+- --install-templates: FIELD_TYPE_OVERRIDES dipasang sebagai component template dan
+  ditambahkan ke composed_of index template yang sudah cocok dengan pola index,
+  supaya daily baru sudah benar sejak dibuat
+- --scan-overrides: cari field text/keyword yang isinya IPv4/port/integer di semua
+  index sumber (satu _mapping + terms agg), cetak usulan FIELD_TYPE_OVERRIDES + estimasi biaya
+- (Opsional) CONSOLIDATE: daily digabung per minggu/bulan ke satu dest dengan
+  shard seukuran TARGET_SHARD_SIZE_GB, alias daily dipindah ke dest
+- Scheduler konkuren: maks MAX_CONCURRENT task reindex jalan bersamaan,
+  slot langsung diisi pair berikutnya begitu satu task selesai.
 - Clone settings+mappings, apply field overrides, (opsional) cleaning IP
-- Verifikasi count, forcemerge, refresh
+- (Opsional) SOURCE_EXCLUDES / INDEX_CODEC / SHARDS_FROM_SIZE: buang field _source
+  yang tidak dipakai, best_compression, shard primer dari TARGET_SHARD_SIZE_GB;
+  ukuran store primer sebelum/sesudah dilaporkan per index
+- Progress live per task (docs/s, %, ETA, per slice) + metrics JSONL (taskwatch.py)
+- (Opsional) ADAPTIVE_THROTTLE: _rethrottle task berdasarkan tekanan cluster
+- Verifikasi count + isi per dokumen (VERIFY_CONTENT, sample/full), refresh
+- Forcemerge async lewat antrean node-aware (maks FORCEMERGE_PER_NODE per node),
+  tidak menahan slot reindex
+- --calibrate: trial reindex pendek (slices auto/tetap x source.size) di satu
+  source, profil terbaik disimpan ke CALIBRATION_FILE dan dipakai otomatis oleh
+  run berikutnya (juga remap.py)
+- Cleaning via painless script atau ingest pipeline (CLEAN_MODE), --benchmark
+  untuk membandingkan docs/s keduanya
+- Pre-flight (PREFLIGHT / --preflight): sample acak per source lewat cleaning +
+  mapping target di index scratch, rate gagal per field sebelum reindex
+- Journal resume (JOURNAL_FILE): run ulang reattach task yang masih jalan,
+  ulang dest setengah jadi, skip pair yang sudah terverifikasi
+- Histori pair selesai di SQLite (HISTORY_DB, run_history.py); --plan memakai
+  histori itu untuk perkiraan durasi + ukuran dest
+- (Opsional) BULK_LOAD_PROFILE: load tanpa refresh/replica, restore + tunggu green
 - (Opsional) swap alias read/write per index (jika diinginkan)
+- --live INDEX: migrasi index yang masih ditulis: copy sampai watermark
+  timestamp, catch-up delta (op_type create) sampai lag kecil, write block
+  singkat + delta terakhir, lalu swap alias; lag & durasi block dilaporkan
 
 Prasyarat:
   pip install requests
+  lib/opensearch_client.py (di root repo ini)
 """
 
-import os, sys, time, json, re, requests
+import os, sys, time, json, re, math, argparse, difflib, threading
 from datetime import datetime, timedelta
+import taskwatch
+import content_verify
+import mergequeue
+import run_history
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lib"))
+import opensearch_client
 
 # ===================== KONFIGURASI =====================
 OS_HOST = os.environ.get("OS_HOST", "#HOST#")
@@ -40,16 +85,120 @@ DR_START    = "2025.09.04"  # inklusif
 DR_END      = "2025.10.06"  # inklusif
 DR_FMT      = "%Y.%m.%d"    # pattern tanggal di index
 
+# Konsolidasi (opsional, hanya MODE "date_range"): daily <DR_PREFIX><tanggal>
+# digabung per "week"/"month" ke satu dest <DR_PREFIX><periode>-reindex
+# (mis. ...-2025.09-reindex, ...-2025.w36-reindex). Verifikasi = jumlah count
+# semua daily; alias daily dipindah atomik ke dest, mapping lama -> baru
+# dicatat ke CONSOLIDATE_MAP_FILE. "" = 1:1 seperti biasa.
+CONSOLIDATE          = ""
+TARGET_SHARD_SIZE_GB = 30   # shard primer dest = ceil(ukuran primer grup / ini)
+CONSOLIDATE_MAP_FILE = "reindex_consolidation.json"
+# Periode yang terpotong DR_START/DR_END (mis. bulan berjalan) ditolak: run
+# berikutnya dengan rentang lebih lebar akan men-skip dest yang sudah ada dan
+# daily sisanya tidak pernah ikut. True = tetap jalan (dest berisi sebagian).
+CONSOLIDATE_ALLOW_PARTIAL = False
+
+# Ukuran dest (berlaku per batch). Ukuran store primer source vs dest dicetak
+# di ringkasan dan dicatat ke PROFILE_STATS_FILE.
+SOURCE_EXCLUDES  = []     # field _source yang dibuang saat reindex, mis. ["raw_message", "event.original"]
+INDEX_CODEC      = ""     # "best_compression" atau "" = ikut source
+SHARDS_FROM_SIZE = False  # True: pair 1:1 juga pakai shard = ceil(ukuran primer / TARGET_SHARD_SIZE_GB)
+
+# Fix-up in-place (opsional): kalau mapping source sudah sesuai FIELD_TYPE_OVERRIDES
+# (tidak ada tipe yang berubah), hanya doc kotor yang dibersihkan lewat sliced
+# _update_by_query dengan script/pipeline yang sama, tanpa copy index.
+# Doc kotor = nilai field override yang diubah cleaning (mis. src_ips
+# "1.1.1.1,2.2.2.2"), dicek dengan _simulate di FIXUP_SAMPLE_DOCS doc acak.
+# _update_by_query hanya menyasar doc yang tercatat di _ignored (ignore_malformed);
+# kalau di sample ada doc kotor di luar _ignored, atau field override yang belum
+# di-mapping tapi ada di _source, index itu tetap reindex penuh.
+#   "auto" = planner pilih jalur per index, "off" = selalu reindex penuh
+FIXUP_MODE        = "off"
+FIXUP_MAX_RATIO   = 0.3   # doc kotor di atas rasio ini -> reindex penuh saja
+FIXUP_SAMPLE_DOCS = 500   # doc acak (di luar _ignored) yang dicek planner per index
+
+# Index template (--install-templates): FIELD_TYPE_OVERRIDES + FIELD_DATE_FORMATS
+# dipasang sebagai component template <TEMPLATE_NAME>-field-overrides, lalu
+# ditambahkan ke composed_of index template yang SUDAH cocok dengan pola index
+# (shard, analyzer, ISM, mapping lain tetap dari template itu). Index template
+# baru <TEMPLATE_NAME> hanya dibuat kalau tidak ada template lain (composable
+# maupun legacy _template) yang overlap: composable template yang cocok membuat
+# legacy _template diabaikan. Overlap lebih dari satu / legacy -> install ditolak.
+# Dengan --plan hanya diff vs template terpasang yang ditampilkan.
+TEMPLATE_NAME     = "checkpoint-smartdefense-aggregated"
+TEMPLATE_PATTERNS = []     # [] = GLOB_PATTERN (glob) / DR_PREFIX + "*" (date_range)
+TEMPLATE_TARGET   = ""     # index template existing yang diberi component; "" = satu-satunya yang overlap
+TEMPLATE_PRIORITY = 200    # hanya untuk template baru <TEMPLATE_NAME> (tidak ada yang overlap)
+# True: ignore_malformed hanya di field override (ip/numeric/date), nilai kotor
+# (mis. src_ips "1.1.1.1,2.2.2.2") tidak menolak dokumen, field itu saja yang
+# di-skip dan tercatat di _ignored. Field lain tetap ditolak seperti biasa.
+TEMPLATE_IGNORE_MALFORMED = False
+
+# Scan override (--scan-overrides): field text/keyword di index sumber yang
+# nilainya ternyata IPv4 / port / integer. Nilai di-sample dengan terms agg di
+# index sumber terbaru; usulan ditulis ke SCAN_PLAN_FILE (JSON).
+SCAN_SAMPLE_VALUES = 200    # ukuran terms agg per field
+SCAN_MIN_MATCH     = 0.95   # porsi doc (dari sample) yang harus cocok dengan tipe
+SCAN_AGG_BATCH     = 20     # field per request _search
+SCAN_PLAN_FILE     = "reindex_overrides_plan.json"
+
 # Reindex options
-SLICES     = 4
+SLICES     = 4        # int atau "auto" (1 slice per shard)
+SOURCE_BATCH_SIZE = 1000   # source.size: doc per batch scroll/bulk
 REFRESH    = True
 CONFLICTS  = "proceed"
 TIMEOUT_SEC= 180
 POLL_SEC   = 2
 
-# Forcemerge
-DO_FORCEMERGE     = True
-MAX_NUM_SEGMENTS  = 1
+# HTTP client bersama (lib/opensearch_client.py): keep-alive pool, retry
+# 429/503 dengan backoff, gzip opsional. Set env OS_HTTP_TIMINGS=1 untuk
+# ringkasan latensi per endpoint di akhir run.
+HTTP_RETRIES = 3
+HTTP_GZIP    = False
+
+# Scheduler: jumlah task reindex yang jalan bersamaan. Default 1 = serial
+# seperti dulu; naikkan (mis. 3) kalau cluster kuat menahan beban tambahan.
+MAX_CONCURRENT = 1
+
+# Telemetry progress (docs/s, %, ETA, per slice) -> lihat taskwatch.py
+METRICS_FILE       = "reindex_metrics.jsonl"  # tiap sample ditulis JSONL; "" = nonaktif
+PROGRESS_EVERY_SEC = 30   # jeda cetak progress ke layar
+LONG_POLL_SEC      = 30   # >0: long-poll _tasks (wait_for_completion=true&timeout=) saat 1 task in-flight
+
+# Adaptive throttle (opsional): requests_per_second task yang sedang jalan
+# dinaik-turunkan via _rethrottle berdasarkan _nodes/stats (antrean/rejection
+# write, latensi search, heap JVM) supaya ingest SIEM tidak kelaparan.
+ADAPTIVE_THROTTLE          = False
+THROTTLE_MIN_RPS           = 500
+THROTTLE_MAX_RPS           = 20000
+THROTTLE_START_RPS         = 5000
+THROTTLE_INTERVAL_SEC      = 30
+THROTTLE_WRITE_QUEUE_MAX   = 200   # antrean thread pool write (node terburuk)
+THROTTLE_SEARCH_LATENCY_MS = 500   # rata-rata latensi query sejak sample sebelumnya
+THROTTLE_HEAP_PCT_MAX      = 85
+THROTTLE_LOG_FILE          = "reindex_throttle.jsonl"   # setiap keputusan throttle
+
+# Forcemerge: lewat antrean async (mergequeue.py) setelah verify, slot reindex
+# langsung dipakai pair berikutnya. Maks FORCEMERGE_PER_NODE merge bersamaan
+# per data node (lokasi shard dari _cat/shards).
+DO_FORCEMERGE       = True
+MAX_NUM_SEGMENTS    = 1
+FORCEMERGE_PER_NODE = 1
+
+# Bulk-load profile (opsional): dest dibuat dengan refresh_interval=-1,
+# replica 0 dan translog async selama reindex. Setting asli dikembalikan
+# setelah verify + forcemerge, lalu tunggu green sebelum swap alias.
+BULK_LOAD_PROFILE        = False
+BULK_TRANSLOG_DURABILITY = "async"
+GREEN_WAIT_SEC           = 1800
+# docs/s per pair dicatat (dengan/tanpa profile) untuk perbandingan
+PROFILE_STATS_FILE       = "reindex_profile_stats.jsonl"
+
+# Histori run (run_history.py): setiap pair selesai dicatat ke SQLite lokal
+# (dipakai bersama remap.py). --plan memperkirakan durasi & ukuran dari median
+# HISTORY_SAMPLES run terakhir yang sejenis. "" = nonaktif.
+HISTORY_DB      = "reindex_history.db"
+HISTORY_SAMPLES = 20
 
 # Alias opsional (kalau mau pindahin per index—biasanya tidak perlu di tahap ini)
 READ_ALIAS  = ""   # contoh "logs-read" atau "" untuk nonaktif
@@ -73,37 +222,94 @@ FIELD_DATE_FORMATS = {
 # Cleaning IP saat reindex (pisah koma/spasi; buang non-IPv4)
 ENABLE_CLEAN_IPS = True
 
+# Cara cleaning saat reindex:
+#   "script"   = painless per dokumen (build_reindex_script)
+#   "pipeline" = ingest pipeline (split/gsub/convert) yang didaftarkan sekali per batch
+CLEAN_MODE     = "script"
+PIPELINE_ID    = "reindex-clean-fields"
+SIMULATE_DOCS  = 20      # sample doc untuk _ingest/pipeline/_simulate sebelum batch
+BENCHMARK_DOCS = 50000   # --benchmark: jumlah doc sample per mode (script vs pipeline)
+
+# Pre-flight: sample acak per source dijalankan lewat cleaning yang sama lalu
+# di-bulk ke index scratch (<dst>-preflight) bermapping target. Konflik override
+# (mis. src_port: integer berisi "any") ketahuan dalam detik, bukan setelah
+# reindex selesai dan count dest < source. Membuat + menghapus index scratch di
+# cluster, jadi opt-in: PREFLIGHT = True untuk setiap run, atau --preflight saja.
+PREFLIGHT               = False
+PREFLIGHT_DOCS          = 200    # doc sample per source (random_score)
+PREFLIGHT_MAX_FAIL_RATE = 0.0    # gagal/doc-yang-punya-field di atas ini -> batch dibatalkan
+
+# Verifikasi isi setelah count (content_verify.py): baca source via PIT +
+# search_after per slice (paralel), _mget ke dest, bandingkan hash _source.
+# Field yang diubah cleaning (IP, convert pipeline) tidak ikut di-hash.
+#   "off" | "sample" (VERIFY_SAMPLE_PCT % doc acak) | "full"
+VERIFY_CONTENT     = "sample"
+VERIFY_SAMPLE_PCT  = 1.0
+VERIFY_SLICES      = 4       # slice = thread pembaca paralel
+VERIFY_PAGE_SIZE   = 1000
+VERIFY_REPORT_FILE = "reindex_verify.jsonl"   # hasil per pair (maks 1000 _id hilang/beda)
+
+# Kalibrasi (--calibrate): trial reindex CALIBRATE_DOCS doc dari source terbesar
+# ke index scratch (<src>-calibrate, dihapus setiap trial). Tahap 1 cari slices
+# terbaik dengan SOURCE_BATCH_SIZE, tahap 2 cari source.size dengan slices itu.
+# Trial yang kena rejection write / retry bulk kalah dari yang bersih. Hasil
+# ditulis ke CALIBRATION_FILE; kalau file ada dan USE_CALIBRATION, SLICES dan
+# SOURCE_BATCH_SIZE di atas diganti nilainya (reindex.py dan remap.py).
+CALIBRATE_DOCS        = 200000
+CALIBRATE_SLICES      = ["auto", 1, 2, 4, 8]
+CALIBRATE_BATCH_SIZES = [500, 1000, 2000, 5000]
+CALIBRATION_FILE      = "reindex_calibration.json"
+USE_CALIBRATION       = True
+
+# Migrasi index live (--live INDEX): copy awal sampai watermark (max
+# LIVE_TIMESTAMP_FIELD), lalu delta pass range timestamp >= watermark sebelumnya
+# dikurangi LIVE_OVERLAP_SEC (doc telat datang), op_type=create jadi doc yang
+# sudah tersalin tidak ditimpa. Berhenti kalau doc tersisa <= LIVE_LAG_DOCS, lalu
+# source di-write block (writer dapat 403 dan retry), delta terakhir, verifikasi
+# count, swap READ_ALIAS/WRITE_ALIAS (WRITE_ALIAS wajib). Source tetap terblokir
+# setelah swap; kalau gagal sebelum swap, block dilepas lagi. Dest yang sudah
+# ada = lanjut catch-up dari max timestamp dest.
+LIVE_TIMESTAMP_FIELD = "@timestamp"
+LIVE_OVERLAP_SEC     = 60
+LIVE_LAG_DOCS        = 10000
+LIVE_MAX_PASSES      = 10
+
 # Safety & behavior
-SKIP_IF_DEST_EXISTS = True   # kalau dest sudah ada, lewati index itu
+SKIP_IF_DEST_EXISTS = True   # kalau dest sudah ada, lewati index itu (hanya jika tidak ada di journal)
+# Journal resume: fase, task ID dan count per pair dicatat ke file lokal.
+# Run ulang: pair "done" di-skip, task yang masih jalan di-reattach,
+# dest setengah jadi dihapus lalu diulang. "" = nonaktif.
+JOURNAL_FILE        = "reindex_journal.json"
 STOP_ON_ERROR       = False  # True = hentikan batch saat 1 index gagal
 # =======================================================
 
-# Matikan warning TLS jika VERIFY_TLS=False
-try:
-    from requests.packages.urllib3.exceptions import InsecureRequestWarning
-    requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
-except Exception:
-    pass
-
 # =============== HTTP helpers ===============
-def _url(path):
-    if not path.startswith("/"): path = "/" + path
-    return OS_HOST.rstrip("/") + path
-
 def _req(method, path, **kwargs):
-    headers = kwargs.pop("headers", {})
-    headers.setdefault("Content-Type", "application/json")
-    return requests.request(
-        method=method, url=_url(path),
-        auth=(OS_USER, OS_PASS), headers=headers,
-        verify=VERIFY_TLS, timeout=TIMEOUT_SEC, **kwargs
-    )
-
-def list_indices():
-    r = _req("GET", "_cat/indices?format=json")
+    client = opensearch_client.get_client(OS_HOST, auth=(OS_USER, OS_PASS), verify=VERIFY_TLS,
+                                          timeout=TIMEOUT_SEC, retries=HTTP_RETRIES, gzip_requests=HTTP_GZIP)
+    return client.request(method, path, **kwargs)
+
+def _to_int(v):
+    try: return int(v)
+    except (TypeError, ValueError): return 0
+
+def list_indices_stats(pattern):
+    """
+    Discovery di sisi server: _cat/indices/<pattern> dengan kolom seperlunya
+    (index, docs.count, store.size, pri.store.size, pri), ukuran dalam byte.
+    """
+    r = _req("GET", "_cat/indices/%s" % pattern,
+             params={"format": "json", "h": "index,docs.count,store.size,pri.store.size,pri", "bytes": "b"})
+    if r.status_code == 404: return []
     if r.status_code != 200:
-        raise RuntimeError("Gagal _cat/indices: %s %s" % (r.status_code, r.text))
-    return [row.get("index") for row in r.json() if row.get("index")]
+        raise RuntimeError("Gagal _cat/indices/%s: %s %s" % (pattern, r.status_code, r.text))
+    out = []
+    for row in r.json():
+        if not row.get("index"): continue
+        out.append({"index": row.get("index"), "docs": _to_int(row.get("docs.count")),
+                    "bytes": _to_int(row.get("store.size")), "pri_bytes": _to_int(row.get("pri.store.size")),
+                    "pri": _to_int(row.get("pri"))})
+    return out
 
 def index_exists(index):
     return _req("HEAD", index).status_code == 200
@@ -120,11 +326,31 @@ def count_docs(index):
         raise RuntimeError("Gagal count '%s': %s %s" % (index, r.status_code, r.text))
     return r.json().get("count", 0)
 
+def delete_index(index):
+    r = _req("DELETE", index)
+    if r.status_code not in (200, 404):
+        raise RuntimeError("Gagal delete '%s': %s %s" % (index, r.status_code, r.text))
+
 def refresh_index(index):
     _req("POST", "%s/_refresh" % index)
 
-def forcemerge_index(index, max_segments=1):
-    _req("POST", "%s/_forcemerge" % index, params={"max_num_segments": str(int(max_segments))})
+def put_index_settings(index, settings):
+    r = _req("PUT", "%s/_settings" % index, data=json.dumps({"index": settings}))
+    if r.status_code != 200:
+        raise RuntimeError("Gagal update settings '%s': %s %s" % (index, r.status_code, r.text))
+
+def index_status(index):
+    """Status health index saat ini (tanpa menunggu), None kalau tidak terbaca."""
+    r = _req("GET", "_cluster/health/%s" % index, params={"timeout": "1s"})
+    return r.json().get("status") if r.status_code == 200 else None
+
+def wait_green(index, max_wait_sec):
+    deadline = time.time() + max_wait_sec
+    while True:
+        r = _req("GET", "_cluster/health/%s" % index,
+                 params={"wait_for_status": "green", "timeout": "60s"}, timeout=90)
+        if r.status_code == 200 and r.json().get("status") == "green": return True
+        if time.time() >= deadline: return False
 
 # =============== Mapping helpers ===============
 def _ensure_path_properties(mappings, field_path):
@@ -150,19 +376,132 @@ def apply_field_overrides(mappings, overrides, date_formats=None):
             parent_props[leaf] = field_obj
     return mappings
 
-def create_index_from_src(src, dst):
-    if index_exists(dst): return
+def _mapped_field(mappings, field_path):
+    props = (mappings or {}).get("properties") or {}
+    node = None
+    for part in field_path.split("."):
+        node = props.get(part)
+        if node is None: return None
+        props = node.get("properties") or {}
+    return node
+
+def mapping_changes(mappings):
+    """
+    Bandingkan mapping source dengan overrides. Return (berubah, belum_ada):
+    field yang tipenya/format-nya beda (butuh reindex) dan field yang belum
+    ada di mapping (cukup ditambah via PUT _mapping).
+    """
+    changed, missing = [], []
+    for f, ftype in sorted(FIELD_TYPE_OVERRIDES.items()):
+        node = _mapped_field(mappings, f)
+        if node is None: missing.append(f); continue
+        if node.get("type", "object") != ftype: changed.append(f); continue
+        fmt = FIELD_DATE_FORMATS.get(f)
+        if ftype == "date" and fmt and node.get("format") != fmt: changed.append(f)
+    return changed, missing
+
+def fixup_query():
+    """Doc yang disasar fix-up: salah satu field override ditolak mapping (tercatat di _ignored)."""
+    return {"terms": {"_ignored": sorted(FIELD_TYPE_OVERRIDES)}}
+
+def _norm_value(v):
+    # "80" vs 80 bukan doc kotor (convert pipeline), list/skalar tetap dibedakan
+    if isinstance(v, list): return [_norm_value(x) for x in v]
+    return v if v is None or isinstance(v, dict) else "%s" % v
+
+def dirty_fields(before, after):
+    """Field override yang nilainya diubah/dibuang cleaning (after None = doc di-drop)."""
+    after = after or {}
+    return [f for f in sorted(FIELD_TYPE_OVERRIDES)
+            if f in before and _norm_value(before.get(f)) != _norm_value(after.get(f))]
+
+def sample_uncovered(index, missing):
+    """
+    Cek FIXUP_SAMPLE_DOCS doc acak di luar fixup_query() lewat cleaning
+    (_simulate inline, tanpa daftar pipeline). Return alasan reindex atau None.
+    """
+    if CLEAN_MODE == "pipeline":
+        script, pipeline = None, build_ingest_pipeline(FIELD_TYPE_OVERRIDES, ENABLE_CLEAN_IPS)
+    else:
+        script, pipeline = build_reindex_script(FIELD_TYPE_OVERRIDES, ENABLE_CLEAN_IPS), None
+    hits = sample_docs(index, FIXUP_SAMPLE_DOCS, random=True, query={"bool": {"must_not": [fixup_query()]}})
+    dirty, unmapped = {}, set()
+    for h, source, err in simulate_pipeline(pipeline, hits, script):
+        before = h.get("_source") or {}
+        unmapped.update(f for f in missing if f in before)
+        for f in ([] if err else dirty_fields(before, source)):
+            dirty[f] = dirty.get(f, 0) + 1
+    if unmapped:
+        return "field belum di-mapping tapi ada di _source: %s" % ", ".join(sorted(unmapped))
+    if dirty:
+        return "doc kotor di luar _ignored (sample %d doc): %s" % (
+            len(hits), ", ".join("%s=%d" % kv for kv in sorted(dirty.items())))
+    return None
+
+def count_query(index, query):
+    r = _req("POST", "%s/_count" % index, data=json.dumps({"query": query}))
+    if r.status_code != 200:
+        raise RuntimeError("Gagal count '%s': %s %s" % (index, r.status_code, r.text))
+    return r.json().get("count", 0)
+
+def plan_path(row):
+    """
+    Pilih jalur untuk satu index: ("reindex"|"fixup"|"none", volume doc, alasan).
+    """
+    if FIXUP_MODE != "auto":
+        return "reindex", row["docs"], "FIXUP_MODE off"
+    if SOURCE_EXCLUDES or INDEX_CODEC or SHARDS_FROM_SIZE:
+        return "reindex", row["docs"], "butuh index baru (SOURCE_EXCLUDES/INDEX_CODEC/SHARDS_FROM_SIZE)"
+    changed, missing = mapping_changes(get_index_def(row["index"]).get("mappings") or {})
+    if changed:
+        return "reindex", row["docs"], "tipe berubah: %s" % ", ".join(changed)
+    uncovered = sample_uncovered(row["index"], missing)
+    if uncovered:
+        return "reindex", row["docs"], uncovered
+    dirty = count_query(row["index"], fixup_query())
+    if dirty == 0:
+        return "none", 0, "mapping sudah sesuai, tidak ada doc kotor"
+    if row["docs"] and float(dirty) / row["docs"] > FIXUP_MAX_RATIO:
+        return "reindex", row["docs"], "doc kotor %.0f%% > FIXUP_MAX_RATIO" % (100.0 * dirty / row["docs"])
+    return "fixup", dirty, "doc kotor %d (%.2f%%)" % (dirty, 100.0 * dirty / row["docs"] if row["docs"] else 0)
+
+def build_dest_body(src, shards=None):
+    """
+    Body create index tujuan: settings+mappings src + overrides. Return
+    (body, restore); restore hanya terisi kalau BULK_LOAD_PROFILE aktif.
+    shards: override number_of_shards (konsolidasi / SHARDS_FROM_SIZE).
+    """
     sm = get_index_def(src)
     mappings = sm.get("mappings", {}) or {}
     settings = (sm.get("settings", {}) or {}).get("index", {}) or {}
     for k in ["provided_name","uuid","version","creation_date"]:
         settings.pop(k, None)
     settings.setdefault("number_of_replicas", "1")
+    if shards: settings["number_of_shards"] = str(int(shards))
+    if INDEX_CODEC: settings["codec"] = INDEX_CODEC
+    restore = None
+    if BULK_LOAD_PROFILE:
+        # None = reset ke default cluster saat restore
+        restore = {"refresh_interval": settings.get("refresh_interval"),
+                   "number_of_replicas": settings.get("number_of_replicas"),
+                   "translog.durability": (settings.get("translog") or {}).get("durability")}
+        settings["refresh_interval"] = "-1"
+        settings["number_of_replicas"] = "0"
+        settings.setdefault("translog", {})["durability"] = BULK_TRANSLOG_DURABILITY
     mappings = apply_field_overrides(mappings, FIELD_TYPE_OVERRIDES, FIELD_DATE_FORMATS)
-    body = {"settings": settings, "mappings": mappings}
+    return {"settings": settings, "mappings": mappings}, restore
+
+def create_index_from_src(src, dst, shards=None):
+    """
+    Buat dst meniru src (+ overrides). Kalau BULK_LOAD_PROFILE aktif,
+    return setting yang harus dikembalikan setelah load, selain itu None.
+    """
+    if index_exists(dst): return None
+    body, restore = build_dest_body(src, shards)
     r = _req("PUT", dst, data=json.dumps(body))
     if r.status_code not in (200,201):
         raise RuntimeError("Gagal create '%s': %s %s" % (dst, r.status_code, r.text))
+    return restore
 
 # =============== Reindex helpers ===============
 def build_reindex_script(overrides, enable_clean_ips):
@@ -204,12 +543,206 @@ def build_reindex_script(overrides, enable_clean_ips):
     """
     return {"lang": "painless", "source": src, "params": {"ip_fields": ip_fields}}
 
-def start_reindex(src, dst, slices, refresh, conflicts, script=None, pipeline=None):
+# Versi ingest pipeline dari cleaning di atas + convert untuk FIELD_TYPE_OVERRIDES.
+# Token non-IPv4 dibuang dengan gsub (foreach tidak bisa menghapus elemen array),
+# split hanya kalau tersisa >1 IP supaya 1 IP tetap skalar seperti versi script.
+_NON_IPV4_TOKEN = r"(?:^|(?<=,))(?!(?:\d{1,3}\.){3}\d{1,3}(?:,|$))[^,]*(?:,|$)"
+_CONVERT_TYPES = {"integer": "integer", "short": "integer", "byte": "integer", "long": "long",
+                  "float": "float", "half_float": "float", "double": "double", "boolean": "boolean"}
+
+def build_ingest_pipeline(overrides, enable_clean_ips):
+    procs = []
+    for f, ftype in sorted(overrides.items()):
+        ref = "ctx[%s]" % json.dumps(f)
+        is_str = "%s instanceof String" % ref
+        if ftype == "ip" and enable_clean_ips:
+            procs += [
+                {"join":   {"field": f, "separator": ",", "if": "%s instanceof List" % ref}},
+                {"gsub":   {"field": f, "pattern": r"[,;\s]+", "replacement": ",", "if": is_str}},
+                {"gsub":   {"field": f, "pattern": _NON_IPV4_TOKEN, "replacement": "", "if": is_str}},
+                {"gsub":   {"field": f, "pattern": "^,+|,+$", "replacement": "", "if": is_str}},
+                {"remove": {"field": f, "if": "%s == ''" % ref}},
+                {"split":  {"field": f, "separator": ",", "if": "%s && %s.contains(',')" % (is_str, ref)}},
+            ]
+        elif ftype in _CONVERT_TYPES:
+            procs.append({"convert": {"field": f, "type": _CONVERT_TYPES[ftype],
+                                      "ignore_missing": True, "ignore_failure": True}})
+    if not procs: return None
+    return {"description": "reindex.py: cleaning IP + convert FIELD_TYPE_OVERRIDES", "processors": procs}
+
+def put_pipeline(pipeline_id, body):
+    r = _req("PUT", "_ingest/pipeline/%s" % pipeline_id, data=json.dumps(body))
+    if r.status_code != 200:
+        raise RuntimeError("Gagal daftar pipeline '%s': %s %s" % (pipeline_id, r.status_code, r.text))
+
+def sample_docs(index, size, random=False, seed=None, query=None):
+    """
+    Ambil `size` doc dari index (opsional hanya yang cocok `query`).
+    random=True: urutan acak via random_score (seed default = waktu sekarang).
+    """
+    query = query or {"match_all": {}}
+    if random:
+        query = {"function_score": {"query": query, "boost_mode": "replace",
+                                    "random_score": {"seed": int(seed if seed is not None else time.time()),
+                                                     "field": "_seq_no"}}}
+    r = _req("POST", "%s/_search" % index, data=json.dumps({"size": int(size), "query": query}))
+    if r.status_code != 200:
+        raise RuntimeError("Gagal sample '%s': %s %s" % (index, r.status_code, r.text))
+    return r.json().get("hits", {}).get("hits", [])
+
+def simulate_pipeline(pipeline, hits, script=None):
+    """
+    Jalankan hits lewat cleaning batch: pipeline = id terdaftar atau body
+    inline; script reindex dibungkus processor script (di ingest, ctx =
+    _source). Tanpa keduanya doc dikembalikan apa adanya. Return list
+    (hit, _source hasil atau None kalau dibuang, error atau None).
+    """
+    if isinstance(pipeline, dict):
+        path, body = "_ingest/pipeline/_simulate", {"pipeline": pipeline}
+    elif pipeline:
+        path, body = "_ingest/pipeline/%s/_simulate" % pipeline, {}
+    elif script:
+        proc = dict(script, source=script["source"].replace("ctx._source", "ctx"))
+        path, body = "_ingest/pipeline/_simulate", {"pipeline": {"processors": [{"script": proc}]}}
+    else:
+        return [(h, h.get("_source") or {}, None) for h in hits]
+    body["docs"] = [{"_index": h.get("_index"), "_id": h.get("_id"), "_source": h.get("_source", {})} for h in hits]
+    r = _req("POST", path, data=json.dumps(body))
+    if r.status_code != 200:
+        raise RuntimeError("Gagal simulate cleaning: %s %s" % (r.status_code, r.text))
+    out = []
+    for h, d in zip(hits, r.json().get("docs", [])):
+        if d is None: out.append((h, None, None))   # di-drop processor
+        elif d.get("error"): out.append((h, None, d["error"]))
+        else: out.append((h, (d.get("doc") or {}).get("_source"), None))
+    return out
+
+def prepare_pipeline(sample_index):
+    """Daftarkan pipeline sekali per batch, lalu simulate di sample doc. Return id atau None."""
+    body = build_ingest_pipeline(FIELD_TYPE_OVERRIDES, ENABLE_CLEAN_IPS)
+    if not body: return None
+    put_pipeline(PIPELINE_ID, body)
+    hits = sample_docs(sample_index, SIMULATE_DOCS)
+    results = simulate_pipeline(PIPELINE_ID, hits)
+    errors = [e for _, _, e in results if e]
+    print("Pipeline '%s' (%d processor) disimulasikan di %d doc %s: ok=%d error=%d" % (
+        PIPELINE_ID, len(body["processors"]), len(hits), sample_index, len(results) - len(errors), len(errors)))
+    for before, after, _ in [r for r in results if not r[2]][:2]:
+        print("  contoh: %s\n      -> %s" % (json.dumps(before.get("_source")), json.dumps(after)))
+    if errors:
+        raise RuntimeError("Simulasi pipeline gagal: %s" % json.dumps(errors[0]))
+    return PIPELINE_ID
+
+# =============== Pre-flight ===============
+_FIELD_IN_REASON = re.compile(r"field \[([^\]]+)\]")
+
+def _bulk_error_field(err):
+    """Ambil nama field dari error bulk (mapper_parsing_exception dst)."""
+    while err:
+        m = _FIELD_IN_REASON.search(err.get("reason") or "")
+        if m: return m.group(1)
+        err = err.get("caused_by")
+    return "_doc"
+
+def bulk_index(index, docs):
+    """docs: list (id, source). Return dict id -> error untuk item yang gagal."""
+    lines = []
+    for doc_id, source in docs:
+        lines.append(json.dumps({"index": {"_index": index, "_id": doc_id}}))
+        lines.append(json.dumps(source))
+    r = _req("POST", "_bulk", data="\n".join(lines) + "\n",
+             headers={"Content-Type": "application/x-ndjson"})
+    if r.status_code != 200:
+        raise RuntimeError("Gagal bulk '%s': %s %s" % (index, r.status_code, r.text[:500]))
+    failed = {}
+    for item in r.json().get("items", []):
+        res = item.get("index") or {}
+        if res.get("error"): failed[res.get("_id")] = res["error"]
+    return failed
+
+def preflight_index(src, script=None, pipeline=None):
+    """
+    Sample PREFLIGHT_DOCS doc acak dari src -> cleaning -> bulk ke
+    <src>-reindex-preflight (mapping target, tanpa replica). Return dict
+    field -> {"present", "failed", "example"} ("_clean" = error cleaning).
+    """
+    scratch = "%s-reindex-preflight" % src
+    hits = sample_docs(src, PREFLIGHT_DOCS, random=True)
+    fields = {}
+    def bump(f, key, example=None):
+        st = fields.setdefault(f, {"present": 0, "failed": 0, "example": None})
+        st[key] += 1
+        if example and not st["example"]: st["example"] = example
+    docs = []
+    for h, source, err in simulate_pipeline(pipeline, hits, script):
+        if err:
+            bump("_clean", "present"); bump("_clean", "failed", err.get("reason") or json.dumps(err))
+        elif source is not None:
+            docs.append((h.get("_id"), source))
+    for _, source in docs:
+        for f in FIELD_TYPE_OVERRIDES:
+            if f in source: bump(f, "present")
+    if not docs: return fields
+
+    body, _ = build_dest_body(src)
+    body["settings"].update({"number_of_replicas": "0", "refresh_interval": "-1"})
+    delete_index(scratch)
+    r = _req("PUT", scratch, data=json.dumps(body))
+    if r.status_code not in (200, 201):
+        raise RuntimeError("Gagal create '%s': %s %s" % (scratch, r.status_code, r.text))
+    try:
+        failed = bulk_index(scratch, docs)
+    finally:
+        delete_index(scratch)
+    by_id = dict(docs)
+    for doc_id, err in failed.items():
+        f = _bulk_error_field(err)
+        value = (by_id.get(doc_id) or {}).get(f)
+        if f not in fields: bump(f, "present")
+        bump(f, "failed", "%s (nilai: %s)" % (err.get("reason"), json.dumps(value)))
+    return fields
+
+def run_preflight(sources, script=None, pipeline=None):
+    """Pre-flight semua sources. Return True kalau semua field di bawah PREFLIGHT_MAX_FAIL_RATE."""
+    print("\n=== Pre-flight override (%d doc acak per index) ===" % PREFLIGHT_DOCS)
+    total = {}
+    for src in sources:
+        try:
+            fields = preflight_index(src, script, pipeline)
+        except Exception as e:
+            print("  ! %s: pre-flight gagal: %s" % (src, e))
+            return False
+        bad = ["%s %d/%d" % (f, st["failed"], st["present"]) for f, st in sorted(fields.items()) if st["failed"]]
+        print("  %-55s %s" % (src, ("GAGAL: " + ", ".join(bad)) if bad else "ok"))
+        for f, st in fields.items():
+            agg = total.setdefault(f, {"present": 0, "failed": 0, "example": None})
+            agg["present"] += st["present"]; agg["failed"] += st["failed"]
+            agg["example"] = agg["example"] or st["example"]
+    ok = True
+    print("  %-30s %-10s %8s %8s %8s" % ("field", "tipe", "ada", "gagal", "rate"))
+    for f, st in sorted(total.items()):
+        rate = float(st["failed"]) / st["present"] if st["present"] else 0.0
+        print("  %-30s %-10s %8d %8d %7.1f%%" % (f, FIELD_TYPE_OVERRIDES.get(f, "-"), st["present"], st["failed"], 100 * rate))
+        if st["example"]: print("      contoh: %s" % st["example"])
+        if rate > PREFLIGHT_MAX_FAIL_RATE: ok = False
+    return ok
+
+def _slices_param(slices):
+    return "auto" if str(slices) == "auto" else str(int(slices))
+
+def start_reindex(src, dst, slices, refresh, conflicts, script=None, pipeline=None, max_docs=None,
+                  requests_per_second=None, source_excludes=None, batch_size=None, query=None, op_type=None):
     dest_obj = {"index": dst}
     if pipeline: dest_obj["pipeline"] = pipeline
+    if op_type: dest_obj["op_type"] = op_type
     body = {"source":{"index":src}, "dest":dest_obj, "conflicts":conflicts}
+    if query: body["source"]["query"] = query
+    if source_excludes: body["source"]["_source"] = {"excludes": list(source_excludes)}
+    if batch_size: body["source"]["size"] = int(batch_size)
     if script: body["script"] = script
-    params = {"wait_for_completion":"false", "slices": str(int(slices)), "refresh": "true" if refresh else "false"}
+    if max_docs: body["max_docs"] = int(max_docs)
+    params = {"wait_for_completion":"false", "slices": _slices_param(slices), "refresh": "true" if refresh else "false"}
+    if requests_per_second: params["requests_per_second"] = str(int(requests_per_second))
     r = _req("POST", "_reindex", params=params, data=json.dumps(body))
     if r.status_code not in (200,201):
         raise RuntimeError("Gagal mulai reindex %s -> %s: %s %s" % (src, dst, r.status_code, r.text))
@@ -217,16 +750,56 @@ def start_reindex(src, dst, slices, refresh, conflicts, script=None, pipeline=No
     if not task: raise RuntimeError("Task ID kosong")
     return task
 
-def wait_task(task):
-    while True:
-        r = _req("GET", "_tasks/%s" % task)
-        if r.status_code != 200:
-            raise RuntimeError("Gagal cek task: %s %s" % (r.status_code, r.text))
-        data = r.json()
-        if data.get("completed"): return data
-        time.sleep(POLL_SEC)
+def start_update_by_query(index, slices, query, script=None, pipeline=None, requests_per_second=None,
+                          batch_size=None):
+    body = {"query": query}
+    if script: body["script"] = script
+    params = {"wait_for_completion": "false", "slices": _slices_param(slices), "conflicts": CONFLICTS,
+              "refresh": "true" if REFRESH else "false"}
+    if batch_size: params["scroll_size"] = str(int(batch_size))
+    if pipeline: params["pipeline"] = pipeline
+    if requests_per_second: params["requests_per_second"] = str(int(requests_per_second))
+    r = _req("POST", "%s/_update_by_query" % index, params=params, data=json.dumps(body))
+    if r.status_code not in (200, 201):
+        raise RuntimeError("Gagal mulai update_by_query %s: %s %s" % (index, r.status_code, r.text))
+    task = r.json().get("task")
+    if not task: raise RuntimeError("Task ID kosong")
+    return task
+
+def get_task(task):
+    return taskwatch.get_task(_req, task)
+
+def wait_task(task, label=None, throttle=None):
+    return taskwatch.watch_task(_req, task, label or task, POLL_SEC, LONG_POLL_SEC,
+                                METRICS_FILE, PROGRESS_EVERY_SEC, throttle)
+
+def new_throttle():
+    if not ADAPTIVE_THROTTLE: return None
+    return taskwatch.ThrottleController(
+        _req, THROTTLE_MIN_RPS, THROTTLE_MAX_RPS, THROTTLE_START_RPS, THROTTLE_INTERVAL_SEC,
+        THROTTLE_WRITE_QUEUE_MAX, THROTTLE_SEARCH_LATENCY_MS, THROTTLE_HEAP_PCT_MAX,
+        log_file=THROTTLE_LOG_FILE)
+
+def new_tracker(label, task):
+    return taskwatch.ProgressTracker(label, task, METRICS_FILE, PROGRESS_EVERY_SEC)
 
 # =============== Alias (opsional) ===============
+def verify_excludes():
+    """Field yang memang diubah cleaning atau dibuang (SOURCE_EXCLUDES), tidak ikut dibandingkan."""
+    out = list(SOURCE_EXCLUDES)
+    for f, ftype in FIELD_TYPE_OVERRIDES.items():
+        if (ftype == "ip" and ENABLE_CLEAN_IPS) or (CLEAN_MODE == "pipeline" and ftype in _CONVERT_TYPES):
+            out.append(f)
+    return sorted(out)
+
+def verify_pair_content(src, dst, label=None):
+    res = content_verify.verify_content(
+        _req, src, dst, VERIFY_SLICES, VERIFY_PAGE_SIZE, verify_excludes(),
+        sample_pct=VERIFY_SAMPLE_PCT if VERIFY_CONTENT == "sample" else None,
+        label=label or src, print_every_sec=PROGRESS_EVERY_SEC)
+    content_verify.write_report(VERIFY_REPORT_FILE, res)
+    return res
+
 def update_aliases(actions):
     r = _req("POST", "_aliases", data=json.dumps({"actions": actions}))
     if r.status_code != 200:
@@ -241,11 +814,43 @@ def swap_aliases_atomic(src, dst, read_alias, write_alias):
     if actions:
         update_aliases(actions)
 
+def consolidate_aliases(members, dst):
+    """
+    Pindahkan semua alias milik daily ke dst dalam satu _aliases (atomik),
+    filter/routing ikut. Return daftar alias yang dipindah.
+    """
+    r = _req("GET", "%s/_alias" % ",".join(members))
+    if r.status_code != 200:
+        raise RuntimeError("Gagal baca alias daily: %s %s" % (r.status_code, r.text))
+    actions, added = [], {}
+    for idx, v in sorted(r.json().items()):
+        for alias, meta in sorted((v.get("aliases") or {}).items()):
+            actions.append({"remove": {"index": idx, "alias": alias}})
+            if alias in added: continue
+            add = {"index": dst, "alias": alias}
+            for k in ("filter", "index_routing", "search_routing"):
+                if (meta or {}).get(k): add[k] = meta[k]
+            added[alias] = add
+    if actions:
+        update_aliases(actions + [{"add": added[a]} for a in sorted(added)])
+    return sorted(added)
+
+def record_consolidation(pair, aliases):
+    """Catat mapping daily lama -> index konsolidasi ke CONSOLIDATE_MAP_FILE."""
+    if not CONSOLIDATE_MAP_FILE: return
+    mapping = load_journal(CONSOLIDATE_MAP_FILE)
+    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    for member in pair["members"]:
+        mapping[member] = {"dst": pair["dst"], "aliases": aliases, "docs": pair["dst_after"], "ts": ts}
+    try: save_journal(CONSOLIDATE_MAP_FILE, mapping)
+    except (IOError, OSError) as e: _plog(pair, "! Gagal tulis %s: %s" % (CONSOLIDATE_MAP_FILE, e))
+
 # =============== Selection helpers ===============
-def glob_to_regex(glob_pattern):
-    # sangat sederhana: * -> .*
-    pattern = "^" + re.escape(glob_pattern).replace("\\*", ".*") + "$"
-    return re.compile(pattern)
+def _fmt_bytes(n):
+    n = float(n or 0)
+    for unit in ["B", "KB", "MB", "GB", "TB"]:
+        if n < 1024 or unit == "TB": return "%.1f%s" % (n, unit)
+        n /= 1024
 
 def enumerate_date_range(prefix, start_str, end_str, fmt):
     start = datetime.strptime(start_str, fmt)
@@ -258,105 +863,1334 @@ def enumerate_date_range(prefix, start_str, end_str, fmt):
         cur += timedelta(days=1)
     return out
 
-# =============== main ===============
-def main():
-    # 1) ambil semua index yang ada
+# =============== Scheduler ===============
+# State machine per pair:
+#   pending -> create -> reindex -> verify -> forcemerge -> restore -> alias -> done
+# (atau skipped / failed). Phase disimpan di dict pair supaya ringkasan bisa
+# menunjukkan sampai mana tiap pair jalan. Langkah yang lama menunggu tidak
+# menahan loop scheduler: pair["wait"] = "verify" (verifikasi isi di thread),
+# "merge" (antrean forcemerge) atau "green" (health dipoll tiap tick).
+_JOURNAL = {}
+_MERGES = None   # mergequeue.ForcemergeQueue milik run_batch yang sedang jalan
+_JOURNAL_KEYS = ["dst", "phase", "task", "src_before", "dst_before", "src_after", "dst_after",
+                 "created", "started", "finished", "error", "restore", "bulk_profile", "src_bytes", "dst_bytes"]
+# fase setelah task reindex selesai (cukup ulang langkah pasca-reindex)
+_POST_REINDEX_PHASES = ("verify", "forcemerge", "restore", "alias")
+
+def load_journal(path):
+    if not path or not os.path.exists(path): return {}
+    try:
+        with open(path) as f: return json.load(f)
+    except (IOError, ValueError) as e:
+        print("! Journal %s tidak terbaca (%s), mulai dari kosong." % (path, e))
+        return {}
+
+def save_journal(path, journal):
+    # tulis ke file sementara lalu rename supaya journal tidak pernah setengah tertulis
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(journal, f, indent=2, sort_keys=True)
+    os.rename(tmp, path)
+
+def _journal_key(pair):
+    return "%s -> %s" % (pair["src"], pair["dst"])
+
+def _journal_pair(pair):
+    if not JOURNAL_FILE: return
+    entry = dict((k, pair.get(k)) for k in _JOURNAL_KEYS)
+    entry["updated"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    _JOURNAL[_journal_key(pair)] = entry
+    try: save_journal(JOURNAL_FILE, _JOURNAL)
+    except (IOError, OSError) as e: _plog(pair, "! Gagal tulis journal: %s" % e)
+
+def _set_phase(pair, phase):
+    pair["phase"] = phase
+    if phase != "skipped": _journal_pair(pair)
+
+def new_pair(src, dst=None, members=None, shards=None, path="reindex"):
+    """
+    Satu pair reindex. Konsolidasi: members = daily sumber (src = nama-nama
+    digabung koma, multi-index), template mapping dari daily terbaru.
+    path "fixup": _update_by_query in-place, dst = src.
+    """
+    if path == "fixup": dst = src
+    return {"src": src, "dst": dst or src + "-reindex", "phase": "pending", "task": None,
+            "members": members, "shards": shards, "path": path,
+            "label": ("%s (%d index)" % (dst, len(members))) if members else src,
+            "src_before": None, "dst_before": None, "src_after": None, "dst_after": None,
+            "created": 0, "started": None, "finished": None, "error": None,
+            "restore": None, "bulk_profile": False, "src_bytes": None, "dst_bytes": None, "wait": None}
+
+def _plog(pair, msg):
+    print("  [%s] %s" % (pair["label"], msg))
+
+def pair_resume(pair):
+    """
+    Cocokkan pair dengan journal run sebelumnya. Return:
+      "skip"   - sudah terverifikasi selesai
+      "attach" - task lama masih bisa dipantau (jalan / selesai)
+      "finish" - reindex sudah selesai, ulang langkah pasca-reindex (pair_finish)
+      "start"  - mulai dari awal (dest setengah jadi dihapus dulu)
+    """
+    entry = _JOURNAL.get(_journal_key(pair))
+    if not entry: return "start"
+    phase, task = entry.get("phase"), entry.get("task")
+    print("\n=== Resume pair (journal: fase %s) ===\nSRC: %s\nDST: %s" % (phase, pair["label"], pair["dst"]))
+    if phase == "done":
+        action, reason = check_done(pair, entry)
+        if action == "skip":
+            pair["phase"] = "skipped"; _plog(pair, "SKIP: sudah terverifikasi selesai (journal)."); return "skip"
+        if action == "alias":
+            for k in _JOURNAL_KEYS:
+                if k in entry and k != "phase": pair[k] = entry[k]
+            _plog(pair, "Journal done, tapi %s. Alias dipindah ulang." % reason)
+            repair_aliases(pair)
+            _set_phase(pair, "done"); return "skip"
+        _plog(pair, "Journal done, tapi %s. Pair diulang." % reason)
+        if index_exists(pair["dst"]) and index_aliases(pair["dst"]):
+            raise RuntimeError("%s dipakai alias %s, tidak dihapus otomatis; periksa manual."
+                               % (pair["dst"], ", ".join(index_aliases(pair["dst"]))))
+        entry, task = {}, None
+
+    for k in _JOURNAL_KEYS:
+        if k in entry and k != "phase": pair[k] = entry[k]
+    if task:
+        try:
+            data = get_task(task)
+        except Exception as e:
+            data = None
+            _plog(pair, "Task %s tidak bisa dicek lagi: %s" % (task, e))
+        if data is not None:
+            pair["phase"] = "reindex"
+            _plog(pair, "Reattach ke task %s (%s)." % (task, "selesai" if data.get("completed") else "masih jalan"))
+            pair["resumed"] = True
+            return "attach"
+        if phase in _POST_REINDEX_PHASES:
+            pair["resumed"] = True
+            # reindex sudah selesai sebelumnya, cukup ulang langkah pasca-reindex
+            _plog(pair, "Reindex sudah selesai sebelumnya, lanjut dari fase %s." % phase)
+            return "finish"
+
+    # create/reindex terputus tanpa task yang bisa dilacak -> ulang dari awal
+    pair["task"] = None
+    if pair["path"] == "fixup":
+        return "start"   # in-place: dst = source, jangan dihapus; update_by_query aman diulang
+    if index_exists(pair["dst"]):
+        _plog(pair, "Dest setengah jadi, dihapus lalu diulang.")
+        delete_index(pair["dst"])
+    return "start"
+
+def alias_indices(alias):
+    r = _req("GET", "_alias/%s" % alias)
+    if r.status_code == 404: return set()
+    if r.status_code != 200:
+        raise RuntimeError("Gagal baca alias '%s': %s %s" % (alias, r.status_code, r.text))
+    return set(r.json())
+
+def index_aliases(index):
+    r = _req("GET", "%s/_alias" % index)
+    if r.status_code != 200:
+        raise RuntimeError("Gagal baca alias %s: %s %s" % (index, r.status_code, r.text))
+    return sorted((r.json().get(index) or {}).get("aliases") or {})
+
+def check_done(pair, entry):
+    """
+    Entry journal "done" masih sesuai cluster? Return (aksi, alasan):
+      "skip"  - dest ada, jumlah doc sesuai journal, alias menunjuk ke dest
+      "alias" - dest benar tapi READ_ALIAS/WRITE_ALIAS belum menunjuk ke dest
+      "start" - dest hilang / jumlah doc beda (dihapus atau diubah di luar script)
+    """
+    src, dst = pair["src"], pair["dst"]
+    if pair["path"] == "fixup":
+        return ("skip", None) if index_exists(src) else ("start", "%s tidak ada" % src)
+    if not index_exists(dst):
+        return "start", "dest %s tidak ada" % dst
+    expected, cnt = entry.get("dst_after"), count_docs(dst)
+    # dest yang sudah menerima write lewat alias boleh bertambah
+    grows = bool(WRITE_ALIAS or pair["members"])
+    if expected is not None and (cnt < expected if grows else cnt != expected):
+        return "start", "docs dest %d, journal %d" % (cnt, expected)
+    missing = [] if pair["members"] else missing_aliases(pair)
+    if missing:
+        return "alias", "alias %s belum menunjuk ke %s" % (", ".join(missing), dst)
+    return "skip", None
+
+def missing_aliases(pair):
+    return [a for a in (READ_ALIAS, WRITE_ALIAS) if a and pair["dst"] not in alias_indices(a)]
+
+def repair_aliases(pair):
+    """Pasang alias yang belum menunjuk ke dest; dilepas dari source kalau masih di sana."""
+    actions = []
+    for alias in missing_aliases(pair):
+        if pair["src"] in alias_indices(alias):
+            actions.append({"remove": {"index": pair["src"], "alias": alias}})
+        actions.append({"add": {"index": pair["dst"], "alias": alias}})
+    if actions: update_aliases(actions)
+
+def pair_start(pair, script, pipeline=None, throttle=None):
+    """Jalankan fase create + mulai reindex. False jika pair di-skip."""
+    src, dst = pair["src"], pair["dst"]
+    print("\n=== Reindex pair ===\nSRC: %s\nDST: %s" % (pair["label"], dst))
+
+    if not index_exists(src):
+        pair["phase"] = "skipped"; _plog(pair, "SKIP: source tidak ada."); return False
+    if pair["path"] == "fixup":
+        return pair_start_fixup(pair, script, pipeline, throttle)
+    if SKIP_IF_DEST_EXISTS and index_exists(dst):
+        pair["phase"] = "skipped"; _plog(pair, "SKIP: dest sudah ada (idempotent)."); return False
+    _set_phase(pair, "create")
+
+    # create dest from src (clone + overrides)
+    template = pair["members"][-1] if pair["members"] else src
+    pair["restore"] = create_index_from_src(template, dst, pair["shards"])
+    pair["bulk_profile"] = pair["restore"] is not None
+    if pair["bulk_profile"]:
+        _plog(pair, "Bulk-load profile aktif (refresh=-1, replica=0, translog=%s)" % BULK_TRANSLOG_DURABILITY)
+
+    # counts (pre)
+    try: pair["src_before"] = count_docs(src)
+    except: pass
+    try: pair["dst_before"] = count_docs(dst)
+    except: pass
+    _plog(pair, "Docs source=%s dest(sebelum)=%s" % (pair["src_before"], pair["dst_before"]))
+
+    # start reindex
+    pair["task"] = start_reindex(src, dst, SLICES, REFRESH, CONFLICTS, script=script, pipeline=pipeline,
+                                 requests_per_second=throttle.rps if throttle else None,
+                                 source_excludes=SOURCE_EXCLUDES, batch_size=SOURCE_BATCH_SIZE)
+    pair["started"] = time.time()
+    _set_phase(pair, "reindex")
+    _plog(pair, "Task: %s" % pair["task"])
+    return True
+
+def pair_start_fixup(pair, script, pipeline=None, throttle=None):
+    """Jalur fix-up: field override yang belum ada ditambah ke mapping, lalu _update_by_query doc kotor."""
+    src = pair["src"]
+    _set_phase(pair, "create")
+    _, missing = mapping_changes(get_index_def(src).get("mappings") or {})
+    if missing:
+        body = apply_field_overrides({}, dict((f, FIELD_TYPE_OVERRIDES[f]) for f in missing), FIELD_DATE_FORMATS)
+        r = _req("PUT", "%s/_mapping" % src, data=json.dumps(body))
+        if r.status_code != 200:
+            raise RuntimeError("Gagal tambah mapping %s: %s %s" % (", ".join(missing), r.status_code, r.text))
+        _plog(pair, "Mapping ditambah: %s" % ", ".join(missing))
+    pair["src_before"] = count_docs(src)
+    pair["dst_before"] = count_query(src, fixup_query())
+    _plog(pair, "Fix-up in-place: %s doc kotor dari %s" % (pair["dst_before"], pair["src_before"]))
+    pair["task"] = start_update_by_query(src, SLICES, fixup_query(), script=script, pipeline=pipeline,
+                                         requests_per_second=throttle.rps if throttle else None,
+                                         batch_size=SOURCE_BATCH_SIZE)
+    pair["started"] = time.time()
+    _set_phase(pair, "reindex")
+    _plog(pair, "Task update_by_query: %s" % pair["task"])
+    return True
+
+def pair_finish_fixup(pair, done):
+    """Verifikasi fix-up: doc kotor tersisa dihitung ulang, count total tidak boleh berubah."""
+    src = pair["src"]
+    _set_phase(pair, "verify")
+    pair["src_after"] = count_docs(src)
+    pair["dst_after"] = count_query(src, fixup_query())
+    _plog(pair, "Docs total=%s (sebelum %s), doc kotor tersisa=%s" % (pair["src_after"], pair["src_before"], pair["dst_after"]))
+    failures = (done.get("response") or {}).get("failures") or []
+    if failures:
+        _plog(pair, "! PERINGATAN: %d failure update_by_query, contoh: %s" % (len(failures), json.dumps(failures[0])[:300]))
+    if pair["dst_after"]:
+        _plog(pair, "! PERINGATAN: masih ada doc kotor (nilai tanpa IP valid / konflik versi), cek manual.")
+    _set_phase(pair, "done")
+    record_profile_stat(pair)
+    record_history(pair)
+
+def pair_finish(pair, done):
+    """Fase setelah task reindex selesai: verify, lalu forcemerge masuk antrean."""
+    src, dst = pair["src"], pair["dst"]
+    task = done.get("task") or {}
+    if task.get("start_time_in_millis"): pair["started"] = task["start_time_in_millis"] / 1000.0
+    if task.get("running_time_in_nanos") is not None and pair["started"]:
+        # durasi dari task di cluster: tetap benar kalau task selesai saat script mati (resume)
+        pair["finished"] = pair["started"] + task["running_time_in_nanos"] / 1e9
+        pair["timed"] = True
+    else:
+        pair["finished"] = pair["finished"] or time.time()
+    summary = done.get("response") or done.get("task", {})
+    pair["created"] = (summary.get("created") or 0) + (summary.get("updated") or 0)
+    _plog(pair, "Reindex selesai (%.1fs):" % (pair["finished"] - (pair["started"] or pair["finished"])))
+    try: print(json.dumps(summary, indent=2))
+    except: print(summary)
+    if pair["path"] == "fixup":
+        return pair_finish_fixup(pair, done)
+
+    # verify
+    _set_phase(pair, "verify")
     try:
-        all_idx = list_indices()
+        pair["src_after"] = count_docs(src)
+        pair["dst_after"] = count_docs(dst)
     except Exception as e:
-        sys.stderr.write("ERROR list indices: %s\n" % e)
-        return 1
+        _plog(pair, "! Gagal verifikasi: %s" % e)
+    _plog(pair, "Docs source(akhir)=%s dest(akhir)=%s" % (pair["src_after"], pair["dst_after"]))
+    if pair["src_after"] is not None and pair["dst_after"] is not None and pair["dst_after"] < pair["src_after"]:
+        _plog(pair, "! PERINGATAN: dest < source (periksa cleaning/konflik)")
+    if VERIFY_CONTENT != "off":
+        # verifikasi isi bisa puluhan menit: jalan di thread, dipoll run_batch (pair_poll)
+        result = {}
+        def work():
+            try: result["res"] = verify_pair_content(src, dst, pair["label"])
+            except Exception as e: result["error"] = e
+        thread = threading.Thread(target=work, name="verify-%s" % dst)
+        thread.daemon = True
+        thread.start()
+        pair["wait"], pair["verify_job"] = "verify", (thread, result)
+        return
+    pair_verified(pair)
+
+def pair_verified(pair):
+    """Setelah verifikasi: forcemerge masuk antrean (pair lanjut ke pair_complete saat job selesai)."""
+    _set_phase(pair, "forcemerge")
+    if DO_FORCEMERGE and _MERGES is not None:
+        _MERGES.submit(pair["dst"], pair)
+        pair["wait"] = "merge"
+        _plog(pair, "Forcemerge masuk antrean.")
+        return
+    pair_complete(pair)
+
+def pair_complete(pair, merge_error=None):
+    """Fase setelah forcemerge: refresh, restore setting (tunggu green lewat pair_poll), alias."""
+    dst = pair["dst"]
+    pair["wait"] = None
+    if merge_error:
+        _plog(pair, "! Forcemerge gagal (non-fatal): %s" % merge_error)
+    try: refresh_index(dst)
+    except Exception as e: _plog(pair, "! Refresh gagal (non-fatal): %s" % e)
+
+    # kembalikan setting asli dari bulk-load profile, green ditunggu tanpa menahan scheduler
+    _set_phase(pair, "restore")
+    if pair["restore"]:
+        put_index_settings(dst, pair["restore"])
+        _plog(pair, "Setting asli dikembalikan: %s" % json.dumps(pair["restore"]))
+        pair["wait"], pair["green_deadline"] = "green", time.time() + GREEN_WAIT_SEC
+        return
+    pair_alias(pair, True)
+
+def pair_poll(pair):
+    """
+    Cek langkah pasca-reindex yang sedang ditunggu (verify / green). Return
+    True kalau pair maju (bisa saja lanjut menunggu langkah berikutnya).
+    """
+    if pair["wait"] == "verify":
+        thread, result = pair["verify_job"]
+        if thread.is_alive(): return False
+        pair["wait"] = pair["verify_job"] = None
+        if "error" in result: raise result["error"]
+        res = result["res"]
+        _plog(pair, content_verify.format_report(res))
+        if not res["ok"]:
+            raise RuntimeError("Verifikasi isi gagal (hilang=%d beda=%d), alias/setting tidak disentuh."
+                               % (res["missing"], res["mismatch"]))
+        pair_verified(pair)
+        return True
+    if pair["wait"] == "green":
+        if index_status(pair["dst"]) == "green":
+            pair["wait"] = None
+            pair_alias(pair, True)
+            return True
+        if time.time() < pair["green_deadline"]: return False
+        pair["wait"] = None
+        _plog(pair, "! PERINGATAN: %s belum green setelah %ds, alias tidak dipindah." % (pair["dst"], GREEN_WAIT_SEC))
+        pair_alias(pair, False)
+        return True
+    return False
+
+def pair_alias(pair, healthy):
+    """Fase terakhir: swap alias (kalau dest sehat), ukuran store, done."""
+    src, dst = pair["src"], pair["dst"]
+    # (opsional) swap alias read/write; konsolidasi: semua alias daily pindah ke dest
+    _set_phase(pair, "alias")
+    if healthy and pair["members"]:
+        aliases = consolidate_aliases(pair["members"], dst)
+        record_consolidation(pair, aliases)
+        _plog(pair, "Alias dipindahkan ke %s: %s" % (dst, ", ".join(aliases) or "-"))
+    elif healthy and (READ_ALIAS or WRITE_ALIAS):
+        try:
+            swap_aliases_atomic(src, dst, READ_ALIAS, WRITE_ALIAS)
+            _plog(pair, "Alias dipindahkan (jika di-set).")
+        except Exception as e:
+            _plog(pair, "! Swap alias gagal (non-fatal): %s" % e)
+
+    measure_sizes(pair)
+    _set_phase(pair, "done")
+    record_profile_stat(pair)
+    record_history(pair)
 
-    # 2) pilih sources sesuai MODE
+def measure_sizes(pair):
+    """Ukuran store primer source vs dest (setelah forcemerge) untuk laporan hemat disk."""
+    try:
+        pair["src_bytes"] = sum(row["pri_bytes"] for row in list_indices_stats(pair["src"]))
+        pair["dst_bytes"] = sum(row["pri_bytes"] for row in list_indices_stats(pair["dst"]))
+    except Exception as e:
+        _plog(pair, "! Gagal baca ukuran store (non-fatal): %s" % e); return
+    _plog(pair, "Store primer: %s -> %s (%s)" % (_fmt_bytes(pair["src_bytes"]), _fmt_bytes(pair["dst_bytes"]),
+                                                 _fmt_saving(pair["src_bytes"], pair["dst_bytes"])))
+
+def _fmt_saving(before, after):
+    if not before: return "-"
+    return "%+.1f%%" % (100.0 * (after - before) / before)
+
+def _timing_reliable(pair):
+    """Durasi pair hasil resume hanya dipercaya kalau diambil dari task (bukan jam script)."""
+    return bool(pair["started"] and pair["finished"]) and (pair.get("timed") or not pair.get("resumed"))
+
+def record_profile_stat(pair):
+    """Catat docs/s pair ke PROFILE_STATS_FILE (JSONL) untuk banding profile."""
+    if not PROFILE_STATS_FILE or not _timing_reliable(pair): return
+    dur = pair["finished"] - pair["started"]
+    row = {"ts": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "src": pair["src"], "dst": pair["dst"],
+           "docs": pair["created"], "sec": round(dur, 3),
+           "docs_per_sec": round(pair["created"] / dur, 1) if dur > 0 else None,
+           "bulk_profile": pair["bulk_profile"], "src_bytes": pair["src_bytes"], "dst_bytes": pair["dst_bytes"],
+           "codec": INDEX_CODEC or None, "source_excludes": SOURCE_EXCLUDES or None}
+    try:
+        with open(PROFILE_STATS_FILE, "a") as f:
+            f.write(json.dumps(row) + "\n")
+    except IOError as e:
+        print("  ! Gagal tulis %s: %s" % (PROFILE_STATS_FILE, e))
+
+_HISTORY = None
+
+def history():
+    global _HISTORY
+    if _HISTORY is None and HISTORY_DB:
+        _HISTORY = run_history.RunHistory(HISTORY_DB)
+    return _HISTORY
+
+def record_history(pair):
+    if not HISTORY_DB or not _timing_reliable(pair): return
+    try:
+        history().record(tool="reindex", mode="consolidate" if pair["members"] else pair["path"],
+                         src=pair["src"], dst=pair["dst"], clean=CLEAN_MODE, slices=SLICES,
+                         batch_size=SOURCE_BATCH_SIZE, docs=pair["created"], src_bytes=pair["src_bytes"],
+                         dst_bytes=pair["dst_bytes"], sec=pair["finished"] - pair["started"])
+    except Exception as e:
+        _plog(pair, "! Gagal catat histori %s: %s" % (HISTORY_DB, e))
+
+def print_prediction(rows):
+    """rows: (label, mode, docs, bytes primer). Perkiraan dari histori, LPT di MAX_CONCURRENT slot."""
+    if not HISTORY_DB or not rows: return
+    h = history()
+    print("\n=== Perkiraan dari histori (%s) ===" % HISTORY_DB)
+    durations, out_bytes, unknown = [], 0, []
+    for label, mode, docs, nbytes in rows:
+        sec, est_bytes, samples = h.predict("reindex", mode, docs, nbytes, CLEAN_MODE, HISTORY_SAMPLES)
+        if sec is None:
+            unknown.append(label); continue
+        durations.append(sec); out_bytes += est_bytes or 0
+        print("  %-55s %-11s ~%-9s -> %-10s (%d run)" % (label, mode, _fmt_sec(sec), _fmt_bytes(est_bytes), samples))
+    if durations:
+        wall = run_history.schedule_wall_sec(sorted(durations, reverse=True), MAX_CONCURRENT)
+        print("  Total durasi task: ~%s, wall time ~%s (concurrency=%d)" % (
+            _fmt_sec(sum(durations)), _fmt_sec(wall), max(1, int(MAX_CONCURRENT))))
+        print("  Ukuran dest      : ~%s (primer)" % _fmt_bytes(out_bytes))
+    if unknown:
+        print("  Belum ada histori sejenis untuk %d index (mis. %s)." % (len(unknown), unknown[0]))
+    recent, before = h.trend("reindex", "reindex")
+    if recent and before:
+        print("  Throughput 10 run terakhir: %.0f docs/s vs %.0f docs/s sebelumnya (%+.0f%%)" % (
+            recent, before, 100.0 * (recent - before) / before))
+
+def _fmt_sec(sec):
+    sec = int(sec or 0)
+    return "%dh%02dm" % (sec // 3600, (sec % 3600) // 60) if sec >= 3600 else "%dm%02ds" % (sec // 60, sec % 60)
+
+def print_profile_comparison():
+    """Rata-rata docs/s dari seluruh histori PROFILE_STATS_FILE, dengan vs tanpa profile."""
+    if not PROFILE_STATS_FILE or not os.path.exists(PROFILE_STATS_FILE): return
+    agg = {True: [0, 0.0], False: [0, 0.0]}
+    with open(PROFILE_STATS_FILE) as f:
+        for line in f:
+            try: row = json.loads(line)
+            except ValueError: continue
+            if not row.get("sec"): continue
+            acc = agg[bool(row.get("bulk_profile"))]
+            acc[0] += row.get("docs") or 0; acc[1] += row["sec"]
+    print("\n=== Bulk-load profile (histori %s) ===" % PROFILE_STATS_FILE)
+    for flag, label in [(False, "tanpa profile"), (True, "dengan profile")]:
+        docs, sec = agg[flag]
+        print("  %-15s: %s" % (label, ("%.0f docs/s (%d docs)" % (docs / sec, docs)) if sec > 0 else "belum ada data"))
+    if agg[True][1] > 0 and agg[False][1] > 0 and agg[False][0] > 0:
+        gain = (agg[True][0] / agg[True][1]) / (agg[False][0] / agg[False][1])
+        print("  Rasio          : %.2fx" % gain)
+
+def restore_settings(pair):
+    """
+    Jalur gagal: kembalikan setting asli dest dari bulk-load profile (best
+    effort) supaya index tidak tertinggal refresh=-1 / replica=0. Setting
+    ikut disimpan di journal, jadi pair hasil resume juga dipulihkan.
+    """
+    if not pair.get("restore") or pair["path"] == "fixup": return
+    try:
+        if not index_exists(pair["dst"]): return
+        put_index_settings(pair["dst"], pair["restore"])
+        _plog(pair, "Setting asli dikembalikan: %s" % json.dumps(pair["restore"]))
+    except Exception as e:
+        _plog(pair, "! Gagal kembalikan setting %s: %s (PUT manual: %s)" % (pair["dst"], e, json.dumps(pair["restore"])))
+
+def _pair_failed(pair, e):
+    pair["error"] = str(e)
+    _plog(pair, "! ERROR pada pair %s -> %s (fase %s): %s" % (pair["label"], pair["dst"], pair["phase"], e))
+    restore_settings(pair)
+    _set_phase(pair, "failed")
+
+def run_batch(pairs, script, pipeline=None):
+    """
+    Scheduler konkuren: maks MAX_CONCURRENT task reindex in-flight. Task
+    jalan di cluster (wait_for_completion=false), jadi cukup satu loop yang
+    polling semua task dan mengisi slot kosong begitu ada yang selesai.
+    """
+    global _MERGES
+    queue = list(pairs)
+    inflight = []
+    waiting = []   # pair yang menunggu verify (thread) / green, dipoll tiap tick
+    failures = 0
+    stop = False
+    slots = max(1, int(MAX_CONCURRENT))
+    throttle = new_throttle()
+    _MERGES = mergequeue.ForcemergeQueue(_req, MAX_NUM_SEGMENTS, FORCEMERGE_PER_NODE) if DO_FORCEMERGE else None
+
+    def park(pair):
+        if pair["wait"] in ("verify", "green") and pair not in waiting: waiting.append(pair)
+
+    while (queue and not stop) or inflight or waiting or (_MERGES and _MERGES.busy()):
+        while queue and not stop and len(inflight) < slots:
+            pair = queue.pop(0)
+            try:
+                action = pair_resume(pair)
+                if action == "attach" or (action == "start" and pair_start(pair, script, pipeline, throttle)):
+                    inflight.append(pair)
+                elif action == "finish":
+                    pair_finish(pair, {"response": {"created": pair.get("created") or 0}})
+                    park(pair)
+            except Exception as e:
+                failures += 1
+                _pair_failed(pair, e)
+                if STOP_ON_ERROR: stop = True
+
+        progressed = False
+        for pair in list(inflight):
+            try:
+                done = get_task(pair["task"])
+                if not pair.get("progress"):
+                    pair["progress"] = new_tracker(pair["label"], pair["task"])
+                pair["progress"].sample(done)
+                if not done.get("completed"): continue
+                inflight.remove(pair); progressed = True
+                pair_finish(pair, done)
+                park(pair)
+            except Exception as e:
+                if pair in inflight: inflight.remove(pair)
+                progressed = True
+                failures += 1
+                _pair_failed(pair, e)
+                if STOP_ON_ERROR: stop = True
+
+        if _MERGES:
+            for job in _MERGES.tick():
+                progressed = True
+                try:
+                    pair_complete(job.ctx, job.error)
+                    park(job.ctx)
+                except Exception as e:
+                    failures += 1
+                    _pair_failed(job.ctx, e)
+                    if STOP_ON_ERROR: stop = True
+
+        for pair in list(waiting):
+            try:
+                if not pair_poll(pair): continue
+                progressed = True
+                if pair["wait"] not in ("verify", "green"): waiting.remove(pair)
+            except Exception as e:
+                waiting.remove(pair)
+                progressed = True
+                failures += 1
+                _pair_failed(pair, e)
+                if STOP_ON_ERROR: stop = True
+
+        if throttle:
+            throttle.tick([(p["task"], "_update_by_query" if p["path"] == "fixup" else "_reindex") for p in inflight])
+
+        if stop and queue:
+            print("\nBatch dihentikan karena STOP_ON_ERROR=True (menunggu %d task berjalan)." % len(inflight))
+            queue = []
+        merging = _MERGES is not None and _MERGES.busy()
+        if (inflight or merging or waiting) and not progressed:
+            if len(inflight) == 1 and LONG_POLL_SEC and not merging and not waiting:
+                # tinggal satu task: tunggu di server, bukan polling tiap POLL_SEC
+                try: taskwatch.long_poll(_req, inflight[0]["task"], LONG_POLL_SEC)
+                except Exception as e: _plog(inflight[0], "! Long-poll gagal: %s" % e)
+            else:
+                time.sleep(POLL_SEC)
+
+    return failures
+
+def print_batch_summary(pairs, wall_sec):
+    done = [p for p in pairs if p["phase"] == "done"]
+    total_docs = sum(p["created"] for p in done)
+    busy_sec = sum((p["finished"] - p["started"]) for p in done if p["started"] and p["finished"])
+    print("\n=== Ringkasan throughput ===")
+    for p in pairs:
+        dur = (p["finished"] - p["started"]) if (p["started"] and p["finished"]) else None
+        rate = (p["created"] / dur) if dur else None
+        print("  %-55s %-8s docs=%-10s durasi=%-8s %s" % (
+            p["label"], p["phase"], p["created"],
+            ("%.1fs" % dur) if dur is not None else "-",
+            ("%.0f docs/s" % rate) if rate is not None else ""))
+    print("  Pair selesai     : %d dari %d" % (len(done), len(pairs)))
+    print("  Total docs       : %d" % total_docs)
+    print("  Wall time        : %.1fs (concurrency=%d)" % (wall_sec, max(1, int(MAX_CONCURRENT))))
+    if wall_sec > 0:
+        print("  Throughput       : %.0f docs/s (agregat)" % (total_docs / wall_sec))
+        print("  Paralelisme efektif: %.2fx (jumlah durasi task / wall time)" % (busy_sec / wall_sec))
+    sized = [p for p in done if p["src_bytes"] is not None and p["dst_bytes"] is not None]
+    if sized:
+        print("\n=== Ukuran store primer (sebelum -> sesudah) ===")
+        for p in sized:
+            print("  %-55s %10s -> %-10s %s" % (p["label"], _fmt_bytes(p["src_bytes"]), _fmt_bytes(p["dst_bytes"]),
+                                                _fmt_saving(p["src_bytes"], p["dst_bytes"])))
+        before, after = sum(p["src_bytes"] for p in sized), sum(p["dst_bytes"] for p in sized)
+        print("  %-55s %10s -> %-10s %s (hemat %s)" % ("TOTAL", _fmt_bytes(before), _fmt_bytes(after),
+                                                       _fmt_saving(before, after), _fmt_bytes(max(0, before - after))))
+
+def select_sources():
+    """Pilih sources sesuai MODE, lengkap dengan ukuran, urut terbesar dulu (LPT)."""
     if MODE == "glob":
-        rx = glob_to_regex(GLOB_PATTERN)
-        sources = sorted([i for i in all_idx if rx.match(i)])
+        stats = list_indices_stats(GLOB_PATTERN)
     elif MODE == "date_range":
-        candidates = enumerate_date_range(DR_PREFIX, DR_START, DR_END, DR_FMT)
+        candidates = set(enumerate_date_range(DR_PREFIX, DR_START, DR_END, DR_FMT))
         # pilih hanya yang ada
-        have = set(all_idx)
-        sources = [i for i in candidates if i in have]
+        stats = [row for row in list_indices_stats(DR_PREFIX + "*") if row["index"] in candidates]
     else:
-        sys.stderr.write("MODE tidak dikenal: %s\n" % MODE); return 1
+        raise ValueError("MODE tidak dikenal: %s" % MODE)
+    # Largest-first: task besar mulai duluan supaya batch konkuren tidak
+    # menunggu satu straggler besar di akhir.
+    return sorted(stats, key=lambda row: (-row["bytes"], row["index"]))
 
-    if not sources:
-        print("Tidak ada index yang cocok dengan seleksi (%s)." % MODE)
-        return 0
+def consolidation_period(index):
+    d = datetime.strptime(index[len(DR_PREFIX):], DR_FMT)
+    if CONSOLIDATE == "month": return d.strftime("%Y.%m")
+    if CONSOLIDATE == "week":
+        year, week, _ = d.isocalendar()
+        return "%04d.w%02d" % (year, week)
+    raise ValueError("CONSOLIDATE tidak dikenal: %s" % CONSOLIDATE)
 
-    print("Ditemukan %d index sumber." % len(sources))
+def period_bounds(index):
+    """(hari pertama, hari terakhir) periode konsolidasi daily ini."""
+    d = datetime.strptime(index[len(DR_PREFIX):], DR_FMT)
+    if CONSOLIDATE == "month":
+        first = d.replace(day=1)
+        return first, (first + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    if CONSOLIDATE == "week":
+        first = d - timedelta(days=d.weekday())   # ISO: Senin s/d Minggu
+        return first, first + timedelta(days=6)
+    raise ValueError("CONSOLIDATE tidak dikenal: %s" % CONSOLIDATE)
 
-    # 3) proses satu per satu
-    reindex_script = build_reindex_script(FIELD_TYPE_OVERRIDES, ENABLE_CLEAN_IPS)
+def shards_for_size(pri_bytes):
+    return max(1, int(math.ceil((pri_bytes or 0) / (TARGET_SHARD_SIZE_GB * 1024.0 ** 3))))
 
-    failures = 0
-    for src in sources:
-        dst = src + "-reindex"
-        print("\n=== Reindex pair ===\nSRC: %s\nDST: %s" % (src, dst))
+def dest_shards(row):
+    """Shard primer dest pair 1:1: None = ikut source."""
+    return shards_for_size(row["pri_bytes"]) if SHARDS_FROM_SIZE else None
+
+def group_sources(stats):
+    """Kelompokkan daily per periode. Return grup (format baris stats + dst/members/shards), terbesar dulu."""
+    by_period = {}
+    for row in stats:
+        by_period.setdefault(consolidation_period(row["index"]), []).append(row)
+    start, end = sorted([datetime.strptime(DR_START, DR_FMT), datetime.strptime(DR_END, DR_FMT)])
+    groups = []
+    for period, rows in by_period.items():
+        rows = sorted(rows, key=lambda row: row["index"])
+        pri_bytes = sum(row.get("pri_bytes") or 0 for row in rows)
+        shards = shards_for_size(pri_bytes)
+        first, last = period_bounds(rows[0]["index"])
+        groups.append({"index": ",".join(row["index"] for row in rows), "dst": DR_PREFIX + period + "-reindex",
+                       "members": [row["index"] for row in rows], "docs": sum(row["docs"] for row in rows),
+                       "bytes": sum(row["bytes"] for row in rows), "pri_bytes": pri_bytes,
+                       "pri": sum(row["pri"] for row in rows), "shards": shards,
+                       # periode terpotong rentang tanggal: daily di luar rentang tidak ikut
+                       "partial": first < start or last > end,
+                       "period": (first.strftime(DR_FMT), last.strftime(DR_FMT))})
+    return sorted(groups, key=lambda g: (-g["bytes"], g["dst"]))
+
+def print_consolidation_plan(groups):
+    print("\n=== Rencana konsolidasi (%s, target %dGB per shard primer) ===" % (CONSOLIDATE, TARGET_SHARD_SIZE_GB))
+    for g in groups:
+        print("  %-50s <- %3d index  docs=%-12d size=%-10s shard primer %d -> %d%s" % (
+            g["dst"], len(g["members"]), g["docs"], _fmt_bytes(g["bytes"]), g["pri"], g["shards"],
+            ("  SEBAGIAN (periode %s..%s)" % g["period"]) if g["partial"] else ""))
+    old = sum(g["pri"] for g in groups)
+    new = sum(g["shards"] for g in groups)
+    print("  Index            : %d -> %d" % (sum(len(g["members"]) for g in groups), len(groups)))
+    print("  Shard primer     : %d -> %d (%.1fx lebih sedikit)" % (old, new, float(old) / new if new else 0))
+
+# =============== Index template ===============
+def template_patterns():
+    if TEMPLATE_PATTERNS: return list(TEMPLATE_PATTERNS)
+    return [GLOB_PATTERN] if MODE == "glob" else [DR_PREFIX + "*"]
+
+_TEMPLATE_META = {"managed_by": "opensearch-reindex/reindex.py"}
+# tipe field yang menerima parameter ignore_malformed
+_MALFORMED_TYPES = ("ip", "integer", "long", "short", "byte", "float", "double", "half_float",
+                    "scaled_float", "unsigned_long", "date", "date_nanos")
+
+def build_component():
+    """Return (nama component, body component). ignore_malformed hanya di field override."""
+    mappings = apply_field_overrides({}, FIELD_TYPE_OVERRIDES, FIELD_DATE_FORMATS)
+    if TEMPLATE_IGNORE_MALFORMED:
+        for f, ftype in FIELD_TYPE_OVERRIDES.items():
+            if ftype in _MALFORMED_TYPES:
+                parent_props, leaf = _ensure_path_properties(mappings, f)
+                parent_props[leaf]["ignore_malformed"] = True
+    return TEMPLATE_NAME + "-field-overrides", {"template": {"mappings": mappings}, "_meta": _TEMPLATE_META}
+
+def get_installed_template(kind, name):
+    """kind: "_component_template" / "_index_template". None kalau belum ada."""
+    r = _req("GET", "%s/%s" % (kind, name))
+    if r.status_code == 404: return None
+    if r.status_code != 200:
+        raise RuntimeError("Gagal GET %s/%s: %s %s" % (kind, name, r.status_code, r.text))
+    key = "component_templates" if kind == "_component_template" else "index_templates"
+    for row in r.json().get(key) or []:
+        if row.get("name") == name:
+            return row.get("component_template" if kind == "_component_template" else "index_template")
+    return None
+
+def template_diff(name, installed, wanted):
+    a = json.dumps(installed, indent=2, sort_keys=True).splitlines() if installed is not None else []
+    b = json.dumps(wanted, indent=2, sort_keys=True).splitlines()
+    return list(difflib.unified_diff(a, b, "%s (terpasang)" % name, "%s (baru)" % name, lineterm=""))
+
+def _managed(body):
+    return ((body or {}).get("_meta") or {}).get("managed_by") == _TEMPLATE_META["managed_by"]
+
+def overlapping_templates(patterns):
+    """
+    Template yang polanya overlap dengan patterns. Return (composable, legacy):
+    composable = [(nama, body)] selain template buatan script ini, legacy = [(nama, order)].
+    """
+    composable, legacy = [], []
+    r = _req("GET", "_index_template")
+    if r.status_code not in (200, 404):
+        raise RuntimeError("Gagal GET _index_template: %s %s" % (r.status_code, r.text))
+    for row in (r.json().get("index_templates") or []) if r.status_code == 200 else []:
+        body = row.get("index_template") or {}
+        if row.get("name") == TEMPLATE_NAME and _managed(body): continue
+        if any(_pattern_overlap(p, q) for p in patterns for q in body.get("index_patterns") or []):
+            composable.append((row["name"], body))
+    r = _req("GET", "_template")
+    if r.status_code not in (200, 404):
+        raise RuntimeError("Gagal GET _template: %s %s" % (r.status_code, r.text))
+    for name, body in sorted(r.json().items() if r.status_code == 200 else []):
+        if any(_pattern_overlap(p, q) for p in patterns for q in (body or {}).get("index_patterns") or []):
+            legacy.append((name, (body or {}).get("order")))
+    return sorted(composable), legacy
+
+def _pattern_overlap(p, q):
+    # cukup kasar: prefix sebelum '*' saling mencakup
+    p, q = p.split("*", 1)[0], q.split("*", 1)[0]
+    return p.startswith(q) or q.startswith(p)
+
+def plan_index_template(component, patterns):
+    """
+    Index template yang memuat component. Return (nama, body terpasang, body
+    baru, template lama buatan script ini yang harus dihapus atau None). Raise
+    RuntimeError kalau component tidak bisa dipasang tanpa menutupi template lain.
+    """
+    composable, legacy = overlapping_templates(patterns)
+    own = get_installed_template("_index_template", TEMPLATE_NAME)
+    own = own if _managed(own) else None
+    if TEMPLATE_TARGET:
+        target = [(n, b) for n, b in composable if n == TEMPLATE_TARGET]
+        if not target:
+            body = get_installed_template("_index_template", TEMPLATE_TARGET)
+            if body is None: raise RuntimeError("TEMPLATE_TARGET '%s' tidak ada." % TEMPLATE_TARGET)
+            target = [(TEMPLATE_TARGET, body)]
+    elif len(composable) > 1:
+        raise RuntimeError("Lebih dari satu index template overlap pola %s: %s. Set TEMPLATE_TARGET ke "
+                           "template yang dipakai daily." % (", ".join(patterns), ", ".join(n for n, _ in composable)))
+    else:
+        target = composable
+
+    if not target:
+        if legacy:
+            raise RuntimeError("Legacy _template %s overlap pola %s. Index template composable baru akan membuat "
+                               "template itu diabaikan untuk daily baru; migrasikan dulu ke _index_template lalu "
+                               "ulangi (component ditambahkan ke sana)." % (
+                                   ", ".join("%s (order %s)" % (n, o) for n, o in legacy), ", ".join(patterns)))
+        wanted = {"index_patterns": patterns, "composed_of": [component], "priority": TEMPLATE_PRIORITY,
+                  "_meta": _TEMPLATE_META}
+        return TEMPLATE_NAME, own, wanted, None
+
+    name, installed = target[0]
+    conflicts = [f for f, ftype in sorted(FIELD_TYPE_OVERRIDES.items())
+                 if (_mapped_field(((installed.get("template") or {}).get("mappings")), f) or {}).get("type") not in (None, ftype)]
+    if conflicts:
+        # mapping inline index template selalu menang atas component
+        raise RuntimeError("Index template %s mendefinisikan %s dengan tipe lain di mapping-nya sendiri; "
+                           "ubah di template itu dulu." % (name, ", ".join(conflicts)))
+    wanted = json.loads(json.dumps(installed))
+    if component not in (wanted.get("composed_of") or []):
+        wanted["composed_of"] = list(wanted.get("composed_of") or []) + [component]
+    broader = [q for q in installed.get("index_patterns") or [] if q not in patterns]
+    if broader:
+        print("  ! PERINGATAN: %s juga berlaku untuk pola %s; field override ikut ke index itu."
+              % (name, ", ".join(broader)))
+    for other, body in composable:
+        if other != name and (body.get("priority") or 0) >= (installed.get("priority") or 0):
+            print("  ! PERINGATAN: template %s (priority %s) ikut overlap dan tidak mendapat component."
+                  % (other, body.get("priority")))
+    return name, installed, wanted, (TEMPLATE_NAME if own is not None else None)
+
+def mapping_drift(patterns):
+    """Index existing yang mapping field override-nya beda dari template: {index: [field]}."""
+    r = _req("GET", "%s/_mapping" % ",".join(patterns))
+    if r.status_code == 404: return {}
+    if r.status_code != 200:
+        raise RuntimeError("Gagal GET _mapping: %s %s" % (r.status_code, r.text))
+    drift = {}
+    for index, body in sorted(r.json().items()):
+        changed, _ = mapping_changes(body.get("mappings") or {})
+        if changed: drift[index] = changed
+    return drift
+
+def install_templates(dry_run=False):
+    patterns = template_patterns()
+    component, comp_body = build_component()
+    print("\n=== Index template %s (pola: %s) ===" % (TEMPLATE_NAME, ", ".join(patterns)))
+    try:
+        index_name, installed, index_body, obsolete = plan_index_template(component, patterns)
+    except RuntimeError as e:
+        sys.stderr.write("ERROR template: %s\n" % e)
+        return False
+    print("  Component %s dipasang lewat index template %s." % (component, index_name))
+    changes = []
+    for kind, name, current, body in [("_component_template", component,
+                                       get_installed_template("_component_template", component), comp_body),
+                                      ("_index_template", index_name, installed, index_body)]:
+        diff = template_diff(name, current, body)
+        if diff:
+            changes.append((kind, name, body))
+            print("\n".join(diff))
+        else:
+            print("  %s/%s: sudah sama, tidak diubah." % (kind, name))
+    if obsolete:
+        print("  _index_template/%s (buatan versi lama, menutupi %s) akan dihapus." % (obsolete, index_name))
+
+    drift = mapping_drift(patterns)
+    print("\nIndex existing yang mapping-nya masih beda dari template: %d" % len(drift))
+    for index, fields in sorted(drift.items()):
+        print("  %-55s %s" % (index, ", ".join(fields)))
+    if drift:
+        print("  (index lama tetap perlu reindex; template hanya berlaku untuk index baru)")
+
+    if dry_run: return True
+    # component dulu, index template mereferensikannya
+    for kind, name, body in changes:
+        r = _req("PUT", "%s/%s" % (kind, name), data=json.dumps(body))
+        if r.status_code != 200:
+            sys.stderr.write("ERROR pasang %s/%s: %s %s\n" % (kind, name, r.status_code, r.text))
+            return False
+        print("  %s/%s terpasang." % (kind, name))
+    if obsolete:
+        r = _req("DELETE", "_index_template/%s" % obsolete)
+        if r.status_code not in (200, 404):
+            sys.stderr.write("ERROR hapus _index_template/%s: %s %s\n" % (obsolete, r.status_code, r.text))
+            return False
+        print("  _index_template/%s dihapus." % obsolete)
+    return True
+
+# =============== Scan override ===============
+_IPV4_RE = re.compile(r"^(25[0-5]|2[0-4]\d|1?\d?\d)(\.(25[0-5]|2[0-4]\d|1?\d?\d)){3}$")
+_INT_RE = re.compile(r"^-?\d+$")
+# byte per nilai (kasar: doc values + points/terms) untuk estimasi storage
+_SCAN_VALUE_BYTES = {"ip": 16, "integer": 8, "long": 12}
+
+def _string_fields(props, prefix=""):
+    """Field text/keyword dalam mapping: {path: (tipe, field untuk agg atau None)}."""
+    out = {}
+    for name, node in (props or {}).items():
+        path = prefix + name
+        if node.get("properties"):
+            out.update(_string_fields(node["properties"], path + ".")); continue
+        ftype = node.get("type")
+        if ftype == "keyword":
+            out[path] = (ftype, path)
+        elif ftype == "text":
+            kw = [k for k, sub in (node.get("fields") or {}).items() if sub.get("type") == "keyword"]
+            out[path] = (ftype, "%s.%s" % (path, kw[0]) if kw else None)
+    return out
+
+def classify_values(buckets):
+    """
+    Tebak tipe dari bucket terms agg. Return (tipe|None, porsi cocok, contoh
+    nilai yang tidak cocok, catatan).
+    """
+    total = sum(b["doc_count"] for b in buckets)
+    if not total: return None, 0.0, [], ""
+    hits = {"ip": 0, "int": 0, "list": 0}
+    bad = {"ip": [], "int": []}
+    big = False
+    for b in buckets:
+        v = str(b["key"]).strip()
+        parts = [x for x in re.split(r"[,\s]+", v) if x]
+        if parts and all(_IPV4_RE.match(x) for x in parts):
+            hits["ip"] += b["doc_count"]
+            if len(parts) > 1: hits["list"] += b["doc_count"]
+        else: bad["ip"].append(v)
+        if _INT_RE.match(v):
+            hits["int"] += b["doc_count"]
+            big = big or abs(int(v)) > 2147483647
+        else: bad["int"].append(v)
+    if hits["ip"] >= hits["int"]:
+        note = "%d doc berisi list IP (butuh ENABLE_CLEAN_IPS)" % hits["list"] if hits["list"] else ""
+        return "ip", float(hits["ip"]) / total, bad["ip"][:5], note
+    return ("long" if big else "integer"), float(hits["int"]) / total, bad["int"][:5], ""
+
+def _is_port(path, buckets):
+    return "port" in path.lower() and all(0 <= int(b["key"]) <= 65535 for b in buckets
+                                          if _INT_RE.match(str(b["key"]).strip()))
 
+def _value_len(buckets):
+    total = sum(b["doc_count"] for b in buckets)
+    return sum(len(str(b["key"])) * b["doc_count"] for b in buckets) / float(total) if total else 0.0
+
+def _search_aggs(index, aggs):
+    r = _req("POST", "%s/_search" % index, params={"request_cache": "false"},
+             data=json.dumps({"size": 0, "track_total_hits": False, "aggs": aggs}))
+    if r.status_code != 200:
+        raise RuntimeError("Gagal agg '%s': %s %s" % (index, r.status_code, r.text))
+    return r.json().get("aggregations") or {}
+
+def scan_overrides(sources):
+    """
+    Satu GET _mapping untuk semua sumber, lalu terms agg (batch SCAN_AGG_BATCH
+    field per request) di index terbaru dan hitung doc berfield di semua sumber.
+    """
+    r = _req("GET", "%s/_mapping" % ",".join(template_patterns()))
+    if r.status_code != 200:
+        raise RuntimeError("Gagal GET _mapping: %s %s" % (r.status_code, r.text))
+    wanted = set(sources)
+    fields = {}   # path -> {"types": set, "agg": field, "indices": n}
+    for index, body in r.json().items():
+        if index not in wanted: continue
+        for path, (ftype, agg) in _string_fields((body.get("mappings") or {}).get("properties")).items():
+            row = fields.setdefault(path, {"types": set(), "agg": None, "indices": 0})
+            row["types"].add(ftype); row["indices"] += 1
+            row["agg"] = row["agg"] or agg
+    latest = max(sources)
+    names = sorted(f for f in fields if fields[f]["agg"])
+    print("\n=== Scan override: %d field text/keyword di %d index, sample di %s ===" % (len(fields), len(sources), latest))
+    skipped = sorted(f for f in fields if not fields[f]["agg"])
+    if skipped: print("  (text tanpa sub-field keyword, tidak bisa di-sample: %s)" % ", ".join(skipped))
+
+    results = []
+    for i in range(0, len(names), SCAN_AGG_BATCH):
+        batch = names[i:i + SCAN_AGG_BATCH]
+        terms = dict(("f%d" % j, {"terms": {"field": fields[f]["agg"], "size": SCAN_SAMPLE_VALUES}})
+                     for j, f in enumerate(batch))
+        exists = dict(("f%d" % j, {"exists": {"field": fields[f]["agg"]}}) for j, f in enumerate(batch))
+        sample = _search_aggs(latest, terms)
+        has = _search_aggs(",".join(template_patterns()),
+                           {"has": {"filters": {"filters": exists}}}).get("has", {}).get("buckets", {})
+        for j, f in enumerate(batch):
+            buckets = (sample.get("f%d" % j) or {}).get("buckets") or []
+            ftype, match, bad, note = classify_values(buckets)
+            if not ftype or match < SCAN_MIN_MATCH: continue
+            docs = (has.get("f%d" % j) or {}).get("doc_count", 0)
+            vlen = _value_len(buckets)
+            text = "text" in fields[f]["types"]
+            now = docs * (vlen * (2 if text else 1) + 8)
+            new = docs * _SCAN_VALUE_BYTES[ftype]
+            results.append({"field": f, "type": ftype, "port": ftype != "ip" and _is_port(f, buckets),
+                            "mapped": sorted(fields[f]["types"]), "indices": fields[f]["indices"],
+                            "match": round(match, 4), "bad_examples": bad, "note": note, "docs": docs,
+                            "est_bytes_now": int(now), "est_bytes_new": int(new),
+                            "configured": FIELD_TYPE_OVERRIDES.get(f)})
+    return results
+
+def print_scan(results):
+    if not results:
+        print("  Tidak ada field yang cocok (SCAN_MIN_MATCH=%.2f)." % SCAN_MIN_MATCH); return
+    print("  %-30s %-8s %-14s %7s %12s %10s %10s  %s" % ("field", "usul", "mapping", "cocok", "docs", "skrg", "baru", "catatan"))
+    for r in sorted(results, key=lambda r: -(r["est_bytes_now"] - r["est_bytes_new"])):
+        notes = [n for n in [r["note"], "port" if r["port"] else "",
+                             ("sudah di overrides (%s)" % r["configured"]) if r["configured"] else "",
+                             ("tidak cocok: %s" % ", ".join(r["bad_examples"])) if r["bad_examples"] else ""] if n]
+        print("  %-30s %-8s %-14s %6.1f%% %12d %10s %10s  %s" % (
+            r["field"], r["type"], "/".join(r["mapped"]), 100 * r["match"], r["docs"],
+            _fmt_bytes(r["est_bytes_now"]), _fmt_bytes(r["est_bytes_new"]), "; ".join(notes)))
+    saved = sum(r["est_bytes_now"] - r["est_bytes_new"] for r in results if not r["configured"])
+    print("  Estimasi storage field baru: %s lebih kecil (kasar, primer). Query range/CIDR di keyword"
+          " = scan terms, di ip/integer = BKD tree." % _fmt_bytes(saved))
+    new = [r for r in results if not r["configured"]]
+    if new:
+        print("\nUsulan tambahan FIELD_TYPE_OVERRIDES:")
+        for r in sorted(new, key=lambda r: r["field"]):
+            print('    "%s": "%s",' % (r["field"], r["type"]))
+
+def print_path_plan(plans):
+    print("\n=== Jalur per index (FIXUP_MODE=%s) ===" % FIXUP_MODE)
+    volume = {"reindex": 0, "fixup": 0, "none": 0}
+    for row, path, docs, reason in plans:
+        volume[path] += docs
+        print("  %-55s %-8s docs=%-12d %s" % (row["index"], path, docs, reason))
+    full = sum(row["docs"] for row, _, _, _ in plans)
+    print("  Reindex penuh    : %d index, %d docs" % (sum(1 for p in plans if p[1] == "reindex"), volume["reindex"]))
+    print("  Fix-up in-place  : %d index, %d docs" % (sum(1 for p in plans if p[1] == "fixup"), volume["fixup"]))
+    print("  Tanpa perubahan  : %d index" % sum(1 for p in plans if p[1] == "none"))
+    print("  Volume ditulis   : %d docs (reindex semua: %d docs)" % (volume["reindex"] + volume["fixup"], full))
+
+def print_plan(stats):
+    print("\n=== Rencana batch (urut terbesar dulu) ===")
+    for row in stats:
+        print("  %-55s docs=%-12d size=%-10s pri=%d" % (row["index"], row["docs"], _fmt_bytes(row["bytes"]), row["pri"]))
+    print("  Total index      : %d" % len(stats))
+    print("  Total docs       : %d" % sum(row["docs"] for row in stats))
+    print("  Total size       : %s" % _fmt_bytes(sum(row["bytes"] for row in stats)))
+    print("  Shard primer baru: %d" % sum(dest_shards(row) or row["pri"] for row in stats))
+    if SOURCE_EXCLUDES or INDEX_CODEC:
+        print("  Dest             : codec=%s, _source excludes=%s" % (
+            INDEX_CODEC or "(ikut source)", ", ".join(SOURCE_EXCLUDES) or "-"))
+
+def run_benchmark(src):
+    """
+    Reindex sample yang sama (BENCHMARK_DOCS doc dari src) dengan script
+    lalu dengan pipeline ke index scratch, laporkan docs/s masing-masing.
+    """
+    script = build_reindex_script(FIELD_TYPE_OVERRIDES, ENABLE_CLEAN_IPS)
+    pipeline = prepare_pipeline(src)
+    results = {}
+    for mode, kw in [("script", {"script": script}), ("pipeline", {"pipeline": pipeline})]:
+        scratch = "%s-bench-%s" % (src, mode)
+        delete_index(scratch)
+        create_index_from_src(src, scratch)
         try:
-            if not index_exists(src):
-                print("  - SKIP: source tidak ada."); continue
-            if SKIP_IF_DEST_EXISTS and index_exists(dst):
-                print("  - SKIP: dest sudah ada (idempotent)."); continue
-
-            # create dest from src (clone + overrides)
-            create_index_from_src(src, dst)
-
-            # counts (pre)
-            try: src_before = count_docs(src)
-            except: src_before = None
-            try: dst_before = count_docs(dst)
-            except: dst_before = None
-            print("  - Docs source=%s dest(sebelum)=%s" % (src_before, dst_before))
-
-            # start reindex
-            task = start_reindex(src, dst, SLICES, REFRESH, CONFLICTS, script=reindex_script)
-            print("  - Task:", task)
-
-            # wait
-            done = wait_task(task)
-            summary = done.get("response") or done.get("task", {})
-            print("  - Reindex selesai:")
-            try: print(json.dumps(summary, indent=2))
-            except: print(summary)
-
-            # verify
-            try:
-                src_after = count_docs(src)
-                dst_after = count_docs(dst)
+            task = start_reindex(src, scratch, SLICES, False, CONFLICTS, max_docs=BENCHMARK_DOCS,
+                                 batch_size=SOURCE_BATCH_SIZE, **kw)
+            resp = wait_task(task, "bench-" + mode).get("response") or {}
+        finally:
+            delete_index(scratch)
+        docs = (resp.get("created") or 0) + (resp.get("updated") or 0)
+        took = (resp.get("took") or 0) / 1000.0
+        results[mode] = docs / took if took > 0 else 0.0
+        print("  %-8s: %d docs dalam %.1fs = %.0f docs/s" % (mode, docs, took, results[mode]))
+    if results.get("script"):
+        print("  pipeline/script: %.2fx" % (results["pipeline"] / results["script"]))
+    return results
+
+# =============== Migrasi live ===============
+def max_timestamp(index):
+    """Max LIVE_TIMESTAMP_FIELD (epoch millis) atau None kalau index kosong."""
+    r = _req("POST", "%s/_search" % index, data=json.dumps(
+        {"size": 0, "track_total_hits": False, "aggs": {"wm": {"max": {"field": LIVE_TIMESTAMP_FIELD}}}}))
+    if r.status_code != 200:
+        raise RuntimeError("Gagal max %s '%s': %s %s" % (LIVE_TIMESTAMP_FIELD, index, r.status_code, r.text))
+    value = ((r.json().get("aggregations") or {}).get("wm") or {}).get("value")
+    return int(value) if value is not None else None
+
+def _ts_range(gte=None, lte=None):
+    rng = {"format": "epoch_millis"}
+    if gte is not None: rng["gte"] = gte
+    if lte is not None: rng["lte"] = lte
+    return {"range": {LIVE_TIMESTAMP_FIELD: rng}}
+
+def live_pass(pair, query, script, pipeline, throttle, label):
+    task = start_reindex(pair["src"], pair["dst"], SLICES, False, CONFLICTS, script=script, pipeline=pipeline,
+                         requests_per_second=throttle.rps if throttle else None, source_excludes=SOURCE_EXCLUDES,
+                         batch_size=SOURCE_BATCH_SIZE, query=query, op_type="create")
+    resp = wait_task(task, label, throttle).get("response") or {}
+    if resp.get("failures"):
+        raise RuntimeError("Pass %s gagal: %s" % (label, json.dumps(resp["failures"][0])[:300]))
+    return int(resp.get("created") or 0)
+
+def live_lag(src, watermark):
+    """(doc source setelah watermark, detik di belakang sekarang)."""
+    behind = count_query(src, _ts_range(gte=watermark + 1)) if watermark is not None else count_docs(src)
+    return behind, (time.time() - watermark / 1000.0) if watermark is not None else None
+
+def run_live(src, script=None, pipeline=None):
+    """Migrasi satu index yang masih ditulis. Return True kalau alias sudah pindah ke dest."""
+    pair = new_pair(src)
+    dst = pair["dst"]
+    throttle = new_throttle()
+    print("\n=== Migrasi live ===\nSRC: %s\nDST: %s (watermark %s)" % (src, dst, LIVE_TIMESTAMP_FIELD))
+    overlap = LIVE_OVERLAP_SEC * 1000
+
+    if index_exists(dst):
+        # resume: dest mungkin masih memakai bulk-load profile dari run sebelumnya
+        restore = build_dest_body(src)[1]
+        watermark = max_timestamp(dst)
+        _plog(pair, "Dest sudah ada, lanjut catch-up dari %s." % watermark)
+    else:
+        restore = create_index_from_src(src, dst)
+        watermark = max_timestamp(src)
+        created = live_pass(pair, _ts_range(lte=watermark) if watermark is not None else None,
+                            script, pipeline, throttle, "%s copy" % src)
+        _plog(pair, "Copy awal: %d doc sampai watermark %s" % (created, watermark))
+
+    for n in range(1, LIVE_MAX_PASSES + 1):
+        behind, lag_sec = live_lag(src, watermark)
+        _plog(pair, "Lag: %d doc, %s di belakang" % (behind, ("%.0fs" % lag_sec) if lag_sec is not None else "-"))
+        if behind <= LIVE_LAG_DOCS: break
+        new_mark = max_timestamp(src)
+        created = live_pass(pair, _ts_range(gte=watermark - overlap if watermark is not None else None, lte=new_mark),
+                            script, pipeline, throttle, "%s delta %d" % (src, n))
+        _plog(pair, "Delta %d: %d doc baru (watermark %s -> %s)" % (n, created, watermark, new_mark))
+        watermark = new_mark
+    else:
+        behind, _ = live_lag(src, watermark)
+        if behind > LIVE_LAG_DOCS:
+            _plog(pair, "! Lag masih %d doc setelah %d pass, write block tetap dilakukan." % (behind, LIVE_MAX_PASSES))
+
+    if restore:
+        # replica/refresh dikembalikan sebelum block (baru maupun resume), jangan menambah durasi block
+        put_index_settings(dst, restore)
+        _plog(pair, "Setting asli dikembalikan: %s" % json.dumps(restore))
+        if not wait_green(dst, GREEN_WAIT_SEC):
+            _plog(pair, "! %s belum green setelah %ds, migrasi dihentikan." % (dst, GREEN_WAIT_SEC)); return False
+
+    t_block = time.time()
+    put_index_settings(src, {"blocks.write": True})
+    _plog(pair, "Write block %s aktif." % src)
+    try:
+        refresh_index(src)
+        created = live_pass(pair, _ts_range(gte=watermark - overlap) if watermark is not None else None,
+                            script, pipeline, throttle, "%s final" % src)
+        refresh_index(dst)
+        src_cnt, dst_cnt = count_docs(src), count_docs(dst)
+        _plog(pair, "Delta final: %d doc, count source=%d dest=%d" % (created, src_cnt, dst_cnt))
+        if dst_cnt < src_cnt:
+            raise RuntimeError("dest kurang %d doc (doc di luar range %s?)" % (src_cnt - dst_cnt, LIVE_TIMESTAMP_FIELD))
+        swap_aliases_atomic(src, dst, READ_ALIAS, WRITE_ALIAS)
+    except Exception:
+        put_index_settings(src, {"blocks.write": None})
+        _plog(pair, "! Gagal saat block, write block %s dilepas (%.1fs)." % (src, time.time() - t_block))
+        raise
+    _plog(pair, "Alias %s pindah ke %s. Durasi write block: %.1fs" % (
+        ", ".join(a for a in [READ_ALIAS, WRITE_ALIAS] if a), dst, time.time() - t_block))
+    if VERIFY_CONTENT != "off":
+        res = verify_pair_content(src, dst, src)
+        _plog(pair, content_verify.format_report(res))
+    return True
+
+# =============== Kalibrasi ===============
+def write_rejected():
+    """Total rejection thread pool write di semua node (kumulatif sejak node start)."""
+    r = _req("GET", "_nodes/stats/thread_pool", params={"filter_path": "nodes.*.thread_pool.write.rejected"})
+    if r.status_code != 200: return 0
+    return sum(int(((n.get("thread_pool") or {}).get("write") or {}).get("rejected") or 0)
+               for n in (r.json().get("nodes") or {}).values())
+
+def calibration_trial(src, slices, batch_size, script=None, pipeline=None):
+    scratch = "%s-calibrate" % src
+    delete_index(scratch)
+    create_index_from_src(src, scratch)
+    rejected = write_rejected()
+    try:
+        task = start_reindex(src, scratch, slices, False, CONFLICTS, script=script, pipeline=pipeline,
+                             max_docs=CALIBRATE_DOCS, source_excludes=SOURCE_EXCLUDES, batch_size=batch_size)
+        resp = wait_task(task, "calibrate-%s-%s" % (slices, batch_size)).get("response") or {}
+    finally:
+        delete_index(scratch)
+    docs = (resp.get("created") or 0) + (resp.get("updated") or 0)
+    took = (resp.get("took") or 0) / 1000.0
+    bulk_batches = max(1, int(resp.get("batches") or 0))
+    row = {"slices": slices, "batch_size": batch_size, "docs": docs, "sec": round(took, 2),
+           "docs_per_sec": round(docs / took, 1) if took > 0 else 0.0,
+           "bulk_retries": int((resp.get("retries") or {}).get("bulk") or 0),
+           "rejected": max(0, write_rejected() - rejected), "failures": len(resp.get("failures") or [])}
+    row["reject_rate"] = round(float(row["bulk_retries"] + row["rejected"]) / bulk_batches, 4)
+    print("  slices=%-5s batch=%-6d %8d docs %7.1fs %8.0f docs/s  retry bulk=%d rejected=%d failures=%d" % (
+        slices, batch_size, docs, took, row["docs_per_sec"], row["bulk_retries"], row["rejected"], row["failures"]))
+    return row
+
+def _best_trial(rows):
+    # yang bersih (tanpa rejection/failure) menang dulu, baru docs/s
+    return min(rows, key=lambda r: (r["failures"] > 0, r["reject_rate"], -r["docs_per_sec"]))
+
+def run_calibration(src, script=None, pipeline=None):
+    print("\n=== Kalibrasi %s (%d doc per trial) ===" % (src, CALIBRATE_DOCS))
+    trials = [calibration_trial(src, sl, SOURCE_BATCH_SIZE, script, pipeline) for sl in CALIBRATE_SLICES]
+    best = _best_trial(trials)
+    for size in CALIBRATE_BATCH_SIZES:
+        if size != best["batch_size"]:
+            trials.append(calibration_trial(src, best["slices"], size, script, pipeline))
+    best = _best_trial(trials)
+    profile = {"ts": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "index": src, "clean_mode": CLEAN_MODE,
+               "slices": best["slices"], "batch_size": best["batch_size"],
+               "docs_per_sec": best["docs_per_sec"], "trials": trials}
+    print("  Terbaik: slices=%s batch=%d (%.0f docs/s)" % (best["slices"], best["batch_size"], best["docs_per_sec"]))
+    if CALIBRATION_FILE:
+        save_journal(CALIBRATION_FILE, profile)
+        print("  Profil ditulis ke %s (dipakai otomatis run berikutnya)." % CALIBRATION_FILE)
+    return profile
+
+def load_calibration():
+    global SLICES, SOURCE_BATCH_SIZE
+    if not USE_CALIBRATION or not CALIBRATION_FILE or not os.path.exists(CALIBRATION_FILE): return None
+    profile = load_journal(CALIBRATION_FILE)
+    if not profile.get("slices") or not profile.get("batch_size"): return None
+    SLICES, SOURCE_BATCH_SIZE = profile["slices"], int(profile["batch_size"])
+    print("Kalibrasi %s (%s, %s): slices=%s source.size=%d" % (
+        CALIBRATION_FILE, profile.get("ts"), profile.get("index"), SLICES, SOURCE_BATCH_SIZE))
+    return profile
+
+def parse_args():
+    ap = argparse.ArgumentParser(description="Reindex batch OpenSearch.")
+    ap.add_argument("--plan", action="store_true", help="Tampilkan rencana batch lalu keluar tanpa reindex.")
+    ap.add_argument("--benchmark", action="store_true",
+                    help="Bandingkan docs/s script vs pipeline di sample index terbesar, lalu keluar.")
+    ap.add_argument("--verify", action="store_true",
+                    help="Verifikasi isi setiap source vs <source>-reindex yang sudah ada, lalu keluar "
+                         "(VERIFY_CONTENT=sample -> sample, selain itu penuh).")
+    ap.add_argument("--install-templates", action="store_true",
+                    help="Pasang FIELD_TYPE_OVERRIDES sebagai component + index template, lalu keluar "
+                         "(dengan --plan: diff saja).")
+    ap.add_argument("--scan-overrides", action="store_true",
+                    help="Cari field text/keyword berisi IP/port/integer, cetak usulan FIELD_TYPE_OVERRIDES, lalu keluar.")
+    ap.add_argument("--calibrate", action="store_true",
+                    help="Trial reindex slices x source.size di source terbesar, simpan profil terbaik, lalu keluar.")
+    ap.add_argument("--live", metavar="INDEX",
+                    help="Migrasi satu index yang masih ditulis (catch-up + write block singkat + swap WRITE_ALIAS).")
+    ap.add_argument("--preflight", action="store_true",
+                    help="Jalankan pre-flight override di sample doc tiap source, lalu keluar.")
+    return ap.parse_args()
+
+# =============== main ===============
+def main():
+    args = parse_args()
+    if not args.calibrate: load_calibration()
+
+    if args.install_templates:
+        try: ok = install_templates(dry_run=args.plan)
+        except Exception as e:
+            sys.stderr.write("ERROR template: %s\n" % e); return 1
+        return 0 if ok else 1
+
+    if args.live:
+        if not WRITE_ALIAS:
+            sys.stderr.write("ERROR: --live butuh WRITE_ALIAS (writer harus menulis lewat alias).\n"); return 1
+        try:
+            pipeline_id = prepare_pipeline(args.live) if CLEAN_MODE == "pipeline" else None
+            script = None if pipeline_id else build_reindex_script(FIELD_TYPE_OVERRIDES, ENABLE_CLEAN_IPS)
+            return 0 if run_live(args.live, script, pipeline_id) else 2
+        except Exception as e:
+            sys.stderr.write("ERROR migrasi live: %s\n" % e); return 2
+
+    # 1) pilih sources sesuai MODE (discovery di server + ukuran)
+    try:
+        stats = select_sources()
+    except Exception as e:
+        sys.stderr.write("ERROR list indices: %s\n" % e)
+        return 1
+
+    if not stats:
+        print("Tidak ada index yang cocok dengan seleksi (%s)." % MODE)
+        return 0
+
+    sources = [row["index"] for row in stats]
+    print("Ditemukan %d index sumber." % len(sources))
+    print_plan(stats)
+    if args.scan_overrides:
+        try: results = scan_overrides(sources)
+        except Exception as e:
+            sys.stderr.write("ERROR scan: %s\n" % e); return 1
+        print_scan(results)
+        if SCAN_PLAN_FILE:
+            save_journal(SCAN_PLAN_FILE, {"ts": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                                          "sources": sources, "fields": results})
+            print("Rencana ditulis ke %s" % SCAN_PLAN_FILE)
+        return 0
+    if CONSOLIDATE:
+        if MODE != "date_range":
+            sys.stderr.write("ERROR: CONSOLIDATE butuh MODE 'date_range'.\n"); return 1
+        groups = group_sources(stats)
+        print_consolidation_plan(groups)
+        partial = [g["dst"] for g in groups if g["partial"]]
+        if partial and not CONSOLIDATE_ALLOW_PARTIAL and not args.plan:
+            sys.stderr.write("ERROR: periode terpotong DR_START/DR_END: %s. Lebarkan rentang ke batas %s, "
+                             "atau set CONSOLIDATE_ALLOW_PARTIAL=True.\n" % (", ".join(sorted(partial)), CONSOLIDATE))
+            return 1
+        pairs = [new_pair(g["index"], g["dst"], g["members"], g["shards"]) for g in groups]
+        plan_rows = [(g["dst"], "consolidate", g["docs"], g["pri_bytes"]) for g in groups]
+    elif FIXUP_MODE == "auto":
+        try:
+            plans = [(row,) + plan_path(row) for row in stats]
+        except Exception as e:
+            sys.stderr.write("ERROR planner jalur: %s\n" % e); return 1
+        print_path_plan(plans)
+        pairs = [new_pair(row["index"], shards=dest_shards(row), path=path)
+                 for row, path, _, _ in plans if path != "none"]
+        plan_rows = [(row["index"], path, docs, row["pri_bytes"] if path == "reindex" else None)
+                     for row, path, docs, _ in plans if path != "none"]
+    else:
+        pairs = [new_pair(row["index"], shards=dest_shards(row)) for row in stats]
+        plan_rows = [(row["index"], "reindex", row["docs"], row["pri_bytes"]) for row in stats]
+    if args.plan:
+        print_prediction(plan_rows)
+        return 0
+
+    if args.verify:
+        bad = 0
+        for pair in pairs:
+            if not index_exists(pair["dst"]):
+                print("  - SKIP %s: %s belum ada." % (pair["label"], pair["dst"])); continue
+            try: res = verify_pair_content(pair["src"], pair["dst"], pair["label"])
             except Exception as e:
-                src_after = dst_after = None
-                print("  ! Gagal verifikasi: %s" % e)
-            print("  - Docs source(akhir)=%s dest(akhir)=%s" % (src_after, dst_after))
-            if src_after is not None and dst_after is not None and dst_after < src_after:
-                print("  ! PERINGATAN: dest < source (periksa cleaning/konflik)")
-
-            # forcemerge + refresh
-            if DO_FORCEMERGE:
-                try:
-                    forcemerge_index(dst, MAX_NUM_SEGMENTS)
-                    print("  - Forcemerge OK")
-                except Exception as e:
-                    print("  ! Forcemerge gagal (non-fatal): %s" % e)
-            try: refresh_index(dst)
-            except Exception as e: print("  ! Refresh gagal (non-fatal): %s" % e)
+                res = {"ok": False}; print("  ! %s: %s" % (pair["label"], e))
+            else: print("[%s] %s" % (pair["label"], content_verify.format_report(res)))
+            bad += 0 if res["ok"] else 1
+        print("\nVerifikasi selesai: %d dari %d pair bermasalah." % (bad, len(pairs)))
+        return 0 if bad == 0 else 2
 
-            # (opsional) swap alias read/write
-            if READ_ALIAS or WRITE_ALIAS:
-                try:
-                    swap_aliases_atomic(src, dst, READ_ALIAS, WRITE_ALIAS)
-                    print("  - Alias dipindahkan (jika di-set).")
-                except Exception as e:
-                    print("  ! Swap alias gagal (non-fatal): %s" % e)
+    if args.benchmark:
+        print("\n=== Benchmark script vs pipeline (%s, %d doc) ===" % (sources[0], BENCHMARK_DOCS))
+        try: run_benchmark(sources[0])
+        except Exception as e:
+            sys.stderr.write("ERROR benchmark: %s\n" % e); return 1
+        return 0
 
+    # 3) siapkan cleaning (script painless atau ingest pipeline)
+    reindex_script = pipeline_id = None
+    if CLEAN_MODE == "pipeline":
+        try: pipeline_id = prepare_pipeline(sources[0])
         except Exception as e:
-            failures += 1
-            print("  ! ERROR pada pair %s -> %s: %s" % (src, dst, e))
-            if STOP_ON_ERROR:
-                print("\nBatch dihentikan karena STOP_ON_ERROR=True.")
-                break
+            sys.stderr.write("ERROR pipeline: %s\n" % e); return 1
+    else:
+        reindex_script = build_reindex_script(FIELD_TYPE_OVERRIDES, ENABLE_CLEAN_IPS)
+
+    if args.calibrate:
+        try: run_calibration(sources[0], reindex_script, pipeline_id)
+        except Exception as e:
+            sys.stderr.write("ERROR kalibrasi: %s\n" % e); return 1
+        return 0
+
+    if PREFLIGHT or args.preflight:
+        if not run_preflight(sources, reindex_script, pipeline_id):
+            sys.stderr.write("ERROR pre-flight: rate gagal di atas %.1f%%, perbaiki FIELD_TYPE_OVERRIDES/cleaning dulu.\n"
+                             % (100 * PREFLIGHT_MAX_FAIL_RATE))
+            return 3
+        if args.preflight:
+            return 0
+
+    # 4) proses dengan scheduler konkuren (lanjut dari journal kalau ada)
+    _JOURNAL.update(load_journal(JOURNAL_FILE))
+    if _JOURNAL:
+        print("Journal %s: %d pair tercatat dari run sebelumnya." % (JOURNAL_FILE, len(_JOURNAL)))
+    t0 = time.time()
+    failures = run_batch(pairs, reindex_script, pipeline_id)
+    print_batch_summary(pairs, time.time() - t0)
+    print_profile_comparison()
 
-    print("\nSelesai. Gagal: %d dari %d index." % (failures, len(sources)))
+    print("\nSelesai. Gagal: %d dari %d pair." % (failures, len(pairs)))
     return 0 if failures == 0 else 2
 
 if __name__ == "__main__":
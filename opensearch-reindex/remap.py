@@ -10,19 +10,36 @@ Tujuan:
   <BASE>-reindex  ==>  <BASE> (fisik)
 - Langkah:
   - Hapus index <BASE> kalau masih ada (dan hapus alias bernama <BASE> kalau ada)
-  - Buat index <BASE> meniru mapping/settings dari <BASE>-reindex
-  - _reindex dari <BASE>-reindex ke <BASE>
+  - FINALIZE_MODE "reindex" (default): buat <BASE> meniru mapping/settings <BASE>-reindex,
+    lalu _reindex ke <BASE> (progress docs/s, %, ETA via taskwatch.py)
+    FINALIZE_MODE "clone": write block + _clone <BASE>-reindex ke <BASE> (tanpa copy doc)
+    FINALIZE_MODE "alias": alias <BASE> -> <BASE>-reindex, selesai (langkah lain dilewati)
+  - Verifikasi isi per dokumen (content_verify.py, VERIFY_CONTENT)
   - Pindahkan semua alias yang nempel di <BASE>-reindex ke <BASE>
   - Hapus <BASE>-reindex (nama '-reindex' hilang)
+  - Ringkasan I/O dan waktu yang dihemat dibanding jalur reindex
+- Setiap langkah dicatat di JOURNAL_FILE; run ulang melanjutkan dari langkah
+  terakhir yang selesai
+- Maks FINALIZE_WORKERS index difinalize paralel; tiap index baru mulai kalau
+  proyeksi ukuran tulisnya muat di bawah watermark disk high (_cat/allocation)
 
 Prasyarat:
   pip install requests
+  lib/opensearch_client.py (di root repo ini)
 """
 
+import os
 import sys
 import time
 import json
-import requests
+import threading
+import taskwatch
+import content_verify
+import mergequeue
+import run_history
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lib"))
+import opensearch_client
 
 # ===================== KONFIGURASI =====================
 OS_HOST    = "#HOST#"  
@@ -31,45 +48,93 @@ OS_PASS    = "#PASS#"
 VERIFY_TLS = False
 
 SUFFIX     = "-reindex"
-SLICES     = 4
+
+# Cara <BASE>-reindex dijadikan <BASE>:
+#   "reindex" = jalur lama: hapus <BASE>, create + _reindex penuh (copy kedua)
+#   "clone"   = write block di -reindex lalu _clone (segment di-hard-link, tanpa copy doc);
+#               write ke -reindex ditolak sampai alias pindah (block dilepas kalau gagal)
+#   "alias"   = tanpa copy: alias <BASE> menunjuk ke <BASE>-reindex (index fisik tetap)
+FINALIZE_MODE           = "reindex"
+GREEN_WAIT_SEC          = 1800   # clone: tunggu <BASE> green sebelum alias dipindah
+# Estimasi waktu yang dihemat clone/alias memakai throughput remap mode reindex
+# dari HISTORY_DB; angka ini hanya acuan tetap kalau histori belum ada.
+REF_REINDEX_DOCS_PER_SEC = 5000
+SLICES     = 4        # int atau "auto"
+SOURCE_BATCH_SIZE = 1000   # source.size
+# Profil dari `reindex.py --calibrate` (kalau ada) mengganti SLICES/SOURCE_BATCH_SIZE
+CALIBRATION_FILE  = "reindex_calibration.json"
 REFRESH    = True
 CONFLICTS  = "proceed"
 WAIT_POLL  = 2
 TIMEOUT    = 180
 
+# HTTP client bersama (lib/opensearch_client.py): keep-alive pool, retry
+# 429/503 dengan backoff, gzip opsional. Set env OS_HTTP_TIMINGS=1 untuk
+# ringkasan latensi per endpoint di akhir run.
+HTTP_RETRIES = 3
+HTTP_GZIP    = False
+
+# Telemetry progress (docs/s, %, ETA, per slice) -> lihat taskwatch.py
+METRICS_FILE       = "remap_metrics.jsonl"  # "" = nonaktif
+PROGRESS_EVERY_SEC = 30
+LONG_POLL_SEC      = 30   # >0: long-poll _tasks (wait_for_completion=true&timeout=); 0 = polling WAIT_POLL
+
+# Adaptive throttle (opsional): requests_per_second task yang sedang jalan
+# dinaik-turunkan via _rethrottle berdasarkan _nodes/stats (antrean/rejection
+# write, latensi search, heap JVM) supaya ingest SIEM tidak kelaparan.
+ADAPTIVE_THROTTLE          = False
+THROTTLE_MIN_RPS           = 500
+THROTTLE_MAX_RPS           = 20000
+THROTTLE_START_RPS         = 5000
+THROTTLE_INTERVAL_SEC      = 30
+THROTTLE_WRITE_QUEUE_MAX   = 200   # antrean thread pool write (node terburuk)
+THROTTLE_SEARCH_LATENCY_MS = 500   # rata-rata latensi query sejak sample sebelumnya
+THROTTLE_HEAP_PCT_MAX      = 85
+THROTTLE_LOG_FILE          = "remap_throttle.jsonl"   # setiap keputusan throttle
+
 DO_FORCEMERGE   = True
 MAX_NUM_SEGMENTS= 1
+FORCEMERGE_PER_NODE = 1   # forcemerge jalan sebagai task (mergequeue.py), tidak kena TIMEOUT client
+
+# Verifikasi isi sebelum <BASE>-reindex dihapus (content_verify.py):
+# PIT + search_after paralel per slice, hash _source per dokumen.
+#   "off" | "sample" (VERIFY_SAMPLE_PCT % doc acak) | "full"
+VERIFY_CONTENT     = "full"
+VERIFY_SAMPLE_PCT  = 1.0
+VERIFY_SLICES      = 4
+VERIFY_PAGE_SIZE   = 1000
+VERIFY_REPORT_FILE = "remap_verify.jsonl"
+
+# Finalize paralel: maks FINALIZE_WORKERS index diproses bersamaan. Sebelum
+# mulai, ukuran yang akan ditulis (mode reindex: store.size -reindex, termasuk
+# replica; clone/alias: ~0) diproyeksikan ke _cat/allocation. Kalau melewati
+# watermark disk high cluster (dikurangi DISK_SAFETY_PCT), index menunggu di
+# antrean sampai ada finalize lain yang selesai dan ruang kosong lagi.
+FINALIZE_WORKERS   = 2
+ADMISSION_POLL_SEC = 30
+DISK_SAFETY_PCT    = 2.0
 
 # Safety:
 FORCE_PROCEED   = True   # True: lanjut meski dest<count (biasanya tidak terjadi)
 DRY_RUN         = False  # True: tampilkan rencana, tidak eksekusi
+# Journal langkah finalize: run ulang setelah crash melanjutkan dari langkah
+# terakhir yang selesai (reattach task reindex, copy tidak diulang). "" = nonaktif.
+JOURNAL_FILE    = "remap_journal.json"
+# Histori finalize yang selesai (run_history.py, SQLite bersama reindex.py). "" = nonaktif.
+HISTORY_DB      = "reindex_history.db"
 # =======================================================
 
-# Matikan warning TLS jika VERIFY_TLS=False
-try:
-    from requests.packages.urllib3.exceptions import InsecureRequestWarning
-    requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
-except Exception:
-    pass
-
 # ---------------- HTTP helpers ----------------
-def _url(path):
-    if not path.startswith("/"):
-        path = "/" + path
-    return OS_HOST.rstrip("/") + path
-
 def _req(method, path, **kwargs):
-    headers = kwargs.pop("headers", {})
-    headers.setdefault("Content-Type", "application/json")
-    return requests.request(
-        method=method,
-        url=_url(path),
+    client = opensearch_client.get_client(
+        OS_HOST,
         auth=(OS_USER, OS_PASS),
-        headers=headers,
         verify=VERIFY_TLS,
         timeout=TIMEOUT,
-        **kwargs
+        retries=HTTP_RETRIES,
+        gzip_requests=HTTP_GZIP,
     )
+    return client.request(method, path, **kwargs)
 
 def _is_index(name):
     return _req("HEAD", name).status_code == 200
@@ -146,9 +211,18 @@ def _create_index_like(src_idx, dst_idx):
     if r.status_code not in (200, 201):
         raise RuntimeError("Create %s gagal: %s %s" % (dst_idx, r.status_code, r.text))
 
-def _start_reindex(src, dst):
-    body = {"source": {"index": src}, "dest": {"index": dst}, "conflicts": CONFLICTS}
+def _new_throttle():
+    if not ADAPTIVE_THROTTLE: return None
+    return taskwatch.ThrottleController(
+        _req, THROTTLE_MIN_RPS, THROTTLE_MAX_RPS, THROTTLE_START_RPS, THROTTLE_INTERVAL_SEC,
+        THROTTLE_WRITE_QUEUE_MAX, THROTTLE_SEARCH_LATENCY_MS, THROTTLE_HEAP_PCT_MAX,
+        log_file=THROTTLE_LOG_FILE)
+
+def _start_reindex(src, dst, requests_per_second=None):
+    body = {"source": {"index": src, "size": int(SOURCE_BATCH_SIZE)}, "dest": {"index": dst}, "conflicts": CONFLICTS}
     params = {"wait_for_completion": "false", "slices": str(SLICES), "refresh": str(REFRESH).lower()}
+    if requests_per_second:
+        params["requests_per_second"] = str(int(requests_per_second))
     if DRY_RUN:
         print("DRY-RUN: _reindex %s -> %s" % (src, dst))
         return "dry-run-task-id"
@@ -160,23 +234,30 @@ def _start_reindex(src, dst):
         raise RuntimeError("Task ID kosong")
     return task
 
-def _wait_task(task_id):
+def _wait_task(task_id, label=None, throttle=None):
     if task_id == "dry-run-task-id":
         return {"response": {"created": 0, "total": 0}}
-    while True:
-        r = _req("GET", "_tasks/%s" % task_id)
-        if r.status_code != 200:
-            raise RuntimeError("Cek task gagal: %s %s" % (r.status_code, r.text))
-        data = r.json()
-        if data.get("completed"):
-            return data
-        time.sleep(WAIT_POLL)
+    return taskwatch.watch_task(_req, task_id, label or task_id, WAIT_POLL, LONG_POLL_SEC,
+                                METRICS_FILE, PROGRESS_EVERY_SEC, throttle)
+
+_MERGES = None   # mergequeue.ForcemergeQueue bersama semua worker finalize
+_MERGES_LOCK = threading.Lock()
 
 def _forcemerge(index):
     if DRY_RUN:
         print("DRY-RUN: forcemerge %s" % index)
         return
-    _req("POST", "%s/_forcemerge" % index, params={"max_num_segments": str(MAX_NUM_SEGMENTS)})
+    # satu antrean untuk semua worker finalize, supaya FORCEMERGE_PER_NODE berlaku lintas index
+    global _MERGES
+    with _MERGES_LOCK:
+        if _MERGES is None:
+            _MERGES = mergequeue.ForcemergeQueue(_req, MAX_NUM_SEGMENTS, FORCEMERGE_PER_NODE)
+        job = _MERGES.submit(index)
+    while True:
+        with _MERGES_LOCK:
+            _MERGES.tick()
+            if job not in _MERGES.waiting and job not in _MERGES.running: break
+        time.sleep(WAIT_POLL)
     _req("POST", "%s/_refresh" % index)
 
 def _aliases_of_index(index_name):
@@ -202,74 +283,501 @@ def _reassign_all_aliases(from_index, to_index):
     return _post_aliases({"actions": acts})
 
 # ---------------- Core ----------------
+def _index_sizes(index):
+    """(store primer, store total) dalam bytes dari _cat/indices, (None, None) kalau gagal."""
+    r = _req("GET", "_cat/indices/%s" % index, params={"format": "json", "bytes": "b", "h": "pri.store.size,store.size"})
+    if r.status_code != 200 or not r.json():
+        return None, None
+    row = r.json()[0]
+    return int(row.get("pri.store.size") or 0), int(row.get("store.size") or 0)
+
+def _put_settings(index, settings):
+    if DRY_RUN:
+        print("DRY-RUN: PUT %s/_settings %s" % (index, json.dumps(settings)))
+        return
+    r = _req("PUT", "%s/_settings" % index, data=json.dumps({"index": settings}))
+    if r.status_code != 200:
+        raise RuntimeError("Update settings %s gagal: %s %s" % (index, r.status_code, r.text))
+
+def _wait_green(index):
+    if DRY_RUN: return True
+    deadline = time.time() + GREEN_WAIT_SEC
+    while True:
+        r = _req("GET", "_cluster/health/%s" % index,
+                 params={"wait_for_status": "green", "timeout": "60s"}, timeout=90)
+        if r.status_code == 200 and r.json().get("status") == "green": return True
+        if time.time() >= deadline: return False
+
+def _clone_index(src, dst):
+    """
+    Write block di src, _clone (hard-link segment) ke dst, tunggu green.
+    Block di src tetap terpasang kalau berhasil (dilepas caller bila langkah
+    sesudahnya gagal, lihat _unblock_write); gagal di sini -> langsung dilepas.
+    """
+    _put_settings(src, {"blocks.write": True})
+    body = {"settings": {"index.blocks.write": None}}
+    if DRY_RUN:
+        print("DRY-RUN: _clone %s -> %s" % (src, dst))
+        return
+    try:
+        r = _req("POST", "%s/_clone/%s" % (src, dst), data=json.dumps(body),
+                 params={"wait_for_active_shards": "1"})
+        if r.status_code != 200:
+            raise RuntimeError("Clone %s -> %s gagal: %s %s" % (src, dst, r.status_code, r.text))
+        if not _wait_green(dst):
+            print("  ! PERINGATAN: %s belum green setelah %ds." % (dst, GREEN_WAIT_SEC))
+    except Exception:
+        _unblock_write(src)
+        raise
+
+def _unblock_write(index):
+    """Lepas write block (clone) supaya writer lewat alias tidak terus ditolak."""
+    try:
+        _put_settings(index, {"blocks.write": None})
+        print("  - Write block di %s dilepas." % index)
+    except Exception as e:
+        print("  ! Gagal lepas write block %s: %s" % (index, e))
+
+def _finalize_alias(reidx_name, base):
+    """
+    Mode "alias": tidak ada copy. Alias <BASE> diarahkan ke <BASE>-reindex
+    dalam satu _aliases (atomik): alias lama dilepas, index fisik <BASE>
+    dihapus (remove_index) kalau ada.
+    """
+    acts = []
+    if _is_alias(base):
+        backing = _alias_backing_index(base)
+        if backing == reidx_name:
+            print("  - Alias '%s' sudah menunjuk ke %s." % (base, reidx_name)); return True
+        acts.append({"remove": {"index": backing, "alias": base}})
+    elif _is_index(base):
+        print("  - Index fisik '%s' dihapus dan diganti alias." % base)
+        acts.append({"remove_index": {"index": base}})
+    acts.append({"add": {"index": reidx_name, "alias": base}})
+    code, text = _post_aliases({"actions": acts})
+    print("  - Alias %s -> %s status: %s %s" % (base, reidx_name, code, text[:200]))
+    return code == 200 or DRY_RUN
+
+# ---------------- Journal langkah finalize ----------------
+# Urutan langkah; journal menyimpan langkah terakhir yang SUDAH selesai.
+# "reindex" dicatat saat task dimulai (task ID ikut disimpan untuk reattach).
+_STEPS = ["alias_removed", "base_deleted", "created", "reindex", "copied",
+          "verified", "forcemerged", "aliases_moved", "done"]
+_JOURNAL = {}
+_JOURNAL_LOCK = threading.Lock()
+
+def _load_journal(path):
+    if not path or not os.path.exists(path): return {}
+    try:
+        with open(path) as f: return json.load(f)
+    except (IOError, ValueError) as e:
+        print("! Journal %s tidak terbaca (%s), mulai dari kosong." % (path, e))
+        return {}
+
+def _load_calibration():
+    global SLICES, SOURCE_BATCH_SIZE
+    profile = _load_journal(CALIBRATION_FILE)
+    if not profile.get("slices") or not profile.get("batch_size"): return
+    SLICES, SOURCE_BATCH_SIZE = profile["slices"], int(profile["batch_size"])
+    print("Kalibrasi %s (%s): slices=%s source.size=%d" % (CALIBRATION_FILE, profile.get("ts"), SLICES, SOURCE_BATCH_SIZE))
+
+def _journal_entry(reidx_name):
+    with _JOURNAL_LOCK:
+        return dict(_JOURNAL.get(reidx_name) or {})
+
+def _journal_step(reidx_name, step, **extra):
+    if DRY_RUN or not JOURNAL_FILE: return
+    with _JOURNAL_LOCK:
+        entry = _JOURNAL.setdefault(reidx_name, {})
+        entry.update(extra)
+        entry.update({"step": step, "mode": FINALIZE_MODE, "updated": time.strftime("%Y-%m-%d %H:%M:%S")})
+        # tulis ke file sementara lalu rename supaya journal tidak pernah setengah tertulis
+        try:
+            tmp = JOURNAL_FILE + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(_JOURNAL, f, indent=2, sort_keys=True)
+            os.rename(tmp, JOURNAL_FILE)
+        except (IOError, OSError) as e:
+            print("  ! Gagal tulis journal: %s" % e)
+
+def _step_done(entry, step):
+    last = entry.get("step")
+    return last in _STEPS and _STEPS.index(last) >= _STEPS.index(step)
+
+def _task_exists(task_id):
+    r = _req("GET", "_tasks/%s" % task_id)
+    return r.status_code == 200
+
 def _process_reindex_index(reidx_name):
+    """
+    Finalize satu index sesuai FINALIZE_MODE. Return ringkasan dict, None
+    kalau skip/gagal. Setiap langkah dicatat di JOURNAL_FILE; run ulang
+    melanjutkan dari langkah terakhir yang selesai (copy tidak diulang).
+    """
     base = reidx_name[:-len(SUFFIX)]
-    print("\n=== Finalize ===\nSRC(-reindex): %s\nDEST(final):   %s" % (reidx_name, base))
+    print("\n=== Finalize (%s) ===\nSRC(-reindex): %s\nDEST(final):   %s" % (FINALIZE_MODE, reidx_name, base))
 
     # pastikan sumber ada
     if not _is_index(reidx_name):
         print("  - SKIP: %s tidak ditemukan." % reidx_name)
         return
 
-    # kalau base adalah alias, hapus alias dulu (agar bisa bikin index fisik)
-    if _is_alias(base):
-        backing = _alias_backing_index(base)
-        print("  - '%s' adalah ALIAS (-> %s). Hapus alias dulu." % (base, backing))
-        code, text = _post_aliases({"actions": [{"remove": {"index": backing, "alias": base}}]})
-        print("  - Hapus alias status: %s %s" % (code, text[:200]))
-        if code != 200 and not DRY_RUN:
-            print("  ! ERROR: gagal hapus alias '%s'." % base); return
-
-    # kalau sudah ada index fisik bernama base → hapus agar tidak konflik
-    if _is_index(base):
-        print("  - Hapus index lama '%s'." % base)
-        code, text = _delete_index(base)
-        print("  - Delete status: %s %s" % (code, text[:200]))
-        if code not in (200, 202) and not DRY_RUN:
-            print("  ! ERROR: gagal hapus index lama. Stop."); return
-
-    # create index base meniru mapping/settings reidx
-    print("  - Create index '%s' meniru mapping %s" % (base, reidx_name))
-    _create_index_like(reidx_name, base)
-
-    # reindex data reidx -> base
+    entry = _journal_entry(reidx_name)
+    if entry.get("step") == "done":
+        entry = {}   # -reindex baru dengan nama yang sama: mulai dari awal
+    if entry:
+        print("  - Resume dari journal: langkah terakhir '%s' (mode %s)." % (entry["step"], entry.get("mode")))
+
+    t0 = time.time()
     try:
         src_cnt = _count(reidx_name)
     except Exception as e:
         print("  ! Gagal count src: %s" % e); src_cnt = None
-
-    print("  - Mulai reindex %s -> %s (docs src=%s)" % (reidx_name, base, src_cnt))
-    task = _start_reindex(reidx_name, base)
-    print("  - Task:", task)
-    done = _wait_task(task)
-    summary = done.get("response", {})
-    print("  - Reindex selesai:", json.dumps(summary, indent=2))
-
-    # verifikasi
+    src_bytes = _index_sizes(reidx_name)[0]
+    # resumed: sec hanya mencakup bagian setelah resume, tidak dicatat ke histori
+    stat = {"index": base, "mode": FINALIZE_MODE, "docs": src_cnt, "bytes": src_bytes, "sec": None,
+            "resumed": bool(entry)}
+
+    if FINALIZE_MODE == "alias":
+        if not _finalize_alias(reidx_name, base):
+            print("  ! ERROR: gagal arahkan alias '%s'." % base); return
+        _journal_step(reidx_name, "done")
+        stat["sec"] = time.time() - t0
+        return stat
+
+    if _step_done(entry, "copied"):
+        print("  - Copy ke '%s' sudah selesai sebelumnya (journal), dilewati." % base)
+    else:
+        task = entry.get("task") if (FINALIZE_MODE == "reindex" and entry.get("step") == "reindex") else None
+        if task and not DRY_RUN and not _task_exists(task):
+            print("  - Task %s tidak ditemukan lagi, copy diulang." % task); task = None
+
+        if task:
+            print("  - Reattach ke task reindex %s" % task)
+        else:
+            # kalau base adalah alias, hapus alias dulu (agar bisa bikin index fisik)
+            if _is_alias(base):
+                backing = _alias_backing_index(base)
+                print("  - '%s' adalah ALIAS (-> %s). Hapus alias dulu." % (base, backing))
+                code, text = _post_aliases({"actions": [{"remove": {"index": backing, "alias": base}}]})
+                print("  - Hapus alias status: %s %s" % (code, text[:200]))
+                if code != 200 and not DRY_RUN:
+                    print("  ! ERROR: gagal hapus alias '%s'." % base); return
+            _journal_step(reidx_name, "alias_removed")
+
+            # kalau sudah ada index fisik bernama base (lama atau copy setengah jadi) → hapus
+            if _is_index(base):
+                print("  - Hapus index lama '%s'." % base)
+                code, text = _delete_index(base)
+                print("  - Delete status: %s %s" % (code, text[:200]))
+                if code not in (200, 202) and not DRY_RUN:
+                    print("  ! ERROR: gagal hapus index lama. Stop."); return
+            _journal_step(reidx_name, "base_deleted")
+
+        if FINALIZE_MODE == "clone":
+            # segment di-hard-link, tidak ada doc yang ditulis ulang
+            print("  - Clone %s -> %s (write block di %s)" % (reidx_name, base, reidx_name))
+            try:
+                _clone_index(reidx_name, base)
+            except Exception as e:
+                print("  ! ERROR: %s" % e); return
+        else:
+            throttle = _new_throttle()
+            if not task:
+                # create index base meniru mapping/settings reidx
+                print("  - Create index '%s' meniru mapping %s" % (base, reidx_name))
+                _create_index_like(reidx_name, base)
+                _journal_step(reidx_name, "created")
+
+                # reindex data reidx -> base
+                print("  - Mulai reindex %s -> %s (docs src=%s)" % (reidx_name, base, src_cnt))
+                task = _start_reindex(reidx_name, base, throttle.rps if throttle else None)
+                print("  - Task:", task)
+                _journal_step(reidx_name, "reindex", task=task)
+            done = _wait_task(task, base, throttle)
+            summary = done.get("response", {})
+            print("  - Reindex selesai:", json.dumps(summary, indent=2))
+        _journal_step(reidx_name, "copied")
+
+    # clone: -reindex masih write-blocked; gagal sebelum alias pindah -> block dilepas
+    moved = _step_done(entry, "aliases_moved")
     try:
-        dst_cnt = _count(base)
-    except Exception as e:
-        print("  ! Gagal count dest: %s" % e); dst_cnt = None
-    print("  - Docs dest=%s" % dst_cnt)
-    if (src_cnt is not None and dst_cnt is not None and dst_cnt < src_cnt and not FORCE_PROCEED):
-        print("  ! PERINGATAN: dest < src. Stop hapus -reindex."); return
-
-    # forcemerge opsional
-    if DO_FORCEMERGE:
-        print("  - Forcemerge %s" % base)
-        _forcemerge(base)
-
-    # pindahkan semua alias dari reidx ke base
-    print("  - Reassign alias dari %s ke %s" % (reidx_name, base))
-    code, text = _reassign_all_aliases(reidx_name, base)
-    print("  - Reassign alias status: %s %s" % (code, text[:200]))
+        if not _step_done(entry, "verified"):
+            # verifikasi
+            try:
+                dst_cnt = _count(base)
+            except Exception as e:
+                print("  ! Gagal count dest: %s" % e); dst_cnt = None
+            print("  - Docs dest=%s" % dst_cnt)
+            if (src_cnt is not None and dst_cnt is not None and dst_cnt < src_cnt and not FORCE_PROCEED):
+                print("  ! PERINGATAN: dest < src. Stop hapus -reindex."); return
+
+            # verifikasi isi: -reindex hanya dihapus kalau isinya identik (FORCE_PROCEED tidak berlaku).
+            # Clone memakai segment yang sama persis, cukup count.
+            if VERIFY_CONTENT != "off" and FINALIZE_MODE == "reindex" and not DRY_RUN:
+                try:
+                    res = content_verify.verify_content(
+                        _req, reidx_name, base, VERIFY_SLICES, VERIFY_PAGE_SIZE,
+                        sample_pct=VERIFY_SAMPLE_PCT if VERIFY_CONTENT == "sample" else None,
+                        label=base, print_every_sec=PROGRESS_EVERY_SEC,
+                        thread_init=sys.stdout.inherit() if isinstance(sys.stdout, _JobStdout) else None)
+                except Exception as e:
+                    print("  ! ERROR verifikasi isi: %s. Stop hapus -reindex." % e); return
+                content_verify.write_report(VERIFY_REPORT_FILE, res)
+                print("  - " + content_verify.format_report(res))
+                if not res["ok"]:
+                    print("  ! PERINGATAN: isi %s tidak sama dengan %s. Stop hapus -reindex." % (base, reidx_name)); return
+            _journal_step(reidx_name, "verified")
+
+        # forcemerge opsional (clone: segment sudah sama dengan -reindex)
+        if DO_FORCEMERGE and FINALIZE_MODE == "reindex" and not _step_done(entry, "forcemerged"):
+            print("  - Forcemerge %s" % base)
+            _forcemerge(base)
+            _journal_step(reidx_name, "forcemerged")
+
+        # pindahkan semua alias dari reidx ke base
+        if not _step_done(entry, "aliases_moved"):
+            print("  - Reassign alias dari %s ke %s" % (reidx_name, base))
+            code, text = _reassign_all_aliases(reidx_name, base)
+            print("  - Reassign alias status: %s %s" % (code, text[:200]))
+            if code != 200 and not DRY_RUN:
+                print("  ! ERROR: gagal pindah alias. Stop hapus -reindex."); return
+            _journal_step(reidx_name, "aliases_moved")
+        moved = True
+    finally:
+        if FINALIZE_MODE == "clone" and not moved: _unblock_write(reidx_name)
 
     # hapus reidx (supaya '-reindex' hilang)
     print("  - Hapus index %s" % reidx_name)
     code, text = _delete_index(reidx_name)
     print("  - Delete -reindex status: %s %s" % (code, text[:200]))
+    if code in (200, 202, 404):
+        _journal_step(reidx_name, "done")
+    stat["sec"] = time.time() - t0
+    return stat
+
+# ---------------- Admission disk & worker paralel ----------------
+_SIZE_UNITS = {"b": 1, "kb": 1024, "mb": 1024 ** 2, "gb": 1024 ** 3, "tb": 1024 ** 4, "pb": 1024 ** 5}
+
+def _parse_bytes(text):
+    text = text.strip().lower()
+    for unit in sorted(_SIZE_UNITS, key=len, reverse=True):
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * _SIZE_UNITS[unit])
+    return int(float(text))
+
+def _disk_watermark_high():
+    key = "cluster.routing.allocation.disk.watermark.high"
+    r = _req("GET", "_cluster/settings", params={"include_defaults": "true", "flat_settings": "true"})
+    if r.status_code != 200:
+        raise RuntimeError("Gagal baca _cluster/settings: %s %s" % (r.status_code, r.text))
+    data = r.json()
+    for section in ("transient", "persistent", "defaults"):
+        if key in (data.get(section) or {}):
+            return data[section][key]
+    return "90%"
+
+def _disk_limit(total, watermark):
+    """Batas disk.used (bytes) per node untuk watermark persen/rasio/absolut (sisa bebas)."""
+    wm = str(watermark).strip()
+    if wm.endswith("%"):
+        return total * float(wm[:-1]) / 100.0
+    try:
+        ratio = float(wm)
+        if ratio <= 1.0: return total * ratio
+    except ValueError:
+        pass
+    return total - _parse_bytes(wm)
+
+def _disk_allocation():
+    r = _req("GET", "_cat/allocation", params={"format": "json", "bytes": "b", "h": "node,disk.used,disk.total"})
+    if r.status_code != 200:
+        raise RuntimeError("Gagal baca _cat/allocation: %s %s" % (r.status_code, r.text))
+    return [row for row in r.json() if row.get("node") not in (None, "UNASSIGNED") and row.get("disk.total")]
+
+def _finalize_need(reidx_name):
+    """Bytes yang akan ditulis finalize (clone = hard link, alias = tanpa copy)."""
+    if FINALIZE_MODE != "reindex": return 0
+    return _index_sizes(reidx_name)[1] or 0
+
+def _admit(need, reserved, nodes, watermark):
+    """
+    Proyeksikan need + reserved (finalize yang sedang jalan) dibagi rata ke
+    data node. Return (muat?, headroom terkecil dalam bytes).
+    """
+    if not nodes: return True, None
+    share = float(need + reserved) / len(nodes)
+    headroom = None
+    for row in nodes:
+        total, used = float(row["disk.total"]), float(row.get("disk.used") or 0)
+        limit = _disk_limit(total, watermark) - total * DISK_SAFETY_PCT / 100.0
+        room = limit - used - share
+        headroom = room if headroom is None else min(headroom, room)
+    return headroom >= 0, headroom
+
+class _JobStdout(object):
+    """stdout yang memberi prefix [index] pada setiap baris dari thread worker."""
+    def __init__(self, out):
+        self.out = out
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.partial = {}
+
+    def write(self, text):
+        label = getattr(self.local, "label", None)
+        with self.lock:
+            if not label:
+                self.out.write(text); return
+            key = threading.current_thread().ident
+            lines = (self.partial.pop(key, "") + text).split("\n")
+            if lines[-1]: self.partial[key] = lines[-1]
+            for line in lines[:-1]:
+                self.out.write("[%s] %s\n" % (label, line))
+
+    def flush(self):
+        self.out.flush()
+
+    def inherit(self):
+        """Fungsi untuk thread anak (mis. slice verifikasi): pakai label thread pemanggil."""
+        label = getattr(self.local, "label", None)
+        def init(): self.local.label = label
+        return init
+
+    def finish(self):
+        """Tulis sisa baris (tanpa newline) milik thread ini."""
+        with self.lock:
+            rest = self.partial.pop(threading.current_thread().ident, None)
+            if rest: self.out.write("[%s] %s\n" % (self.local.label, rest))
+
+def _finalize_worker(job, out):
+    out.local.label = job["base"]
+    try:
+        job["stat"] = _process_reindex_index(job["reidx"])
+        if job["stat"] and _HISTORY and not job["stat"]["resumed"]: _record_history(job["stat"], job["reidx"])
+    except Exception as e:
+        print("  ! ERROR finalize %s: %s" % (job["reidx"], e))
+    finally:
+        out.finish()
+
+_HISTORY = None   # run_history.RunHistory, dibuka di main()
+
+def _record_history(stat, reidx_name):
+    try:
+        _HISTORY.record(tool="remap", mode=stat["mode"], src=reidx_name, dst=stat["index"],
+                           slices=SLICES if stat["mode"] == "reindex" else None,
+                           batch_size=SOURCE_BATCH_SIZE if stat["mode"] == "reindex" else None,
+                           docs=stat["docs"], src_bytes=stat["bytes"], sec=stat["sec"])
+    except Exception as e:
+        print("  ! Gagal catat histori %s: %s" % (HISTORY_DB, e))
+
+def run_finalize(candidates):
+    """
+    Jalankan finalize dengan maks FINALIZE_WORKERS thread. Index yang tidak
+    muat disk menunggu; kalau tidak ada finalize lain yang jalan dan tetap
+    tidak muat, index itu dilewati (gagal).
+    """
+    out = _JobStdout(sys.stdout)
+    sys.stdout = out
+    pending = [{"reidx": c, "base": c[:-len(SUFFIX)], "need": _finalize_need(c), "stat": None, "waiting": False}
+               for c in candidates]
+    running, results = [], []
+    watermark = None
+    last_admission = 0
+    try:
+        while pending or running:
+            reaped = False
+            for job in list(running):
+                if job["thread"].is_alive(): continue
+                running.remove(job); results.append(job); reaped = True
+            if pending and (reaped or time.time() - last_admission >= ADMISSION_POLL_SEC):
+                last_admission = time.time()
+                nodes = None
+                try:
+                    if watermark is None: watermark = _disk_watermark_high()
+                    nodes = _disk_allocation()
+                except Exception as e:
+                    print("  ! Cek disk gagal (%s), finalize jalan tanpa guard watermark." % e)
+                reserved = sum(j["need"] for j in running)
+                for job in list(pending):
+                    if len(running) >= max(1, int(FINALIZE_WORKERS)): break
+                    fits, headroom = _admit(job["need"], reserved, nodes, watermark) if nodes else (True, None)
+                    if not fits and not running:
+                        print("  ! %s butuh %s, tidak muat di bawah watermark %s walau tanpa finalize lain. Dilewati." % (
+                            job["reidx"], _fmt_bytes(job["need"]), watermark))
+                        pending.remove(job); results.append(job)
+                        continue
+                    if not fits:
+                        if not job["waiting"]:
+                            print("  - Antre: %s butuh %s, kurang %s di bawah watermark %s." % (
+                                job["reidx"], _fmt_bytes(job["need"]), _fmt_bytes(-headroom), watermark))
+                            job["waiting"] = True
+                        continue
+                    pending.remove(job)
+                    reserved += job["need"]
+                    job["thread"] = threading.Thread(target=_finalize_worker, args=(job, out),
+                                                     name="finalize-%s" % job["base"])
+                    job["thread"].daemon = True
+                    job["thread"].start()
+                    running.append(job)
+            if running: time.sleep(0.5)
+    finally:
+        sys.stdout = out.out
+    return [job["stat"] for job in results if job["stat"]]
+
+def _fmt_bytes(n):
+    n = float(n or 0)
+    for unit in ["B", "KB", "MB", "GB", "TB"]:
+        if n < 1024 or unit == "TB": return "%.1f%s" % (n, unit)
+        n /= 1024
+
+def _fmt_sec(sec):
+    sec = int(sec or 0)
+    return "%02d:%02d:%02d" % (sec // 3600, (sec % 3600) // 60, sec % 60)
+
+def _reindex_estimate(stats):
+    """
+    Perkiraan durasi jalur reindex untuk index-index ini: (detik, sumber angka).
+    Pakai throughput remap mode reindex yang terukur di HISTORY_DB; tanpa
+    histori jatuh ke acuan tetap REF_REINDEX_DOCS_PER_SEC.
+    """
+    if _HISTORY:
+        try:
+            preds = [_HISTORY.predict("remap", "reindex", st["docs"], st["bytes"]) for st in stats]
+            if preds and all(sec is not None for sec, _, _ in preds):
+                return (sum(sec for sec, _, _ in preds),
+                        "median %d run reindex terukur di %s" % (preds[0][2], HISTORY_DB))
+        except Exception as e:
+            print("  ! Gagal baca histori %s: %s" % (HISTORY_DB, e))
+    tot_docs = sum(st["docs"] or 0 for st in stats)
+    if not REF_REINDEX_DOCS_PER_SEC: return None, None
+    return (tot_docs / float(REF_REINDEX_DOCS_PER_SEC),
+            "acuan tetap %d docs/s, bukan pengukuran" % REF_REINDEX_DOCS_PER_SEC)
+
+def print_finalize_summary(stats):
+    """
+    Bandingkan dengan jalur lama (reindex penuh <BASE>-reindex -> <BASE>):
+    doc/byte yang tidak ditulis ulang dan estimasi waktu yang dihemat
+    (lihat _reindex_estimate).
+    """
+    print("\n=== Ringkasan finalize (%s) ===" % FINALIZE_MODE)
+    tot_docs = tot_bytes = tot_sec = 0
+    for st in stats:
+        print("  %-50s docs=%-12s size=%-10s waktu=%s" % (st["index"], st["docs"], _fmt_bytes(st["bytes"]), _fmt_sec(st["sec"])))
+        tot_docs += st["docs"] or 0; tot_bytes += st["bytes"] or 0; tot_sec += st["sec"] or 0
+    print("  Total            : %d index, %d docs, %s, %s" % (len(stats), tot_docs, _fmt_bytes(tot_bytes), _fmt_sec(tot_sec)))
+    if FINALIZE_MODE == "reindex" or not stats: return
+    est, basis = _reindex_estimate(stats)
+    print("  Ditulis ulang    : 0 docs (jalur reindex: %d docs, ~%s primer)" % (tot_docs, _fmt_bytes(tot_bytes)))
+    if est is None:
+        print("  Estimasi hemat   : ~%s I/O tulis" % _fmt_bytes(tot_bytes)); return
+    print("  Estimasi hemat   : ~%s I/O tulis, ~%s waktu (reindex ~%s [%s] vs %s aktual)" % (
+        _fmt_bytes(tot_bytes), _fmt_sec(max(0, est - tot_sec)), _fmt_sec(est), basis, _fmt_sec(tot_sec)))
 
 def main():
+    global _HISTORY
+    if FINALIZE_MODE not in ("reindex", "clone", "alias"):
+        print("ERROR: FINALIZE_MODE tidak dikenal: %s" % FINALIZE_MODE); return 1
+
     # cari kandidat -reindex
     try:
         all_idx = _list_indices()
@@ -281,11 +789,14 @@ def main():
         print("Tidak ada index berakhiran '%s'." % SUFFIX); return 0
 
     print("Ditemukan %d index '%s'." % (len(candidates), SUFFIX))
-    for reidx in candidates:
-        _process_reindex_index(reidx)
-
-    print("\nSelesai.")
-    return 0
+    if FINALIZE_MODE == "reindex": _load_calibration()
+    _JOURNAL.update(_load_journal(JOURNAL_FILE))
+    if HISTORY_DB and not DRY_RUN: _HISTORY = run_history.RunHistory(HISTORY_DB)
+    stats = run_finalize(candidates)
+    print_finalize_summary(stats)
+
+    print("\nSelesai. Berhasil: %d dari %d." % (len(stats), len(candidates)))
+    return 0 if len(stats) == len(candidates) else 2
 
 if __name__ == "__main__":
     try:
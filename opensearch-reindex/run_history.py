@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+
+"""
+run_history.py  (Python 2.7 / 3, dipakai reindex.py dan remap.py)
+
+Histori pair yang selesai di database SQLite lokal (satu file, stdlib):
+- Setiap pair: tool (reindex/remap), jalur/mode, index, ukuran primer
+  sebelum/sesudah, docs, slices, source.size, script/pipeline, durasi, docs/s.
+- predict(): estimasi durasi per index dari median throughput run terakhir
+  yang sejenis (bytes/s, fallback docs/s) + rasio ukuran dest/source.
+- trend(): median docs/s run terbaru vs sebelumnya, untuk melihat regresi
+  throughput cluster.
+
+Aman dipakai dari beberapa thread (remap.py FINALIZE_WORKERS).
+"""
+
+import sqlite3, threading, time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts           TEXT NOT NULL,
+    tool         TEXT NOT NULL,
+    mode         TEXT,
+    src          TEXT NOT NULL,
+    dst          TEXT,
+    clean        TEXT,
+    slices       TEXT,
+    batch_size   INTEGER,
+    docs         INTEGER,
+    src_bytes    INTEGER,
+    dst_bytes    INTEGER,
+    sec          REAL,
+    docs_per_sec REAL
+)"""
+_COLUMNS = ["tool", "mode", "src", "dst", "clean", "slices", "batch_size", "docs", "src_bytes", "dst_bytes", "sec"]
+
+def _median(values):
+    values = sorted(v for v in values if v)
+    if not values: return None
+    mid = len(values) // 2
+    return values[mid] if len(values) % 2 else (values[mid - 1] + values[mid]) / 2.0
+
+class RunHistory(object):
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute(_SCHEMA)
+        self.db.execute("CREATE INDEX IF NOT EXISTS runs_tool_mode ON runs (tool, mode, id)")
+        self.db.commit()
+
+    def record(self, **row):
+        """Simpan satu pair selesai. Kolom yang tidak diisi = NULL."""
+        values = [row.get(c) for c in _COLUMNS]
+        if values[_COLUMNS.index("slices")] is not None:
+            values[_COLUMNS.index("slices")] = str(values[_COLUMNS.index("slices")])
+        sec, docs = row.get("sec"), row.get("docs")
+        rate = (docs / float(sec)) if (docs and sec) else None
+        with self.lock:
+            self.db.execute("INSERT INTO runs (ts, %s, docs_per_sec) VALUES (?, %s, ?)" % (
+                ", ".join(_COLUMNS), ", ".join("?" for _ in _COLUMNS)),
+                [time.strftime("%Y-%m-%d %H:%M:%S")] + values + [rate])
+            self.db.commit()
+
+    def recent(self, tool, mode=None, clean=None, limit=20):
+        sql = "SELECT docs, src_bytes, dst_bytes, sec FROM runs WHERE tool = ? AND sec > 0"
+        args = [tool]
+        if mode: sql += " AND mode = ?"; args.append(mode)
+        if clean: sql += " AND clean = ?"; args.append(clean)
+        sql += " ORDER BY id DESC LIMIT ?"; args.append(int(limit))
+        with self.lock:
+            return self.db.execute(sql, args).fetchall()
+
+    def rates(self, tool, mode=None, clean=None, limit=20):
+        """Median docs/s, bytes/s, rasio dest/source dan jumlah sample. Fallback tanpa filter clean."""
+        rows = self.recent(tool, mode, clean, limit)
+        if not rows and clean: rows = self.recent(tool, mode, None, limit)
+        return {"docs_per_sec": _median([d / s for d, _, _, s in rows if d]),
+                "bytes_per_sec": _median([b / s for _, b, _, s in rows if b]),
+                "size_ratio": _median([float(o) / b for _, b, o, _ in rows if b and o]),
+                "samples": len(rows)}
+
+    def predict(self, tool, mode, docs, src_bytes, clean=None, limit=20):
+        """Return (detik, byte dest, jumlah sample) perkiraan untuk satu index; detik None kalau belum ada histori."""
+        rate = self.rates(tool, mode, clean, limit)
+        sec = None
+        if src_bytes and rate["bytes_per_sec"]: sec = src_bytes / rate["bytes_per_sec"]
+        elif docs and rate["docs_per_sec"]: sec = docs / rate["docs_per_sec"]
+        out_bytes = int(src_bytes * rate["size_ratio"]) if (src_bytes and rate["size_ratio"]) else src_bytes
+        return sec, out_bytes, rate["samples"]
+
+    def trend(self, tool, mode=None, window=10):
+        """(median docs/s `window` run terbaru, median `window` run sebelumnya)."""
+        rows = self.recent(tool, mode, None, window * 2)
+        rates = [d / s for d, _, _, s in rows if d]
+        return _median(rates[:window]), _median(rates[window:])
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+def schedule_wall_sec(durations, workers):
+    """Wall time kalau durasi (sudah urut terbesar dulu) dijalankan di `workers` slot (LPT)."""
+    slots = [0.0] * max(1, int(workers))
+    for d in durations:
+        i = slots.index(min(slots))
+        slots[i] += d
+    return max(slots) if durations else 0.0
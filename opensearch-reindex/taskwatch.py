@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+
+"""
+taskwatch.py  (Python 2.7 / 3, dipakai reindex.py dan remap.py)
+
+Pemantau task _reindex / _update_by_query yang jalan dengan
+wait_for_completion=false:
+- Baca status.created/updated/deleted/total, batches dan status per slice.
+- Hitung docs/s, persen selesai dan ETA.
+- Tulis setiap sample sebagai JSONL ke file metrics.
+- (Opsional) long-poll _tasks/<id>?wait_for_completion=true&timeout=..
+  supaya task panjang tidak perlu dipolling tiap beberapa detik.
+- (Opsional) ThrottleController: baca tekanan cluster dari _nodes/stats
+  lalu _rethrottle task yang sedang jalan dalam batas min/max.
+
+Semua fungsi menerima `req`, yaitu helper HTTP milik script pemanggil
+(signature: req(method, path, **kwargs) -> requests.Response).
+"""
+
+import json, time
+from datetime import datetime
+
+def _done_docs(st):
+    # sama dengan cara OpenSearch menghitung progress bulk-by-scroll
+    return sum(int(st.get(k) or 0) for k in ["created", "updated", "deleted", "noops", "version_conflicts"])
+
+def _fmt_eta(sec):
+    if sec is None: return "-"
+    sec = int(sec)
+    return "%02d:%02d:%02d" % (sec // 3600, (sec % 3600) // 60, sec % 60)
+
+def get_task(req, task):
+    r = req("GET", "_tasks/%s" % task)
+    if r.status_code != 200:
+        raise RuntimeError("Gagal cek task: %s %s" % (r.status_code, r.text))
+    return r.json()
+
+def long_poll(req, task, timeout_sec):
+    """
+    Tunggu task di sisi server maksimal timeout_sec. Return data task kalau
+    sudah selesai, None kalau belum (timeout).
+    """
+    r = req("GET", "_tasks/%s" % task,
+            params={"wait_for_completion": "true", "timeout": "%ds" % int(timeout_sec)},
+            timeout=int(timeout_sec) + 30)
+    if r.status_code == 404:
+        raise RuntimeError("Task %s tidak ditemukan: %s" % (task, r.text))
+    if r.status_code != 200:
+        return None  # timeout di server: belum selesai
+    data = r.json()
+    return data if data.get("completed") else None
+
+class ProgressTracker(object):
+    """Satu tracker per task. sample() dipanggil dengan respons _tasks/<id>."""
+
+    def __init__(self, label, task, metrics_file=None, print_every_sec=30):
+        self.label, self.task = label, task
+        self.metrics_file = metrics_file
+        self.print_every_sec = print_every_sec
+        self.t0 = time.time()
+        self.last_t = self.last_done = None
+        self.last_print = 0
+        self.last_row = None
+
+    def sample(self, data):
+        task_obj = data.get("task") or {}
+        st = task_obj.get("status") or {}
+        if data.get("completed") and data.get("response"):
+            st = data["response"]
+        now = time.time()
+        done = _done_docs(st)
+        total = int(st.get("total") or 0)
+        running = task_obj.get("running_time_in_nanos")
+        elapsed = (running / 1e9) if running else (now - self.t0)
+
+        rate_avg = done / elapsed if elapsed > 0 else 0.0
+        rate_now = rate_avg
+        if self.last_t is not None and now > self.last_t:
+            rate_now = (done - self.last_done) / (now - self.last_t)
+        self.last_t, self.last_done = now, done
+        rate_eta = rate_now if rate_now > 0 else rate_avg
+        eta = (total - done) / rate_eta if (total and rate_eta > 0) else None
+
+        slices = []
+        for sl in st.get("slices") or []:
+            if not isinstance(sl, dict): continue
+            sl_total = int(sl.get("total") or 0)
+            sl_done = _done_docs(sl)
+            slices.append({"slice_id": sl.get("slice_id"), "done": sl_done, "total": sl_total,
+                           "pct": round(100.0 * sl_done / sl_total, 1) if sl_total else None})
+
+        row = {"ts": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "label": self.label, "task": self.task,
+               "completed": bool(data.get("completed")), "done": done, "total": total,
+               "created": int(st.get("created") or 0), "updated": int(st.get("updated") or 0),
+               "batches": int(st.get("batches") or 0), "elapsed_sec": round(elapsed, 1),
+               "docs_per_sec": round(rate_now, 1), "docs_per_sec_avg": round(rate_avg, 1),
+               "pct": round(100.0 * done / total, 1) if total else None,
+               "eta_sec": int(eta) if eta is not None else None,
+               "requests_per_second": st.get("requests_per_second"), "slices": slices}
+        self.last_row = row
+        self._write(row)
+        if row["completed"] or now - self.last_print >= self.print_every_sec:
+            self.last_print = now
+            print(self.line(row))
+        return row
+
+    def line(self, row):
+        pct = ("%.1f%%" % row["pct"]) if row["pct"] is not None else "?%"
+        out = "  [%s] %s %d/%d docs | %.0f docs/s (avg %.0f) | ETA %s | batches %d" % (
+            self.label, pct, row["done"], row["total"], row["docs_per_sec"], row["docs_per_sec_avg"],
+            _fmt_eta(row["eta_sec"]), row["batches"])
+        if row["slices"]:
+            out += " | slices " + " ".join("%s:%s" % (sl["slice_id"], ("%.0f%%" % sl["pct"]) if sl["pct"] is not None else "?")
+                                           for sl in row["slices"])
+        return out
+
+    def _write(self, row):
+        if not self.metrics_file: return
+        try:
+            with open(self.metrics_file, "a") as f:
+                f.write(json.dumps(row) + "\n")
+        except IOError as e:
+            print("  ! Gagal tulis metrics %s: %s" % (self.metrics_file, e))
+
+class ThrottleController(object):
+    """
+    Atur requests_per_second task yang sedang jalan berdasarkan tekanan
+    cluster: antrean + rejection thread pool write, rata-rata latensi search
+    dan heap JVM (nilai terburuk antar node). Tekanan tinggi -> turunkan
+    rps (x step_down), cluster longgar -> naikkan (x step_up), selalu dalam
+    [min_rps, max_rps]. Setiap keputusan ditulis JSONL ke log_file.
+    """
+
+    def __init__(self, req, min_rps, max_rps, start_rps, interval_sec=30,
+                 write_queue_max=200, search_latency_ms_max=500, heap_pct_max=85,
+                 step_down=0.5, step_up=1.5, log_file=None):
+        self.req = req
+        self.min_rps, self.max_rps = float(min_rps), float(max_rps)
+        self.rps = min(self.max_rps, max(self.min_rps, float(start_rps)))
+        self.interval_sec = interval_sec
+        self.write_queue_max = write_queue_max
+        self.search_latency_ms_max = search_latency_ms_max
+        self.heap_pct_max = heap_pct_max
+        self.step_down, self.step_up = step_down, step_up
+        self.log_file = log_file
+        self.last_tick = 0
+        self.prev = None
+
+    def pressure(self):
+        r = self.req("GET", "_nodes/stats/thread_pool,indices,jvm", params={
+            "filter_path": "nodes.*.name,nodes.*.thread_pool.write,nodes.*.indices.search,nodes.*.jvm.mem.heap_used_percent"})
+        if r.status_code != 200:
+            raise RuntimeError("Gagal _nodes/stats: %s %s" % (r.status_code, r.text))
+        queue = heap = 0
+        rejected = q_total = q_time = 0
+        for node in (r.json().get("nodes") or {}).values():
+            write = (node.get("thread_pool") or {}).get("write") or {}
+            search = (node.get("indices") or {}).get("search") or {}
+            queue = max(queue, int(write.get("queue") or 0))
+            rejected += int(write.get("rejected") or 0)
+            q_total += int(search.get("query_total") or 0)
+            q_time += int(search.get("query_time_in_millis") or 0)
+            heap = max(heap, int(((node.get("jvm") or {}).get("mem") or {}).get("heap_used_percent") or 0))
+        cur = {"rejected": rejected, "q_total": q_total, "q_time": q_time}
+        prev, self.prev = self.prev, cur
+        # rejection & latensi dihitung sebagai delta sejak sample sebelumnya
+        new_rejected = (rejected - prev["rejected"]) if prev else 0
+        d_total = (q_total - prev["q_total"]) if prev else 0
+        latency = ((q_time - prev["q_time"]) / float(d_total)) if d_total > 0 else 0.0
+        return {"write_queue": queue, "write_rejected": max(0, new_rejected),
+                "search_latency_ms": round(latency, 1), "heap_pct": heap}
+
+    def decide(self, p):
+        reasons = []
+        if p["write_rejected"] > 0: reasons.append("rejected=%d" % p["write_rejected"])
+        if p["write_queue"] > self.write_queue_max: reasons.append("write_queue=%d" % p["write_queue"])
+        if p["search_latency_ms"] > self.search_latency_ms_max: reasons.append("search=%.0fms" % p["search_latency_ms"])
+        if p["heap_pct"] > self.heap_pct_max: reasons.append("heap=%d%%" % p["heap_pct"])
+        if reasons:
+            return max(self.min_rps, self.rps * self.step_down), "turun: " + ", ".join(reasons)
+        calm = (p["write_queue"] <= self.write_queue_max / 4.0
+                and p["search_latency_ms"] <= self.search_latency_ms_max / 2.0
+                and p["heap_pct"] <= self.heap_pct_max - 10)
+        if calm:
+            return min(self.max_rps, self.rps * self.step_up), "naik: cluster longgar"
+        return self.rps, "tahan"
+
+    def rethrottle(self, task, rps, endpoint="_reindex"):
+        r = self.req("POST", "%s/%s/_rethrottle" % (endpoint, task), params={"requests_per_second": str(int(rps))})
+        if r.status_code != 200:
+            raise RuntimeError("Gagal rethrottle %s: %s %s" % (task, r.status_code, r.text))
+
+    def tick(self, tasks, endpoint="_reindex"):
+        """
+        Dipanggil dari loop polling; hanya bekerja tiap interval_sec. tasks
+        boleh berisi (task, endpoint) untuk campuran _reindex/_update_by_query.
+        """
+        now = time.time()
+        if not tasks or now - self.last_tick < self.interval_sec: return
+        self.last_tick = now
+        try:
+            p = self.pressure()
+        except Exception as e:
+            print("  ! Throttle: %s" % e); return
+        new_rps, reason = self.decide(p)
+        row = {"ts": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "tasks": [t[0] if isinstance(t, (tuple, list)) else t for t in tasks],
+               "rps_old": int(self.rps), "rps_new": int(new_rps), "reason": reason}
+        row.update(p)
+        if int(new_rps) != int(self.rps):
+            applied = 0
+            for task in tasks:
+                task, task_endpoint = task if isinstance(task, (tuple, list)) else (task, endpoint)
+                try:
+                    self.rethrottle(task, new_rps, task_endpoint); applied += 1
+                except Exception as e:
+                    print("  ! %s" % e); row.setdefault("errors", []).append(str(e))
+            if applied:
+                print("  [throttle] %d -> %d req/s per task (%s)" % (self.rps, new_rps, reason))
+                self.rps = new_rps
+            else:
+                row["rps_new"] = int(self.rps)
+        self._write(row)
+
+    def _write(self, row):
+        if not self.log_file: return
+        try:
+            with open(self.log_file, "a") as f:
+                f.write(json.dumps(row) + "\n")
+        except IOError as e:
+            print("  ! Gagal tulis log throttle %s: %s" % (self.log_file, e))
+
+def watch_task(req, task, label, poll_sec=2, long_poll_sec=0, metrics_file=None, print_every_sec=30,
+               throttle=None):
+    """
+    Tunggu task sampai selesai sambil mencatat progress. Dengan
+    long_poll_sec > 0, jeda antar sample dilakukan dengan long-poll di
+    server (1 request per long_poll_sec, bukan per poll_sec). Kalau ada
+    throttle (ThrottleController), rps task diatur tiap interval-nya.
+    """
+    tracker = ProgressTracker(label, task, metrics_file, print_every_sec)
+    while True:
+        data = get_task(req, task)
+        tracker.sample(data)
+        if data.get("completed"): return data
+        if throttle: throttle.tick([task])
+        if long_poll_sec:
+            data = long_poll(req, task, long_poll_sec)
+            if data is not None:
+                tracker.sample(data)
+                return data
+        else:
+            time.sleep(poll_sec)
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+import os, re, sys, unittest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import reindex
+
+def run_ip_processors(value):
+    """Emulasi processor cleaning IP (join/gsub/remove/split) untuk satu field."""
+    body = reindex.build_ingest_pipeline({"src_ips": "ip"}, True)
+    for proc in body["processors"]:
+        (kind, spec), = proc.items()
+        if kind == "join" and isinstance(value, list): value = spec["separator"].join(value)
+        elif kind == "gsub" and isinstance(value, str): value = re.sub(spec["pattern"], spec["replacement"], value)
+        elif kind == "remove" and value == "": return None
+        elif kind == "split" and isinstance(value, str) and "," in value: value = value.split(spec["separator"])
+    return value
+
+class NonIpv4TokenTest(unittest.TestCase):
+    def test_drops_only_non_ipv4_tokens(self):
+        self.assertEqual(re.sub(reindex._NON_IPV4_TOKEN, "", "1.1.1.1,any,2.2.2.2"), "1.1.1.1,2.2.2.2")
+        self.assertEqual(re.sub(reindex._NON_IPV4_TOKEN, "", "host,1.1.1.1"), "1.1.1.1")
+        self.assertEqual(re.sub(reindex._NON_IPV4_TOKEN, "", "1.1.1.10"), "1.1.1.10")
+
+    def test_all_invalid(self):
+        self.assertEqual(re.sub(reindex._NON_IPV4_TOKEN, "", "any,none"), "")
+
+class BuildIngestPipelineTest(unittest.TestCase):
+    def test_nothing_to_do(self):
+        self.assertIsNone(reindex.build_ingest_pipeline({"msg": "text"}, True))
+        self.assertIsNone(reindex.build_ingest_pipeline({"src_ips": "ip"}, False))
+
+    def test_convert_numeric(self):
+        body = reindex.build_ingest_pipeline({"src_port": "short"}, True)
+        self.assertEqual(body["processors"], [{"convert": {"field": "src_port", "type": "integer",
+                                                           "ignore_missing": True, "ignore_failure": True}}])
+
+    def test_ip_cleaning_matches_script(self):
+        self.assertEqual(run_ip_processors("1.1.1.1"), "1.1.1.1")
+        self.assertEqual(run_ip_processors("1.1.1.1, 2.2.2.2;any"), ["1.1.1.1", "2.2.2.2"])
+        self.assertEqual(run_ip_processors(["1.1.1.1", "n/a"]), "1.1.1.1")
+        self.assertIsNone(run_ip_processors("unknown"))
+
+if __name__ == "__main__":
+    unittest.main()
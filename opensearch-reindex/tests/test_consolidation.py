@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+import os, sys, unittest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import reindex
+
+def row(day):
+    return {"index": "fw-" + day, "docs": 1, "bytes": 10, "pri_bytes": 10, "pri": 1}
+
+class GroupSourcesPartialTest(unittest.TestCase):
+    def setUp(self):
+        self.saved = (reindex.DR_PREFIX, reindex.DR_START, reindex.DR_END, reindex.CONSOLIDATE)
+        reindex.DR_PREFIX = "fw-"
+
+    def tearDown(self):
+        reindex.DR_PREFIX, reindex.DR_START, reindex.DR_END, reindex.CONSOLIDATE = self.saved
+
+    def groups(self, start, end, consolidate, days):
+        reindex.DR_START, reindex.DR_END, reindex.CONSOLIDATE = start, end, consolidate
+        return dict((g["dst"], g) for g in reindex.group_sources([row(d) for d in days]))
+
+    def test_month_cut_by_range(self):
+        groups = self.groups("2025.08.30", "2025.09.30", "month", ["2025.08.30", "2025.08.31", "2025.09.01"])
+        self.assertTrue(groups["fw-2025.08-reindex"]["partial"])
+        self.assertEqual(groups["fw-2025.08-reindex"]["period"], ("2025.08.01", "2025.08.31"))
+        self.assertFalse(groups["fw-2025.09-reindex"]["partial"])
+
+    def test_month_cut_by_end(self):
+        groups = self.groups("2025.09.01", "2025.09.15", "month", ["2025.09.01"])
+        self.assertTrue(groups["fw-2025.09-reindex"]["partial"])
+
+    def test_iso_week(self):
+        # 2025.09.01 = Senin, 2025.09.07 = Minggu (w36)
+        groups = self.groups("2025.09.01", "2025.09.07", "week", ["2025.09.01", "2025.09.07"])
+        self.assertEqual(groups["fw-2025.w36-reindex"]["period"], ("2025.09.01", "2025.09.07"))
+        self.assertFalse(groups["fw-2025.w36-reindex"]["partial"])
+        groups = self.groups("2025.09.02", "2025.09.07", "week", ["2025.09.02"])
+        self.assertTrue(groups["fw-2025.w36-reindex"]["partial"])
+
+if __name__ == "__main__":
+    unittest.main()
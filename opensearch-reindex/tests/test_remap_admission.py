@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+import os, sys, unittest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import remap
+
+GB = 1024 ** 3
+
+class DiskLimitTest(unittest.TestCase):
+    def test_percent(self):
+        self.assertEqual(remap._disk_limit(100 * GB, "90%"), 90 * GB)
+
+    def test_ratio(self):
+        self.assertEqual(remap._disk_limit(100 * GB, "0.85"), 85 * GB)
+
+    def test_absolute_free_space(self):
+        self.assertEqual(remap._disk_limit(100 * GB, "10gb"), 90 * GB)
+        self.assertEqual(remap._disk_limit(100 * GB, "512mb"), 100 * GB - 512 * 1024 ** 2)
+
+class AdmitTest(unittest.TestCase):
+    def setUp(self):
+        self.safety, remap.DISK_SAFETY_PCT = remap.DISK_SAFETY_PCT, 0
+
+    def tearDown(self):
+        remap.DISK_SAFETY_PCT = self.safety
+
+    def nodes(self, *used_gb):
+        return [{"node": "n%d" % i, "disk.total": str(100 * GB), "disk.used": str(u * GB)} for i, u in enumerate(used_gb)]
+
+    def test_no_nodes_admits(self):
+        self.assertEqual(remap._admit(10 * GB, 0, [], "90%"), (True, None))
+
+    def test_fits_split_across_nodes(self):
+        fits, headroom = remap._admit(20 * GB, 0, self.nodes(70, 60), "90%")
+        self.assertTrue(fits)
+        self.assertEqual(headroom, 10 * GB)   # node terpenuh: 90 - 70 - 20/2
+
+    def test_reserved_by_running_finalize(self):
+        fits, headroom = remap._admit(20 * GB, 30 * GB, self.nodes(70, 60), "90%")
+        self.assertFalse(fits)
+        self.assertEqual(headroom, -5 * GB)
+
+    def test_safety_margin(self):
+        remap.DISK_SAFETY_PCT = 10
+        self.assertFalse(remap._admit(0, 0, self.nodes(85), "90%")[0])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+import os, sys, unittest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import run_history
+
+class PredictTest(unittest.TestCase):
+    def setUp(self):
+        self.h = run_history.RunHistory(":memory:")
+
+    def tearDown(self):
+        self.h.close()
+
+    def test_no_history(self):
+        self.assertEqual(self.h.predict("reindex", "reindex", 1000, 5000), (None, 5000, 0))
+
+    def test_median_bytes_rate_and_size_ratio(self):
+        for sec in (10.0, 20.0, 40.0):   # 100, 50, 25 byte/s -> median 50
+            self.h.record(tool="reindex", mode="reindex", src="a", docs=100, src_bytes=1000, dst_bytes=500, sec=sec)
+        self.h.record(tool="remap", mode="clone", src="b", docs=100, src_bytes=1000, sec=1.0)
+        self.assertEqual(self.h.predict("reindex", "reindex", 10, 500), (10.0, 250, 3))
+
+    def test_docs_rate_without_bytes(self):
+        self.h.record(tool="reindex", mode="reindex", src="a", docs=100, sec=10.0)
+        self.assertEqual(self.h.predict("reindex", "reindex", 50, None), (5.0, None, 1))
+
+    def test_clean_filter_falls_back(self):
+        self.h.record(tool="reindex", mode="reindex", src="a", clean="script", docs=100, sec=10.0)
+        self.assertEqual(self.h.predict("reindex", "reindex", 50, None, clean="pipeline")[0], 5.0)
+
+class ScheduleWallSecTest(unittest.TestCase):
+    def test_empty(self):
+        self.assertEqual(run_history.schedule_wall_sec([], 3), 0.0)
+
+    def test_serial(self):
+        self.assertEqual(run_history.schedule_wall_sec([5, 3, 2], 1), 10.0)
+
+    def test_lpt(self):
+        # slot: [8], [5, 3] -> 8; worker > job = durasi terbesar
+        self.assertEqual(run_history.schedule_wall_sec([8, 5, 3], 2), 8.0)
+        self.assertEqual(run_history.schedule_wall_sec([8, 5, 3], 10), 8.0)
+        self.assertEqual(run_history.schedule_wall_sec([4, 4, 4], 0), 12.0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+import os, sys, unittest
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import reindex
+
+def buckets(*pairs):
+    return [{"key": k, "doc_count": n} for k, n in pairs]
+
+class ClassifyValuesTest(unittest.TestCase):
+    def test_empty(self):
+        self.assertEqual(reindex.classify_values([]), (None, 0.0, [], ""))
+
+    def test_ipv4(self):
+        ftype, ratio, bad, note = reindex.classify_values(buckets(("10.0.0.1", 3), ("192.168.1.1", 1)))
+        self.assertEqual((ftype, ratio, bad, note), ("ip", 1.0, [], ""))
+
+    def test_ip_list_needs_cleaning(self):
+        ftype, ratio, _, note = reindex.classify_values(buckets(("1.1.1.1,2.2.2.2", 2), ("3.3.3.3", 2)))
+        self.assertEqual((ftype, ratio), ("ip", 1.0))
+        self.assertIn("2 doc berisi list IP", note)
+
+    def test_integer_with_outlier(self):
+        ftype, ratio, bad, _ = reindex.classify_values(buckets(("80", 3), ("any", 1)))
+        self.assertEqual((ftype, ratio, bad), ("integer", 0.75, ["any"]))
+
+    def test_long_beyond_int32(self):
+        self.assertEqual(reindex.classify_values(buckets(("4294967296", 1)))[0], "long")
+
+class IsPortTest(unittest.TestCase):
+    def test_port_name_and_range(self):
+        self.assertTrue(reindex._is_port("src_port", buckets(("80", 1), ("65535", 1), ("any", 1))))
+
+    def test_out_of_range(self):
+        self.assertFalse(reindex._is_port("dst_port", buckets(("70000", 1))))
+
+    def test_name_without_port(self):
+        self.assertFalse(reindex._is_port("rule_id", buckets(("80", 1))))
+
+if __name__ == "__main__":
+    unittest.main()